@@ -1,35 +1,57 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+import hmac
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
 
 from app.core.auth import CurrentUser, get_current_user, require_roles
 from app.core.config import settings
+from app.core.executors import inference_executor
 from app.core.monitoring import metrics_store
 from app.models.schemas import (
+    EvidenceBatchValidationRequest,
+    EvidenceBatchValidationResponse,
+    EvidenceBulkTransitionRequest,
+    EvidenceBulkTransitionResponse,
     EvidenceTransitionRequest,
     EvidenceTransitionResponse,
     EvidenceValidationRequest,
     EvidenceValidationResponse,
+    MrvBatchEstimateRequest,
+    MrvBatchEstimateResponse,
     MrvEstimateRequest,
     MrvEstimateResponse,
+    MrvWhatIfRequest,
+    MrvWhatIfResponse,
     RecommendationRequest,
     RecommendationResponse,
+    VishnuWebhookBatchRequest,
+    VishnuWebhookBatchResponse,
     VishnuWebhookRequest,
     VishnuWebhookResponse,
     VoiceIntentRequest,
     VoiceIntentResponse,
 )
+from app.services.bulk_scoring import BulkFormat, RecordChunker, aiter_lines, detect_format, score_records
 from app.services.data_quality import quality_score_from_warnings, quality_warnings
-from app.services.evidence_validator import validate_evidence_payload
-from app.services.evidence_workflow import validate_transition
+from app.services.evidence_validator import validate_evidence_batch, validate_evidence_payload
+from app.services.evidence_store import evidence_store
 from app.services.mrv_engine import estimate_annual_co2e
-from app.services.recommender import generate_recommendations
+from app.services.recommender import recommendation_response_json
+from app.services.vishnu_sessions import vishnu_sessions
 from app.services.voice_nlu import infer_intent
+from app.services.what_if import score_what_if
 
 router = APIRouter()
 
 
 @router.post("/mrv/estimate", response_model=MrvEstimateResponse)
-def mrv_estimate(payload: MrvEstimateRequest, _: CurrentUser = Depends(get_current_user)) -> MrvEstimateResponse:
-    estimate, confidence, explanation, model_version = estimate_annual_co2e(
+async def mrv_estimate(payload: MrvEstimateRequest, _: CurrentUser = Depends(get_current_user)) -> MrvEstimateResponse:
+    estimate, confidence, explanation, model_version = await inference_executor.run(
+        estimate_annual_co2e,
         payload.profile,
         list(payload.practices),
         payload.baseline_yield_ton_per_hectare,
@@ -39,7 +61,7 @@ def mrv_estimate(payload: MrvEstimateRequest, _: CurrentUser = Depends(get_curre
     warnings = quality_warnings(payload.profile, list(payload.practices), payload.baseline_yield_ton_per_hectare)
     quality_score = quality_score_from_warnings(warnings)
 
-    return MrvEstimateResponse(
+    response = MrvEstimateResponse(
         estimated_annual_co2e_tons=estimate,
         confidence_score=confidence,
         data_quality_score=quality_score,
@@ -48,63 +70,191 @@ def mrv_estimate(payload: MrvEstimateRequest, _: CurrentUser = Depends(get_curre
         model_version=model_version,
         explanation=explanation,
     )
+    # Serialize here rather than in FastAPI's response_model pass so the stage can be timed.
+    with metrics_store.time_stage("serialization"):
+        return Response(content=response.model_dump_json(), media_type="application/json")
+
+
+def _score_batch(payload: MrvBatchEstimateRequest) -> MrvBatchEstimateResponse:
+    results = score_records(list(payload.items))
+    succeeded = sum(1 for item in results if item.result is not None)
+    return MrvBatchEstimateResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+@router.post("/mrv/what-if", response_model=MrvWhatIfResponse)
+async def mrv_what_if(payload: MrvWhatIfRequest, _: CurrentUser = Depends(get_current_user)) -> MrvWhatIfResponse:
+    response = await inference_executor.run(score_what_if, payload)
+    metrics_store.record_model_usage(response.model_version)
+    return response
+
+
+@router.post("/mrv/estimate:batch", response_model=MrvBatchEstimateResponse)
+async def mrv_estimate_batch(
+    payload: MrvBatchEstimateRequest,
+    _: CurrentUser = Depends(get_current_user),
+) -> MrvBatchEstimateResponse:
+    # Per-item validation and scoring of thousands of farms is CPU-bound; keep all of it off the event loop.
+    return await inference_executor.run(_score_batch, payload)
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """Streams a body that is produced while the request body is still being read.
+
+    StreamingResponse normally runs a task that calls `receive()` to watch for disconnects, which would
+    swallow request body messages the generator is reading. Here the generator owns `receive()`; a client
+    disconnect surfaces as `ClientDisconnect` from `request.stream()`.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError as exc:
+            raise ClientDisconnect() from exc
+
+
+async def _stream_scored(request: Request, fmt: BulkFormat) -> AsyncIterator[bytes]:
+    chunker = RecordChunker(fmt, settings.mrv_stream_chunk_size)
+    index = 0
+    lines = aiter_lines(request.stream())
+    while True:
+        line = await anext(lines, None)
+        chunk = chunker.flush() if line is None else chunker.push(line)
+        if chunk:
+            # Headers are already sent, so a busy pool applies backpressure (body reads pause) rather than
+            # failing the chunk's rows.
+            results = await inference_executor.run_when_available(score_records, chunk, index)
+            index += len(chunk)
+            # Each yield waits until the server has handed the bytes to the socket, so a slow reader pauses
+            # both scoring and request-body reads instead of letting results pile up in memory.
+            yield "".join(item.model_dump_json() + "\n" for item in results).encode("utf-8")
+        if line is None:
+            return
+
+
+@router.post("/mrv/estimate:stream")
+async def mrv_estimate_stream(request: Request, _: CurrentUser = Depends(get_current_user)) -> StreamingResponse:
+    """Score an NDJSON or CSV body of `MrvEstimateRequest` rows, streaming one NDJSON result line per row."""
+    fmt = detect_format(request.headers.get("content-type"))
+    return _DuplexStreamingResponse(_stream_scored(request, fmt), media_type="application/x-ndjson")
 
 
 @router.post("/mrv/evidence/validate", response_model=EvidenceValidationResponse)
-def validate_evidence(
+async def validate_evidence(
     payload: EvidenceValidationRequest,
     _: CurrentUser = Depends(get_current_user),
 ) -> EvidenceValidationResponse:
-    valid, issues = validate_evidence_payload(payload.latitude, payload.longitude, payload.soil_organic_carbon_pct)
+    # The polygon lookup and the duplicate detector's lock are blocking work; run them in the pool like the batch.
+    valid, issues, warnings = await inference_executor.run(
+        validate_evidence_payload,
+        payload.latitude,
+        payload.longitude,
+        payload.soil_organic_carbon_pct,
+        payload.state,
+        payload.district,
+        payload.farmer_id,
+    )
+    return _validation_response(valid, issues, warnings)
+
+
+def _validation_response(valid: bool, issues: list[str], warnings: list[str]) -> EvidenceValidationResponse:
     recommendation = "Evidence set looks valid for next verifier review." if valid else "Please correct issues before submission."
-    return EvidenceValidationResponse(valid=valid, issues=issues, recommendation=recommendation)
+    return EvidenceValidationResponse(valid=valid, issues=issues, warnings=warnings, recommendation=recommendation)
 
 
+def _validate_batch(payload: EvidenceBatchValidationRequest) -> EvidenceBatchValidationResponse:
+    items = payload.items
+    checked = validate_evidence_batch(
+        [item.latitude for item in items],
+        [item.longitude for item in items],
+        [item.soil_organic_carbon_pct for item in items],
+        [item.state for item in items],
+        [item.district for item in items],
+        [item.farmer_id for item in items],
+    )
+    results = [_validation_response(*result) for result in checked]
+    valid = sum(1 for result in results if result.valid)
+    return EvidenceBatchValidationResponse(results=results, valid=valid, invalid=len(results) - valid)
+
+
+@router.post("/mrv/evidence/validate:batch", response_model=EvidenceBatchValidationResponse)
+async def validate_evidence_batch_route(
+    payload: EvidenceBatchValidationRequest,
+    _: CurrentUser = Depends(get_current_user),
+) -> EvidenceBatchValidationResponse:
+    return await inference_executor.run(_validate_batch, payload)
+
+
+# Plain `def`: the store blocks on its lock and on SQLite's busy timeout, so these run in the threadpool.
 @router.post("/mrv/evidence/transition", response_model=EvidenceTransitionResponse)
 def evidence_transition(
     payload: EvidenceTransitionRequest,
-    _: CurrentUser = Depends(require_roles("verifier", "admin")),
+    user: CurrentUser = Depends(require_roles("verifier", "admin")),
 ) -> EvidenceTransitionResponse:
-    # Current state lookup is mocked as 'submitted' here; replace with DB read in next iteration.
-    from_status = "submitted"
-    allowed, message = validate_transition(from_status, payload.to_status)
-    return EvidenceTransitionResponse(
-        evidence_id=payload.evidence_id,
-        from_status=from_status,
-        to_status=payload.to_status,
-        allowed=allowed,
-        message=message,
-    )
+    return evidence_store.apply([payload], actor=str(user.get("uid", "anonymous")))[0]
+
+
+@router.post("/mrv/evidence/transition:bulk", response_model=EvidenceBulkTransitionResponse)
+def evidence_transition_bulk(
+    payload: EvidenceBulkTransitionRequest,
+    user: CurrentUser = Depends(require_roles("verifier", "admin")),
+) -> EvidenceBulkTransitionResponse:
+    results = evidence_store.apply(payload.items, actor=str(user.get("uid", "anonymous")), atomic=payload.atomic)
+    applied = sum(1 for result in results if result.allowed)
+    return EvidenceBulkTransitionResponse(results=results, applied=applied, rejected=len(results) - applied)
 
 
 @router.post("/recommendations", response_model=RecommendationResponse)
-def recommendations(payload: RecommendationRequest, _: CurrentUser = Depends(get_current_user)) -> RecommendationResponse:
-    recs = generate_recommendations(payload)
-    note = (
-        "Recommendations are adapted for Indian smallholder adoption constraints. "
-        "Validate with local FPO/agronomist before farm-wide rollout."
-    )
-    return RecommendationResponse(recommendations=recs, advisory_note=note)
+async def recommendations(payload: RecommendationRequest, _: CurrentUser = Depends(get_current_user)) -> RecommendationResponse:
+    if payload.budget_inr_per_hectare is not None:
+        # Budget plans solve a knapsack; keep that off the event loop.
+        try:
+            content = await inference_executor.run(recommendation_response_json, payload)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+    else:
+        # Pre-serialized at import time (see recommender); nothing is ranked or encoded per request.
+        content = recommendation_response_json(payload)
+    return Response(content=content, media_type="application/json")
 
 
 @router.post("/voice/intent", response_model=VoiceIntentResponse)
-def voice_intent(payload: VoiceIntentRequest, _: CurrentUser = Depends(get_current_user)) -> VoiceIntentResponse:
-    intent, confidence, response = infer_intent(payload)
+async def voice_intent(payload: VoiceIntentRequest, _: CurrentUser = Depends(get_current_user)) -> VoiceIntentResponse:
+    # Featurizing and scoring the intent model is CPU-bound; keep it off the event loop like MRV inference.
+    intent, confidence, response = await inference_executor.run(infer_intent, payload)
     return VoiceIntentResponse(intent=intent, confidence=confidence, response_text=response)
 
 
 @router.get("/ops/metrics")
-def ops_metrics(_: CurrentUser = Depends(require_roles("admin", "verifier"))) -> dict[str, dict[str, int]]:
+def ops_metrics(_: CurrentUser = Depends(require_roles("admin", "verifier"))) -> dict[str, dict[str, Any]]:
     return metrics_store.snapshot()
 
 
+@router.get("/ops/metrics/prometheus", response_class=PlainTextResponse)
+def ops_metrics_prometheus(_: CurrentUser = Depends(require_roles("admin", "verifier"))) -> PlainTextResponse:
+    return PlainTextResponse(metrics_store.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+def _check_vishnu_secret(x_vishnu_secret: str | None) -> None:
+    # Constant-time comparison so response timing does not leak how much of the secret matched.
+    if x_vishnu_secret is None or not hmac.compare_digest(
+        x_vishnu_secret.encode("utf-8"), settings.vishnu_webhook_secret.encode("utf-8")
+    ):
+        raise HTTPException(status_code=401, detail="Invalid Vishnu signature")
+
+
 @router.post("/integrations/vishnu/webhook", response_model=VishnuWebhookResponse)
 def vishnu_webhook(
     payload: VishnuWebhookRequest,
     x_vishnu_secret: str | None = Header(default=None),
 ) -> VishnuWebhookResponse:
-    if x_vishnu_secret != settings.vishnu_webhook_secret:
-        raise HTTPException(status_code=401, detail="Invalid Vishnu signature")
+    _check_vishnu_secret(x_vishnu_secret)
+    return vishnu_sessions.handle([payload])[0]
 
-    intent, _, response = infer_intent(VoiceIntentRequest(transcript=payload.utterance, language=payload.language))
-    return VishnuWebhookResponse(session_id=payload.session_id, reply=response, intent=intent)
+
+@router.post("/integrations/vishnu/webhook:batch", response_model=VishnuWebhookBatchResponse)
+def vishnu_webhook_batch(
+    payload: VishnuWebhookBatchRequest,
+    x_vishnu_secret: str | None = Header(default=None),
+) -> VishnuWebhookBatchResponse:
+    _check_vishnu_secret(x_vishnu_secret)
+    return VishnuWebhookBatchResponse(results=vishnu_sessions.handle(payload.items))
@@ -4,8 +4,13 @@ import os
 from functools import lru_cache
 
 from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.core.config import settings
+from app.core.firebase_tokens import FirebaseTokenVerifier
+from app.core.monitoring import metrics_store
+
 security = HTTPBearer(auto_error=False)
 
 
@@ -31,22 +36,39 @@ def _verify_dev_token(token: str) -> dict:
     return {"uid": "dev-user", "provider": "dev", "role": role}
 
 
-def _verify_firebase_token(token: str) -> dict:
-    try:
-        import firebase_admin
-        from firebase_admin import auth
+def _verify_with_firebase_admin(token: str) -> dict:
+    import firebase_admin
+    from firebase_admin import auth
 
-        if not firebase_admin._apps:
-            firebase_admin.initialize_app()
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app()
+    return auth.verify_id_token(token)
+
+
+@lru_cache(maxsize=1)
+def _firebase_verifier() -> FirebaseTokenVerifier:
+    project_id = settings.firebase_project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
+    return FirebaseTokenVerifier(
+        project_id=project_id,
+        fallback=_verify_with_firebase_admin,
+    )
 
-        decoded = auth.verify_id_token(token)
-        role = decoded.get("role", "farmer")
-        return {"uid": decoded.get("uid", "unknown"), "provider": "firebase", "role": role}
-    except Exception as exc:  # pragma: no cover
+
+def _firebase_user(decoded: dict) -> dict:
+    role = decoded.get("role", "farmer")
+    return {"uid": decoded.get("uid", "unknown"), "provider": "firebase", "role": role}
+
+
+def _verify_firebase_token(token: str) -> dict:
+    try:
+        # Only reached after `cached()` missed; checking again would count the miss twice.
+        decoded = _firebase_verifier().verify(token, cache_checked=True)
+    except Exception as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Firebase token") from exc
+    return _firebase_user(decoded)
 
 
-def get_current_user(
+async def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
 ) -> CurrentUser:
@@ -60,10 +82,16 @@ def get_current_user(
     token = credentials.credentials
     mode = _auth_mode()
 
-    if mode == "firebase":
-        user = _verify_firebase_token(token)
-    else:
-        user = _verify_dev_token(token)
+    with metrics_store.time_stage("auth"):
+        if mode == "firebase":
+            cached = _firebase_verifier().cached(token)
+            if cached is not None:
+                user = _firebase_user(cached)
+            else:
+                # Verification may fetch signing keys over the network; keep it off the event loop.
+                user = await run_in_threadpool(_verify_firebase_token, token)
+        else:
+            user = _verify_dev_token(token)
 
     request.state.user = user
     return CurrentUser(user)
@@ -72,7 +100,7 @@ def get_current_user(
 def require_roles(*allowed_roles: str):
     allowed = set(allowed_roles)
 
-    def dependency(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    async def dependency(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
         role = str(user.get("role", "farmer"))
         if role not in allowed:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient role")
@@ -84,3 +112,4 @@ def require_roles(*allowed_roles: str):
 def reset_auth_cache() -> None:
     _auth_mode.cache_clear()
     _auth_required.cache_clear()
+    _firebase_verifier.cache_clear()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,8 +14,40 @@ class Settings(BaseSettings):
     auth_required: bool = Field(default=False, alias="AUTH_REQUIRED")
     auth_provider: str = Field(default="dev", alias="AUTH_PROVIDER")
     dev_bearer_token: str = Field(default="dev-token", alias="DEV_BEARER_TOKEN")
+    firebase_project_id: str | None = Field(default=None, alias="FIREBASE_PROJECT_ID")
     rate_limit_per_minute: int = Field(default=120, alias="RATE_LIMIT_PER_MINUTE")
     rate_limit_window_seconds: int = Field(default=60, alias="RATE_LIMIT_WINDOW_SECONDS")
+    rate_limit_backend: Literal["memory", "redis"] = Field(default="memory", alias="RATE_LIMIT_BACKEND")
+    rate_limit_sweep_seconds: float = Field(default=60.0, alias="RATE_LIMIT_SWEEP_SECONDS")
+    redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
+    inference_workers: int = Field(default=4, ge=1, alias="INFERENCE_WORKERS")
+    inference_max_pending: int = Field(default=64, ge=0, alias="INFERENCE_MAX_PENDING")
+    vishnu_cache_backend: Literal["memory", "redis"] = Field(default="memory", alias="VISHNU_CACHE_BACKEND")
+    vishnu_cache_max_entries: int = Field(default=10_000, ge=1, alias="VISHNU_CACHE_MAX_ENTRIES")
+    vishnu_delivery_ttl_seconds: int = Field(default=300, ge=1, alias="VISHNU_DELIVERY_TTL_SECONDS")
+    vishnu_session_ttl_seconds: int = Field(default=1800, ge=1, alias="VISHNU_SESSION_TTL_SECONDS")
+    voice_lexicon_path: str | None = Field(default=None, alias="VOICE_LEXICON_PATH")
+    mrv_stream_chunk_size: int = Field(default=500, ge=1, le=5000, alias="MRV_STREAM_CHUNK_SIZE")
+    mrv_model_eager_load: bool = Field(default=True, alias="MRV_MODEL_EAGER_LOAD")
+    mrv_model_poll_seconds: float = Field(default=30.0, alias="MRV_MODEL_POLL_SECONDS")
+    intent_model_poll_seconds: float = Field(default=30.0, alias="INTENT_MODEL_POLL_SECONDS")
+    mrv_rollout_mode: Literal["off", "shadow", "canary"] = Field(default="off", alias="MRV_ROLLOUT_MODE")
+    mrv_canary_percent: int = Field(default=0, ge=0, le=100, alias="MRV_CANARY_PERCENT")
+    mrv_shadow_workers: int = Field(default=1, ge=1, alias="MRV_SHADOW_WORKERS")
+    mrv_shadow_queue_size: int = Field(default=256, ge=1, alias="MRV_SHADOW_QUEUE_SIZE")
+    agro_climate_table_path: str | None = Field(default=None, alias="AGRO_CLIMATE_TABLE_PATH")
+    raster_tile_dir: str | None = Field(default=None, alias="RASTER_TILE_DIR")
+    raster_cache_size: int = Field(default=100_000, ge=0, alias="RASTER_CACHE_SIZE")
+    geo_boundaries_path: str | None = Field(default=None, alias="GEO_BOUNDARIES_PATH")
+    geo_boundary_tolerance_km: float = Field(default=10.0, ge=0, alias="GEO_BOUNDARY_TOLERANCE_KM")
+    evidence_db_path: str = Field(default=":memory:", alias="EVIDENCE_DB_PATH")
+    evidence_dedup_window: int = Field(default=100_000, ge=1, alias="EVIDENCE_DEDUP_WINDOW")
+    evidence_dedup_gps_radius_m: float = Field(default=15.0, gt=0, alias="EVIDENCE_DEDUP_GPS_RADIUS_M")
+    evidence_dedup_soil_radius_m: float = Field(default=500.0, gt=0, alias="EVIDENCE_DEDUP_SOIL_RADIUS_M")
+    evidence_dedup_soil_tolerance: float = Field(default=0.005, gt=0, alias="EVIDENCE_DEDUP_SOIL_TOLERANCE")
+    evidence_dedup_state_path: str | None = Field(default=None, alias="EVIDENCE_DEDUP_STATE_PATH")
+    mrv_estimate_cache_size: int = Field(default=50_000, ge=0, alias="MRV_ESTIMATE_CACHE_SIZE")
+    mrv_estimate_cache_ttl_seconds: float = Field(default=3600.0, gt=0, alias="MRV_ESTIMATE_CACHE_TTL_SECONDS")
 
     @property
     def allowed_origins(self) -> list[str]:
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """Dedicated thread pool for CPU-bound work such as model inference.
+
+    At most `max_workers + max_pending` calls are admitted at once; beyond that callers get a 503 right away
+    instead of queueing behind inference and starving the default anyio threadpool.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, name: str) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Inference capacity exhausted. Please retry shortly.",
+            )
+        return await self._submit(fn, *args, **kwargs)
+
+    async def run_when_available(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Like `run`, but wait for a free slot (polling with backoff, so the event loop is never blocked)
+        instead of failing. For work that has already started answering, such as an open stream."""
+        delay = 0.005
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+        return await self._submit(fn, *args, **kwargs)
+
+    async def _submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        try:
+            future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._slots.release()
+            raise
+        # Release on completion, not on await exit: a cancelled request must not free a slot still in use.
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+inference_executor = BoundedExecutor(
+    max_workers=settings.inference_workers,
+    max_pending=settings.inference_max_pending,
+    name="mrv-inference",
+)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+import jwt
+
+GOOGLE_JWKS_URL = "https://www.googleapis.com/service_accounts/v1/jwk/securetoken@system.gserviceaccount.com"
+
+# Allowed clock skew for the "must be in the past" claims.
+CLOCK_SKEW_SECONDS = 300
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class TokenClaimsCache:
+    """Bounded LRU of verified claims keyed by token hash; entries are only served until the token's `exp`."""
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token_hash: bytes, now: float) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[token_hash]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token_hash)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token_hash: bytes, claims: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[token_hash] = (float(claims["exp"]), claims)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class JwksCache:
+    """Signing keys fetched once and refreshed when the key server's Cache-Control max-age runs out."""
+
+    def __init__(
+        self,
+        url: str = GOOGLE_JWKS_URL,
+        client: httpx.Client | None = None,
+        clock: Callable[[], float] = time.time,
+        default_max_age: float = 3600.0,
+        min_refresh_interval: float = 30.0,
+    ) -> None:
+        self.url = url
+        self.fetches = 0
+        self._client = client or httpx.Client(timeout=5.0)
+        self._clock = clock
+        self._default_max_age = default_max_age
+        self._min_refresh_interval = min_refresh_interval
+        self._keys: dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._fetched_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def get_key(self, kid: str) -> Any:
+        now = self._clock()
+        key = self._keys.get(kid)
+        if key is not None and now < self._expires_at:
+            return key
+
+        with self._lock:
+            now = self._clock()
+            stale = now >= self._expires_at
+            # An unknown kid may mean keys rotated early; refetch, but not more often than min_refresh_interval.
+            if stale or (kid not in self._keys and now - self._fetched_at >= self._min_refresh_interval):
+                self._refresh(now)
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f"Unknown signing key id: {kid}")
+        return key
+
+    def _refresh(self, now: float) -> None:
+        response = self._client.get(self.url)
+        response.raise_for_status()
+        self.fetches += 1
+
+        keys = {jwk["kid"]: jwt.PyJWK(jwk).key for jwk in response.json().get("keys", []) if "kid" in jwk}
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        max_age = float(match.group(1)) if match else self._default_max_age
+
+        self._keys = keys
+        self._fetched_at = now
+        self._expires_at = now + max_age
+
+
+class FirebaseTokenVerifier:
+    """Verifies Firebase ID tokens locally against cached Google signing keys.
+
+    A token seen before is answered from the claims cache without any signature work until it expires,
+    which covers repeat requests from the same mobile session.
+    """
+
+    def __init__(
+        self,
+        project_id: str | None,
+        jwks: JwksCache | None = None,
+        cache: TokenClaimsCache | None = None,
+        clock: Callable[[], float] = time.time,
+        fallback: Callable[[str], dict[str, Any]] | None = None,
+    ) -> None:
+        self.project_id = project_id
+        self.jwks = jwks or JwksCache(clock=clock)
+        self.cache = cache or TokenClaimsCache()
+        self._clock = clock
+        # Used when no project id is configured (e.g. firebase_admin resolving it from the environment).
+        self._fallback = fallback
+
+    @staticmethod
+    def _hash(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def cached(self, token: str) -> dict[str, Any] | None:
+        return self.cache.get(self._hash(token), self._clock())
+
+    def verify(self, token: str, cache_checked: bool = False) -> dict[str, Any]:
+        """Claims for `token`, from the cache or by verifying it. Pass `cache_checked` after a `cached()` miss
+        so the lookup (and its miss) is not repeated."""
+        token_hash = self._hash(token)
+        claims = None if cache_checked else self.cache.get(token_hash, self._clock())
+        if claims is None:
+            claims = self._verify_signature(token)
+            self.cache.put(token_hash, claims)
+        return claims
+
+    def _verify_signature(self, token: str) -> dict[str, Any]:
+        if not self.project_id:
+            if self._fallback is None:
+                raise jwt.InvalidTokenError("Firebase project id is not configured")
+            return self._fallback(token)
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        if not kid:
+            raise jwt.InvalidTokenError("Token header has no kid")
+
+        now = self._clock()
+        claims = jwt.decode(
+            token,
+            key=self.jwks.get_key(kid),
+            algorithms=["RS256"],
+            audience=self.project_id,
+            issuer=f"https://securetoken.google.com/{self.project_id}",
+            options={"require": ["exp", "iat", "auth_time", "sub"], "verify_exp": False, "verify_iat": False},
+        )
+        # Time checks use the injected clock so cached and fresh verification agree on what "now" is.
+        if float(claims["exp"]) <= now:
+            raise jwt.ExpiredSignatureError("Token has expired")
+        # Firebase requires both the issue time and the user's sign-in time to be in the past.
+        if float(claims["iat"]) > now + CLOCK_SKEW_SECONDS:
+            raise jwt.ImmatureSignatureError("Token was issued in the future")
+        if float(claims["auth_time"]) > now + CLOCK_SKEW_SECONDS:
+            raise jwt.ImmatureSignatureError("Token auth_time is in the future")
+        if not claims["sub"]:
+            raise jwt.InvalidTokenError("Token has an empty subject")
+
+        claims["uid"] = claims["sub"]
+        return claims
@@ -1,32 +1,229 @@
 from __future__ import annotations
 
+import threading
+import time
+import weakref
+from bisect import bisect_left
 from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
 from threading import Lock
+from typing import Any
+
+# Upper bounds (seconds) of the fixed histogram buckets; an implicit +Inf bucket follows.
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+STAGES = ("auth", "rate_limit", "feature_build", "predict", "serialization")
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def merge_into(self, target: _Histogram) -> None:
+        for index, value in enumerate(self.counts):
+            target.counts[index] += value
+        target.total += self.total
+        target.count += self.count
+
+
+class _Shard:
+    """Per-thread metric state. Only the owning thread writes to it, so recording takes no lock."""
+
+    __slots__ = ("counters", "histograms")
+
+    def __init__(self) -> None:
+        self.counters: dict[tuple[str, str], int] = defaultdict(int)
+        self.histograms: dict[tuple[str, ...], _Histogram] = {}
+
+    def merge_into(self, target: _Shard) -> None:
+        for key, value in self.counters.copy().items():
+            target.counters[key] += value
+        for key, histogram in self.histograms.copy().items():
+            if key not in target.histograms:
+                target.histograms[key] = _Histogram(histogram.buckets)
+            histogram.merge_into(target.histograms[key])
 
 
 class MetricsStore:
     def __init__(self) -> None:
         self._lock = Lock()
-        self._requests_by_path: dict[str, int] = defaultdict(int)
-        self._status_by_code: dict[str, int] = defaultdict(int)
-        self._model_version_counts: dict[str, int] = defaultdict(int)
+        self._local = threading.local()
+        # (owning thread, shard); shards of threads that have exited are folded into `_retired` at scrape time.
+        self._shards: list[tuple[weakref.ref[threading.Thread], _Shard]] = []
+        self._retired = _Shard()
+        self._shadow_stats: dict[str, dict[str, float]] = defaultdict(
+            lambda: {"compared": 0, "dropped": 0, "mean_delta": 0.0, "mean_abs_delta": 0.0, "max_abs_delta": 0.0}
+        )
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def _observe(self, key: tuple[str, ...], buckets: tuple[float, ...], value: float) -> None:
+        histograms = self._shard().histograms
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = _Histogram(buckets)
+        histogram.observe(value)
 
     def record_request(self, path: str, status_code: int) -> None:
-        with self._lock:
-            self._requests_by_path[path] += 1
-            self._status_by_code[str(status_code)] += 1
+        counters = self._shard().counters
+        counters[("path", path)] += 1
+        counters[("status", str(status_code))] += 1
+
+    def observe_request(self, route: str, status_code: int, duration_seconds: float) -> None:
+        self._observe(("request", route, f"{status_code // 100}xx"), REQUEST_BUCKETS, duration_seconds)
+
+    def observe_stage(self, stage: str, duration_seconds: float) -> None:
+        self._observe(("stage", stage), STAGE_BUCKETS, duration_seconds)
+
+    @contextmanager
+    def time_stage(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - started)
 
     def record_model_usage(self, model_version: str) -> None:
+        self._shard().counters[("model_version", model_version)] += 1
+
+    def record_webhook_delivery(self, outcome: str) -> None:
+        self._shard().counters[("webhook", outcome)] += 1
+
+    def record_estimate_cache(self, hits: int, misses: int) -> None:
+        counters = self._shard().counters
+        counters[("estimate_cache", "hit")] += hits
+        counters[("estimate_cache", "miss")] += misses
+
+    def record_evidence_duplicates(self, gps: int, soil: int, clean: int) -> None:
+        counters = self._shard().counters
+        counters[("evidence_duplicate", "gps")] += gps
+        counters[("evidence_duplicate", "soil")] += soil
+        counters[("evidence_duplicate", "clean")] += clean
+
+    def record_shadow_deltas(self, primary_version: str, candidate_version: str, deltas: list[float]) -> None:
+        """Fold candidate-minus-primary prediction deltas into running means for the version pair."""
+        if not deltas:
+            return
+        with self._lock:
+            stats = self._shadow_stats[f"{primary_version}->{candidate_version}"]
+            compared = stats["compared"] + len(deltas)
+            stats["mean_delta"] += (sum(deltas) - stats["mean_delta"] * len(deltas)) / compared
+            stats["mean_abs_delta"] += (sum(abs(d) for d in deltas) - stats["mean_abs_delta"] * len(deltas)) / compared
+            stats["max_abs_delta"] = max(stats["max_abs_delta"], max(abs(d) for d in deltas))
+            stats["compared"] = compared
+
+    def record_shadow_dropped(self, primary_version: str, candidate_version: str, rows: int = 1) -> None:
+        with self._lock:
+            self._shadow_stats[f"{primary_version}->{candidate_version}"]["dropped"] += rows
+
+    def _merged(self) -> tuple[dict[tuple[str, str], int], dict[tuple[str, ...], _Histogram]]:
+        """Sum every thread's shard. Runs at scrape time so the recording path stays lock-free.
+
+        Worker threads come and go (anyio retires idle ones), so shards of exited threads are folded into one
+        retired shard here; the shard list stays as long as the number of live threads.
+        """
+        merged = _Shard()
         with self._lock:
-            self._model_version_counts[model_version] += 1
+            live = []
+            for owner, shard in self._shards:
+                thread = owner()
+                if thread is None or not thread.is_alive():
+                    shard.merge_into(self._retired)
+                else:
+                    live.append((owner, shard))
+            self._shards = live
+            self._retired.merge_into(merged)
+
+        for _, shard in live:
+            shard.merge_into(merged)
+        return merged.counters, merged.histograms
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        counters, _ = self._merged()
+        by_kind: dict[str, dict[str, int]] = defaultdict(dict)
+        for (kind, name), value in counters.items():
+            by_kind[kind][name] = value
 
-    def snapshot(self) -> dict[str, dict[str, int]]:
         with self._lock:
-            return {
-                "requests_by_path": dict(self._requests_by_path),
-                "responses_by_status": dict(self._status_by_code),
-                "mrv_model_version_usage": dict(self._model_version_counts),
+            shadow = {
+                pair: {key: round(value, 4) if isinstance(value, float) else value for key, value in stats.items()}
+                for pair, stats in self._shadow_stats.items()
             }
+        return {
+            "requests_by_path": by_kind["path"],
+            "responses_by_status": by_kind["status"],
+            "mrv_model_version_usage": by_kind["model_version"],
+            "vishnu_webhook_deliveries": by_kind["webhook"],
+            "mrv_estimate_cache": by_kind["estimate_cache"],
+            "evidence_duplicate_checks": by_kind["evidence_duplicate"],
+            "mrv_shadow_evaluation": shadow,
+        }
+
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (version 0.0.4)."""
+        counters, histograms = self._merged()
+        lines: list[str] = []
+
+        counter_families = (
+            ("path", "agri_trust_http_requests_total", "path", "HTTP requests by path."),
+            ("status", "agri_trust_http_responses_total", "status", "HTTP responses by status code."),
+            ("model_version", "agri_trust_mrv_model_usage_total", "model_version", "MRV estimates by model version."),
+            ("webhook", "agri_trust_vishnu_webhook_deliveries_total", "outcome", "Vishnu webhook deliveries by outcome."),
+            ("estimate_cache", "agri_trust_mrv_estimate_cache_total", "outcome", "MRV estimate cache lookups by outcome."),
+            (
+                "evidence_duplicate",
+                "agri_trust_evidence_duplicate_checks_total",
+                "outcome",
+                "Evidence duplicate checks by outcome (gps and soil collisions, or clean).",
+            ),
+        )
+        for kind, metric, label, help_text in counter_families:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for (entry_kind, name), value in sorted(counters.items()):
+                if entry_kind == kind:
+                    lines.append(f'{metric}{{{label}="{_escape(name)}"}} {value}')
+
+        histogram_families = (
+            ("request", "agri_trust_http_request_duration_seconds", ("route", "status_class"), "Request latency."),
+            ("stage", "agri_trust_stage_duration_seconds", ("stage",), "Latency of request processing stages."),
+        )
+        for kind, metric, label_names, help_text in histogram_families:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for key, histogram in sorted(histograms.items()):
+                if key[0] != kind:
+                    continue
+                labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(label_names, key[1:]))
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, float("inf")), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{labels}}} {histogram.total!r}")
+                lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
 
 
 metrics_store = MetricsStore()
@@ -1,40 +1,234 @@
 from __future__ import annotations
 
-import os
+import logging
+import threading
 import time
-from collections import defaultdict, deque
-from threading import Lock
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any
 
 from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 
+from app.core.config import settings
 
-class InMemoryRateLimiter:
-    def __init__(self) -> None:
-        self.limit = int(os.getenv("RATE_LIMIT_PER_MINUTE", "120"))
-        self.window_seconds = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
-        self._hits: dict[str, deque[float]] = defaultdict(deque)
-        self._lock = Lock()
+logger = logging.getLogger("agri-trust.ai.rate_limit")
+
+
+def _rate_limit_exceeded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Rate limit exceeded. Please retry shortly.",
+    )
+
+
+class RateLimiterBackend(ABC):
+    """Approximate sliding-window limiter: `limit` hits per `window_seconds` per key.
+
+    The window is tracked as two fixed buckets (previous and current). The previous bucket is weighted by
+    how much of it still overlaps the sliding window, so memory per key is constant regardless of traffic.
+    """
+
+    def __init__(self, limit: int, window_seconds: int) -> None:
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+    @abstractmethod
+    def hit(self, key: str, now: float | None = None) -> bool:
+        """Count one request for `key`; returns False (and does not count it) when the key is over its limit."""
+
+    def try_hit(self, key: str, now: float | None = None) -> bool | None:
+        """Like `hit`, but never blocks; returns None when the answer needs a lock wait or network round trip."""
+        return None
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop keys with no hits in the last two windows; returns how many were removed."""
+        return 0
+
+    def key_count(self) -> int:
+        return 0
 
     def check(self, key: str) -> None:
-        now = time.time()
-        window_start = now - self.window_seconds
+        if not self.hit(key):
+            raise _rate_limit_exceeded()
 
-        with self._lock:
-            dq = self._hits[key]
-            while dq and dq[0] < window_start:
-                dq.popleft()
-            if len(dq) >= self.limit:
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded. Please retry shortly.",
-                )
-            dq.append(now)
+    def _estimate(self, previous: int, current: int, now: float) -> float:
+        elapsed_fraction = (now % self.window_seconds) / self.window_seconds
+        return previous * (1.0 - elapsed_fraction) + current
 
 
-rate_limiter = InMemoryRateLimiter()
+class SlidingWindowCounterLimiter(RateLimiterBackend):
+    """Process-local backend. Keys are spread over independently locked stripes to cut lock contention."""
 
+    def __init__(self, limit: int, window_seconds: int, stripes: int = 64) -> None:
+        super().__init__(limit, window_seconds)
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        # Per key: [window index, previous bucket count, current bucket count].
+        self._buckets: list[dict[str, list[int]]] = [{} for _ in range(stripes)]
 
-def enforce_rate_limit(request: Request) -> None:
+    def _stripe(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % len(self._locks)
+
+    def hit(self, key: str, now: float | None = None) -> bool:
+        stripe = self._stripe(key)
+        with self._locks[stripe]:
+            return self._hit_locked(stripe, key, time.time() if now is None else now)
+
+    def try_hit(self, key: str, now: float | None = None) -> bool | None:
+        stripe = self._stripe(key)
+        lock = self._locks[stripe]
+        if not lock.acquire(blocking=False):
+            return None
+        try:
+            return self._hit_locked(stripe, key, time.time() if now is None else now)
+        finally:
+            lock.release()
+
+    def _hit_locked(self, stripe: int, key: str, now: float) -> bool:
+        window = int(now // self.window_seconds)
+        state = self._buckets[stripe].get(key)
+        if state is None:
+            state = self._buckets[stripe][key] = [window, 0, 0]
+        elif state[0] != window:
+            state[1] = state[2] if state[0] == window - 1 else 0
+            state[2] = 0
+            state[0] = window
+
+        if self._estimate(state[1], state[2], now) >= self.limit:
+            return False
+        state[2] += 1
+        return True
+
+    def evict_idle(self, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        oldest_live_window = int(now // self.window_seconds) - 1
+        removed = 0
+        for lock, buckets in zip(self._locks, self._buckets):
+            with lock:
+                idle = [key for key, state in buckets.items() if state[0] < oldest_live_window]
+                for key in idle:
+                    del buckets[key]
+                removed += len(idle)
+        return removed
+
+    def key_count(self) -> int:
+        return sum(len(buckets) for buckets in self._buckets)
+
+
+def _redis_errors() -> tuple[type[Exception], ...]:
+    try:
+        from redis import RedisError
+    except ImportError:
+        return (OSError,)
+    return (RedisError, OSError)
+
+
+class RedisRateLimiter(RateLimiterBackend):
+    """Shared backend for all workers and replicas, using only GET/INCR/DECR/EXPIRE on a Redis-compatible client.
+
+    Bucket keys expire after two windows, so idle clients need no sweeping. When Redis is unreachable the
+    limiter fails open: requests are allowed, and the outage is logged once rather than on every request.
+    """
+
+    def __init__(self, client: Any, limit: int, window_seconds: int, prefix: str = "agri-trust:rl") -> None:
+        super().__init__(limit, window_seconds)
+        self.client = client
+        self.prefix = prefix
+        self._errors = _redis_errors()
+        self._failing = False
+
+    def hit(self, key: str, now: float | None = None) -> bool:
+        try:
+            allowed = self._hit(key, time.time() if now is None else now)
+        except self._errors:
+            if not self._failing:
+                self._failing = True
+                logger.exception("rate_limit_redis_unavailable fail_open=true")
+            return True
+        if self._failing:
+            self._failing = False
+            logger.info("rate_limit_redis_recovered")
+        return allowed
+
+    def _hit(self, key: str, now: float) -> bool:
+        window = int(now // self.window_seconds)
+        current_key = f"{self.prefix}:{key}:{window}"
+
+        pipe = self.client.pipeline()
+        pipe.get(f"{self.prefix}:{key}:{window - 1}")
+        pipe.incr(current_key)
+        pipe.expire(current_key, self.window_seconds * 2)
+        previous, current, _ = pipe.execute()
+
+        if self._estimate(int(previous or 0), int(current) - 1, now) >= self.limit:
+            self.client.decr(current_key)
+            return False
+        return True
+
+
+class IdleKeySweeper:
+    """Periodically evicts idle keys from a backend on a daemon thread (no busy loop)."""
+
+    def __init__(self, backend: RateLimiterBackend, interval_seconds: float) -> None:
+        self.backend = backend
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rate-limit-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            removed = self.backend.evict_idle()
+            if removed:
+                logger.debug("rate_limit_sweep removed_keys=%s", removed)
+
+
+def build_rate_limiter() -> RateLimiterBackend:
+    limit = settings.rate_limit_per_minute
+    window_seconds = settings.rate_limit_window_seconds
+
+    if settings.rate_limit_backend == "redis":
+        try:
+            import redis
+
+            client = redis.Redis.from_url(settings.redis_url)
+            return RedisRateLimiter(client, limit, window_seconds)
+        except ImportError:  # pragma: no cover
+            logger.warning("rate_limit_backend=redis but the redis package is not installed; using memory backend")
+
+    return SlidingWindowCounterLimiter(limit, window_seconds)
+
+
+rate_limiter = build_rate_limiter()
+rate_limit_sweeper = IdleKeySweeper(rate_limiter, settings.rate_limit_sweep_seconds)
+
+
+def _rate_limit_key(request: Request) -> str:
     client = request.client.host if request.client else "unknown"
-    key = f"{client}:{request.url.path}"
-    rate_limiter.check(key)
+    return f"{client}:{request.url.path}"
+
+
+def enforce_rate_limit(request: Request) -> None:
+    rate_limiter.check(_rate_limit_key(request))
+
+
+async def enforce_rate_limit_async(request: Request) -> None:
+    """Event-loop friendly check: answers inline when a stripe lock is free, otherwise defers to a worker thread."""
+    key = _rate_limit_key(request)
+    allowed = rate_limiter.try_hit(key)
+    if allowed is None:
+        allowed = await run_in_threadpool(rate_limiter.hit, key)
+    if not allowed:
+        raise _rate_limit_exceeded()
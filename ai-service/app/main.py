@@ -3,24 +3,59 @@ from __future__ import annotations
 import logging
 import time
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.routes import router
 from app.core.config import settings
+from app.core.executors import inference_executor
 from app.core.logging import setup_logging
 from app.core.monitoring import metrics_store
-from app.core.rate_limit import enforce_rate_limit
+from app.core.rate_limit import enforce_rate_limit_async, rate_limit_sweeper
+from app.services.agro_climate import agro_climate_table
+from app.services.evidence_dedup import duplicate_detector, load_duplicate_detector, save_duplicate_detector
+from app.services.intent_model import intent_registry
+from app.services.model_registry import mrv_registry, warm_mrv_model
 
 setup_logging()
 logger = logging.getLogger("agri-trust.ai")
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    if settings.mrv_model_eager_load:
+        started = time.perf_counter()
+        model_version = warm_mrv_model()
+        logger.info(
+            "mrv_model_warm model_version=%s duration_ms=%s",
+            model_version or "heuristic",
+            round((time.perf_counter() - started) * 1000, 2),
+        )
+    # The intent model is small; always load it here so the first voice request does no artifact I/O.
+    logger.info("intent_model_warm model_version=%s", intent_registry.current().version)
+    mrv_registry.start_watching()
+    intent_registry.start_watching()
+    rate_limit_sweeper.start()
+    load_duplicate_detector(duplicate_detector)
+    # Compile the agro-climate index before the first request rather than inside it.
+    agro_climate_table()
+    yield
+    save_duplicate_detector(duplicate_detector)
+    rate_limit_sweeper.stop()
+    intent_registry.stop_watching()
+    mrv_registry.stop_watching()
+    inference_executor.shutdown()
+
+
 app = FastAPI(
     title="Agri-Trust AI Service",
     version="0.1.0",
     description="FastAPI AI backend for carbon MRV, agronomy recommendations, and voice workflows.",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -38,7 +73,16 @@ async def request_context_middleware(request: Request, call_next):
     request.state.request_id = request_id
     started = time.perf_counter()
 
-    enforce_rate_limit(request)
+    try:
+        with metrics_store.time_stage("rate_limit"):
+            await enforce_rate_limit_async(request)
+    except HTTPException as exc:
+        # Middleware runs outside FastAPI's exception handlers, so render the 429 here.
+        return JSONResponse(
+            status_code=exc.status_code,
+            content={"detail": exc.detail, "request_id": request_id},
+            headers={"X-Request-ID": request_id},
+        )
 
     try:
         response = await call_next(request)
@@ -54,9 +98,13 @@ async def request_context_middleware(request: Request, call_next):
             },
         )
 
-    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    elapsed = time.perf_counter() - started
+    elapsed_ms = round(elapsed * 1000, 2)
     response.headers["X-Request-ID"] = request_id
     metrics_store.record_request(request.url.path, response.status_code)
+    # Label histograms with the route template, not the raw path, to keep label cardinality bounded.
+    route = request.scope.get("route")
+    metrics_store.observe_request(getattr(route, "path", "unmatched"), response.status_code, elapsed)
     logger.info(
         "request_complete request_id=%s method=%s path=%s status=%s duration_ms=%s",
         request_id,
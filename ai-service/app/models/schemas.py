@@ -1,6 +1,6 @@
-from typing import Literal
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field, conlist
+from pydantic import BaseModel, Field, conlist, field_validator
 
 
 LanguageCode = Literal["en", "hi", "mr"]
@@ -16,6 +16,8 @@ PracticeType = Literal[
     "residue_retention",
 ]
 
+ObjectiveName = Literal["carbon", "yield", "cost", "water"]
+
 EvidenceStatus = Literal["draft", "submitted", "in_review", "approved", "rejected"]
 
 
@@ -29,6 +31,9 @@ class FarmProfile(BaseModel):
     irrigation_type: Literal["rainfed", "flood", "drip", "sprinkler"]
     soil_organic_carbon_pct: float = Field(ge=0, le=10, default=0.7)
     language: LanguageCode = "hi"
+    # Farm centroid; lets models trained with satellite raster features look up NDVI and rainfall.
+    latitude: float | None = Field(default=None, ge=-90, le=90)
+    longitude: float | None = Field(default=None, ge=-180, le=180)
 
 
 class MrvEstimateRequest(BaseModel):
@@ -47,10 +52,48 @@ class MrvEstimateResponse(BaseModel):
     explanation: str
 
 
+class MrvBatchEstimateRequest(BaseModel):
+    # Items are validated one by one so a malformed farm is reported in place instead of failing the batch.
+    items: conlist(dict[str, Any], min_length=1, max_length=5000)
+
+
+class MrvBatchEstimateItem(BaseModel):
+    index: int
+    result: MrvEstimateResponse | None = None
+    error: str | None = None
+
+
+class MrvBatchEstimateResponse(BaseModel):
+    results: list[MrvBatchEstimateItem]
+    succeeded: int
+    failed: int
+
+
+class MrvWhatIfRequest(BaseModel):
+    profile: FarmProfile
+    current_practices: list[PracticeType] = []
+    baseline_yield_ton_per_hectare: float = Field(..., gt=0)
+    # Each bundle is a set of practices to adopt on top of `current_practices`.
+    bundles: conlist(conlist(PracticeType, min_length=1), min_length=1, max_length=64)
+    objective: ObjectiveName = "carbon"
+
+
 class RecommendationRequest(BaseModel):
     profile: FarmProfile
     current_practices: list[PracticeType] = []
-    objective: Literal["carbon", "yield", "cost", "water"] = "carbon"
+    objective: ObjectiveName = "carbon"
+    # Setting a budget switches from the fixed top 3 to the best affordable mix of practices.
+    budget_inr_per_hectare: float | None = Field(default=None, gt=0, le=10_000_000)
+    objective_weights: dict[ObjectiveName, float] | None = Field(
+        default=None, description="Relative weight per objective for budget plans; defaults to `objective` alone"
+    )
+
+    @field_validator("objective_weights")
+    @classmethod
+    def _weights_positive(cls, value: dict[str, float] | None) -> dict[str, float] | None:
+        if value is not None and (any(weight < 0 for weight in value.values()) or sum(value.values()) <= 0):
+            raise ValueError("objective_weights must be non-negative with a positive total")
+        return value
 
 
 class RecommendationItem(BaseModel):
@@ -60,9 +103,40 @@ class RecommendationItem(BaseModel):
     estimated_cost_inr_per_hectare: int
 
 
+class PracticeMix(BaseModel):
+    practices: list[PracticeType]
+    score: float
+    cost_inr_per_hectare: int
+    total_cost_inr: float
+
+
+class RecommendationPlan(BaseModel):
+    objective_weights: dict[ObjectiveName, float]
+    budget_inr_per_hectare: float
+    farm_size_hectares: float
+    selected: PracticeMix
+    # Cheapest mix for each achievable score: every point costs more and scores higher than the previous one.
+    pareto_frontier: list[PracticeMix]
+
+
 class RecommendationResponse(BaseModel):
     recommendations: list[RecommendationItem]
     advisory_note: str
+    plan: RecommendationPlan | None = None
+
+
+class MrvWhatIfScenario(BaseModel):
+    practices: list[PracticeType]
+    estimated_annual_co2e_tons: float
+    co2e_delta_tons: float
+    confidence_score: float
+    recommendations: list[RecommendationItem]
+
+
+class MrvWhatIfResponse(BaseModel):
+    baseline_co2e_tons: float
+    model_version: str
+    scenarios: list[MrvWhatIfScenario]
 
 
 class VoiceIntentRequest(BaseModel):
@@ -71,7 +145,8 @@ class VoiceIntentRequest(BaseModel):
 
 
 class VoiceIntentResponse(BaseModel):
-    intent: Literal["get_recommendations", "get_carbon_score", "unknown"]
+    # Intent names come from the lexicon data file, so new intents need no schema change.
+    intent: str
     confidence: float
     response_text: str
 
@@ -81,18 +156,35 @@ class EvidenceValidationRequest(BaseModel):
     latitude: float
     longitude: float
     soil_organic_carbon_pct: float = Field(ge=0, le=10)
+    # Where the farmer says the plot is; checked against the boundary polygons when they cover it.
+    state: str | None = None
+    district: str | None = None
 
 
 class EvidenceValidationResponse(BaseModel):
     valid: bool
     issues: list[str]
+    # Findings for the verifier that do not make the evidence invalid (e.g. a soil reading shared with a neighbour).
+    warnings: list[str] = []
     recommendation: str
 
 
+class EvidenceBatchValidationRequest(BaseModel):
+    items: list[EvidenceValidationRequest] = Field(min_length=1, max_length=10_000)
+
+
+class EvidenceBatchValidationResponse(BaseModel):
+    results: list[EvidenceValidationResponse]
+    valid: int
+    invalid: int
+
+
 class EvidenceTransitionRequest(BaseModel):
     evidence_id: str
     to_status: EvidenceStatus
     note: str | None = None
+    # Version the client last read; the transition is refused if someone else has moved the evidence since.
+    expected_version: int | None = Field(default=None, ge=0)
 
 
 class EvidenceTransitionResponse(BaseModel):
@@ -101,15 +193,39 @@ class EvidenceTransitionResponse(BaseModel):
     to_status: EvidenceStatus
     allowed: bool
     message: str
+    version: int = 0
+
+
+class EvidenceBulkTransitionRequest(BaseModel):
+    items: conlist(EvidenceTransitionRequest, min_length=1, max_length=1000)
+    # All-or-nothing: when any item is rejected, none are applied.
+    atomic: bool = False
+
+
+class EvidenceBulkTransitionResponse(BaseModel):
+    results: list[EvidenceTransitionResponse]
+    applied: int
+    rejected: int
 
 
 class VishnuWebhookRequest(BaseModel):
     session_id: str
     utterance: str
     language: LanguageCode = "hi"
+    # Platform delivery ID, identical across retries of one delivery; the preferred idempotency key.
+    delivery_id: str | None = None
 
 
 class VishnuWebhookResponse(BaseModel):
     session_id: str
     reply: str
     intent: str
+
+
+class VishnuWebhookBatchRequest(BaseModel):
+    # Utterances the relay queued while the service was busy, answered with one intent-model call.
+    items: conlist(VishnuWebhookRequest, min_length=1, max_length=256)
+
+
+class VishnuWebhookBatchResponse(BaseModel):
+    results: list[VishnuWebhookResponse]
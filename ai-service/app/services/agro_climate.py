@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import csv
+import difflib
+import re
+import unicodedata
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+
+DEFAULT_TABLE_PATH = Path(__file__).resolve().parent.parent / "data" / "agro_climate_factors.csv"
+# Factor for states missing from the table (and districts of a state without a state-wide row).
+DEFAULT_FACTOR = 1.0
+# Minimum difflib similarity for a name that matches no key or alias exactly.
+FUZZY_CUTOFF = 0.85
+
+_GENERIC_WORDS = frozenset({"district", "dist", "zila", "zilla", "jilla"})
+_ASPIRATED = re.compile(r"([bcdgkpst])h")
+_REPEATED = re.compile(r"(.)\1+")
+
+
+@lru_cache(maxsize=65_536)
+def place_key(name: str) -> str:
+    """Spelling-insensitive key for an Indian place name.
+
+    Accents and punctuation are dropped, case is folded, and words like "district" or "zilla" are removed.
+    Common romanization variants are then folded: doubled letters (Hissar/Hisar), aspirates (Nashik/Nasik,
+    Bhatinda/Bathinda) and w/v. Spaces are removed last.
+    """
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold().replace("&", " and ")
+    words = [word for word in re.sub(r"[^0-9a-z]+", " ", text).split() if word not in _GENERIC_WORDS]
+    key = _REPEATED.sub(r"\1", "".join(words))
+    key = _ASPIRATED.sub(r"\1", key)
+    return _REPEATED.sub(r"\1", key.replace("w", "v"))
+
+
+def _name(value: object) -> str:
+    return "" if value is None or pd.isna(value) else str(value)
+
+
+class AgroClimateTable:
+    """Agro-climate factors per (state, district), compiled into an integer-slot index.
+
+    Every state and district gets a slot in one `factors` array. Slot 0 holds `DEFAULT_FACTOR`, and each
+    state's slot holds its state-wide factor. Resolving names to a slot (exact key, alias, then fuzzy match)
+    is memoized, so the hot path is a cached dict hit plus an array index. `factors_for` resolves each distinct
+    name pair once and gathers all rows with a single index operation.
+    """
+
+    def __init__(self, rows: Sequence[tuple[str, str | None, float, Sequence[str]]]) -> None:
+        self._state_ids: dict[str, int] = {}
+        self._district_ids: list[dict[str, int]] = []
+        factors = [DEFAULT_FACTOR]
+        state_slots: list[int] = []
+        spelled: dict[tuple[int, str], str] = {}
+
+        def register(ids: dict[str, int], scope: int, name: str, value: int) -> None:
+            key = place_key(name)
+            if ids.get(key, value) != value:
+                raise ValueError(f"Agro-climate names {spelled[(scope, key)]!r} and {name!r} both normalize to {key!r}")
+            ids[key] = value
+            spelled.setdefault((scope, key), name)
+
+        for state, district, factor, aliases in rows:
+            if factor <= 0:
+                raise ValueError(f"Agro-climate factor must be positive: {state}/{district}={factor}")
+            state_id = self._state_ids.get(place_key(state))
+            if state_id is None:
+                state_id = len(state_slots)
+                register(self._state_ids, -1, state, state_id)
+                state_slots.append(len(factors))
+                factors.append(DEFAULT_FACTOR)
+                self._district_ids.append({})
+            if district:
+                for name in (district, *aliases):
+                    register(self._district_ids[state_id], state_id, name, len(factors))
+                factors.append(float(factor))
+            else:
+                factors[state_slots[state_id]] = float(factor)
+                for name in aliases:
+                    register(self._state_ids, -1, name, state_id)
+
+        self.factors = np.array(factors, dtype=np.float64)
+        self._state_slots = np.array(state_slots, dtype=np.int64)
+        self._slot = lru_cache(maxsize=65_536)(self._resolve)
+
+    @classmethod
+    def from_csv(cls, path: Path) -> AgroClimateTable:
+        """Columns `state,district,factor,aliases`; an empty district is the state-wide row and aliases are
+        `;`-separated alternative names for the row's district (or state)."""
+        with path.open(encoding="utf-8-sig", newline="") as handle:
+            rows = [
+                (
+                    row["state"],
+                    row.get("district") or None,
+                    float(row["factor"]),
+                    [alias.strip() for alias in (row.get("aliases") or "").split(";") if alias.strip()],
+                )
+                for row in csv.DictReader(handle)
+            ]
+        return cls(rows)
+
+    @staticmethod
+    def _match(key: str, ids: dict[str, int]) -> int | None:
+        if key in ids:
+            return ids[key]
+        close = difflib.get_close_matches(key, list(ids), n=1, cutoff=FUZZY_CUTOFF)
+        return ids[close[0]] if close else None
+
+    def _resolve(self, state: str, district: str) -> int:
+        state_id = self._match(place_key(state), self._state_ids) if state else None
+        if state_id is None:
+            return 0
+        if district:
+            slot = self._match(place_key(district), self._district_ids[state_id])
+            if slot is not None:
+                return slot
+        return int(self._state_slots[state_id])
+
+    def slot(self, state: str, district: str | None = None) -> int:
+        return self._slot(state, district or "")
+
+    def factor(self, state: str, district: str | None = None) -> float:
+        return float(self.factors[self._slot(state, district or "")])
+
+    def slots(self, states: Sequence[str], districts: Sequence[str | None] | None = None) -> np.ndarray:
+        """Vectorized `slot` for a column of states (and districts): each distinct pair is resolved once."""
+        state_codes, state_names = pd.factorize(np.asarray(states, dtype=object), use_na_sentinel=False)
+        if districts is None:
+            district_codes, district_names = np.zeros(len(state_codes), dtype=np.int64), np.array([""], dtype=object)
+        else:
+            district_codes, district_names = pd.factorize(np.asarray(districts, dtype=object), use_na_sentinel=False)
+        width = len(district_names)
+        pairs, codes = np.unique(state_codes * width + district_codes, return_inverse=True)
+        resolved = np.array(
+            [self._slot(_name(state_names[pair // width]), _name(district_names[pair % width])) for pair in pairs.tolist()],
+            dtype=np.int64,
+        )
+        return resolved[codes.reshape(-1)]
+
+    def factors_for(self, states: Sequence[str], districts: Sequence[str | None] | None = None) -> np.ndarray:
+        return self.factors[self.slots(states, districts)]
+
+
+@lru_cache(maxsize=1)
+def agro_climate_table() -> AgroClimateTable:
+    """Compiled once per process; set `AGRO_CLIMATE_TABLE_PATH` to serve a fuller table."""
+    path = Path(settings.agro_climate_table_path) if settings.agro_climate_table_path else DEFAULT_TABLE_PATH
+    return AgroClimateTable.from_csv(path)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import csv
+import json
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Any, Literal
+
+from pydantic import ValidationError
+
+from app.core.monitoring import metrics_store
+from app.models.schemas import FarmProfile, MrvBatchEstimateItem, MrvEstimateRequest, MrvEstimateResponse
+from app.services.data_quality import evaluate_columns, quality_scores, warnings_by_row
+from app.services.mrv_engine import estimate_annual_co2e_batch
+
+BulkFormat = Literal["ndjson", "csv"]
+
+# A single farm record is well under 1 KiB; anything this long is not a record and is skipped, not buffered.
+MAX_LINE_BYTES = 64 * 1024
+
+# CSV rows carry the profile fields flat next to the request fields; practices are separated by ";".
+CSV_PROFILE_FIELDS = tuple(FarmProfile.model_fields)
+CSV_COLUMNS = (*CSV_PROFILE_FIELDS, "practices", "baseline_yield_ton_per_hectare")
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+def validation_error_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+class RecordDecoder:
+    """Turns input lines into raw `MrvEstimateRequest` dicts. For CSV the first non-blank line is the header."""
+
+    def __init__(self, fmt: BulkFormat) -> None:
+        self.fmt = fmt
+        self._header: list[str] | None = None
+        self._header_error: str | None = None
+
+    def feed(self, line: str) -> dict[str, Any] | None:
+        """Decode one line; returns None for lines that carry no record (blank lines, the CSV header)."""
+        if not line.strip():
+            return None
+        if self.fmt == "ndjson":
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Each NDJSON line must be a JSON object")
+            return record
+
+        # Lines are split upstream, so quoted fields cannot contain newlines.
+        values = next(csv.reader([line]))
+        if self._header is None:
+            self._header = [name.strip() for name in values]
+            unknown = sorted(set(self._header) - set(CSV_COLUMNS))
+            if unknown:
+                # Results may already be streaming, so a bad header is reported on every row rather than raised once.
+                self._header_error = f"Invalid CSV header; unknown columns: {', '.join(unknown)}"
+            return None
+        if self._header_error:
+            raise ValueError(self._header_error)
+        if len(values) != len(self._header):
+            raise ValueError(f"Expected {len(self._header)} CSV fields, got {len(values)}")
+        return _csv_record(dict(zip(self._header, values)))
+
+
+def _csv_record(row: dict[str, str]) -> dict[str, Any]:
+    # Empty optional cells fall back to the schema defaults instead of failing validation.
+    profile = {name: row[name] for name in CSV_PROFILE_FIELDS if row.get(name, "") != ""}
+    practices = [practice.strip() for practice in row.get("practices", "").split(";") if practice.strip()]
+    return {
+        "profile": profile,
+        "practices": practices,
+        "baseline_yield_ton_per_hectare": row.get("baseline_yield_ton_per_hectare"),
+    }
+
+
+def _quality_columns(items: list[MrvEstimateRequest]) -> dict[str, list[float]]:
+    return {
+        "farm_size_hectares": [item.profile.farm_size_hectares for item in items],
+        "baseline_yield_ton_per_hectare": [item.baseline_yield_ton_per_hectare for item in items],
+        "soil_organic_carbon_pct": [item.profile.soil_organic_carbon_pct for item in items],
+        "practice_count": [len(item.practices) for item in items],
+    }
+
+
+def score_records(records: list[dict[str, Any] | Exception], start_index: int = 0) -> list[MrvBatchEstimateItem]:
+    """Validate a chunk of raw records and score the valid ones in one vectorized call.
+
+    Entries that are exceptions (lines that failed to decode) and records that fail validation are reported
+    in place with an error, so output indexes always line up with input records.
+    """
+    results = [MrvBatchEstimateItem(index=start_index + offset) for offset in range(len(records))]
+    valid_offsets: list[int] = []
+    valid_items: list[MrvEstimateRequest] = []
+
+    for offset, raw in enumerate(records):
+        if isinstance(raw, Exception):
+            results[offset].error = str(raw) or type(raw).__name__
+            continue
+        try:
+            valid_items.append(MrvEstimateRequest.model_validate(raw))
+            valid_offsets.append(offset)
+        except ValidationError as exc:
+            results[offset].error = validation_error_message(exc)
+
+    estimates = estimate_annual_co2e_batch(valid_items)
+    rules, violations = evaluate_columns(_quality_columns(valid_items))
+    scores = quality_scores(rules, violations).tolist()
+    rows = zip(valid_offsets, estimates, warnings_by_row(rules, violations), scores)
+    for offset, (estimate, confidence, explanation, model_version), warnings, quality_score in rows:
+        metrics_store.record_model_usage(model_version)
+        results[offset].result = MrvEstimateResponse(
+            estimated_annual_co2e_tons=estimate,
+            confidence_score=confidence,
+            data_quality_score=quality_score,
+            data_quality_warnings=warnings,
+            mrv_method="hybrid_model_inference",
+            model_version=model_version,
+            explanation=explanation,
+        )
+    return results
+
+
+class RecordChunker:
+    """Groups decoded records into chunks of at most `chunk_size`; decode failures stay in place as exceptions."""
+
+    def __init__(self, fmt: BulkFormat, chunk_size: int) -> None:
+        self.chunk_size = chunk_size
+        self._decoder = RecordDecoder(fmt)
+        self._chunk: list[dict[str, Any] | Exception] = []
+
+    def push(self, line: str | Exception) -> list[dict[str, Any] | Exception] | None:
+        """Add one line; returns a full chunk when one is ready."""
+        if isinstance(line, Exception):
+            self._chunk.append(line)
+        else:
+            try:
+                record = self._decoder.feed(line)
+            except ValueError as exc:  # includes json.JSONDecodeError
+                self._chunk.append(exc)
+            else:
+                if record is not None:
+                    self._chunk.append(record)
+        return self.flush() if len(self._chunk) >= self.chunk_size else None
+
+    def flush(self) -> list[dict[str, Any] | Exception] | None:
+        chunk, self._chunk = self._chunk, []
+        return chunk or None
+
+
+def iter_scored(lines: Iterable[str], fmt: BulkFormat, chunk_size: int = 500) -> Iterator[MrvBatchEstimateItem]:
+    """Score an arbitrarily long line stream holding at most one chunk of records in memory."""
+    chunker = RecordChunker(fmt, chunk_size)
+    index = 0
+    for line in lines:
+        chunk = chunker.push(line.rstrip("\r\n"))
+        if chunk:
+            yield from score_records(chunk, start_index=index)
+            index += len(chunk)
+    chunk = chunker.flush()
+    if chunk:
+        yield from score_records(chunk, start_index=index)
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[str | Exception]:
+    """Split a byte stream into decoded lines without holding more than one partial line.
+
+    A line longer than `max_line_bytes` is yielded as a `LineTooLong` error and the rest of it is discarded.
+    """
+    pending = b""
+    skipping = False
+    async for data in chunks:
+        lines = (pending + data).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if skipping:
+                # Tail of an oversized line that was already reported.
+                skipping = False
+                continue
+            yield _decode_line(line, max_line_bytes)
+        if len(pending) > max_line_bytes:
+            if not skipping:
+                yield LineTooLong(f"Line exceeds {max_line_bytes} bytes")
+                skipping = True
+            pending = b""
+    if pending and not skipping:
+        yield _decode_line(pending, max_line_bytes)
+
+
+def _decode_line(line: bytes, max_line_bytes: int) -> str | Exception:
+    if len(line) > max_line_bytes:
+        return LineTooLong(f"Line exceeds {max_line_bytes} bytes")
+    try:
+        return line.decode("utf-8-sig").rstrip("\r")
+    except UnicodeDecodeError as exc:
+        return ValueError(f"Line is not valid UTF-8: {exc.reason}")
+
+
+def detect_format(content_type: str | None) -> BulkFormat:
+    return "csv" if content_type and "csv" in content_type.lower() else "ndjson"
@@ -1,29 +1,131 @@
 from __future__ import annotations
 
+import operator
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
 from app.models.schemas import FarmProfile, PracticeType
 
+Severity = Literal["info", "warning", "critical"]
 
-def quality_warnings(profile: FarmProfile, practices: list[PracticeType], baseline_yield: float) -> list[str]:
-    warnings: list[str] = []
+# Score penalty per triggered rule. Critical rules also drop the row from model training.
+SEVERITY_PENALTY: dict[Severity, float] = {"info": 0.04, "warning": 0.08, "critical": 0.25}
+BASE_SCORE = 0.95
+MIN_SCORE = 0.45
+
+_OPERATORS: dict[str, Callable] = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+@dataclass(frozen=True)
+class QualityRule:
+    field: str
+    op: Literal[">", ">=", "<", "<="]
+    threshold: float
+    severity: Severity
+    message: str
 
-    if profile.farm_size_hectares > 8:
-        warnings.append("Farm size exceeds typical smallholder range; verify land parcel data.")
+    @property
+    def label(self) -> str:
+        return f"{self.field}{self.op}{self.threshold:g}"
 
-    if baseline_yield < 1.2:
-        warnings.append("Very low baseline yield detected; confirm crop and seasonal context.")
+    def violated(self, value):
+        """Works on a scalar or element-wise on an array/Series of the field."""
+        return _OPERATORS[self.op](value, self.threshold)
 
-    if baseline_yield > 7.5:
-        warnings.append("High baseline yield detected; check units and source records.")
 
-    if profile.soil_organic_carbon_pct < 0.4:
-        warnings.append("Low soil organic carbon value; consider retesting soil sample.")
+# Fields: the three numeric profile/yield inputs plus `practice_count`. Rules whose field is absent from a
+# frame (training data has no practice count) are skipped there.
+QUALITY_RULES: tuple[QualityRule, ...] = (
+    QualityRule(
+        "farm_size_hectares", ">", 8, "warning",
+        "Farm size exceeds typical smallholder range; verify land parcel data.",
+    ),
+    QualityRule(
+        "farm_size_hectares", ">", 100, "critical",
+        "Farm size above 100 ha is outside smallholder scope; check area units (acres or square metres).",
+    ),
+    QualityRule(
+        "baseline_yield_ton_per_hectare", "<", 1.2, "warning",
+        "Very low baseline yield detected; confirm crop and seasonal context.",
+    ),
+    QualityRule(
+        "baseline_yield_ton_per_hectare", ">", 7.5, "warning",
+        "High baseline yield detected; check units and source records.",
+    ),
+    QualityRule(
+        "baseline_yield_ton_per_hectare", ">", 15, "critical",
+        "Baseline yield above 15 t/ha is implausible; likely recorded in kg or quintals.",
+    ),
+    QualityRule(
+        "soil_organic_carbon_pct", "<", 0.4, "warning",
+        "Low soil organic carbon value; consider retesting soil sample.",
+    ),
+    QualityRule(
+        "soil_organic_carbon_pct", ">", 6, "critical",
+        "Soil organic carbon above 6% is atypical for cropland; check lab units (% vs g/kg).",
+    ),
+    QualityRule(
+        "practice_count", "<", 2, "info",
+        "Single practice selected; confidence improves with richer management data.",
+    ),
+)  # fmt: skip
 
-    if len(practices) < 2:
-        warnings.append("Single practice selected; confidence improves with richer management data.")
+_PENALTY_BY_MESSAGE = {rule.message: SEVERITY_PENALTY[rule.severity] for rule in QUALITY_RULES}
 
-    return warnings
+
+def quality_fields(profile: FarmProfile, practices: list[PracticeType], baseline_yield: float) -> dict[str, float]:
+    return {
+        "farm_size_hectares": profile.farm_size_hectares,
+        "baseline_yield_ton_per_hectare": baseline_yield,
+        "soil_organic_carbon_pct": profile.soil_organic_carbon_pct,
+        "practice_count": len(practices),
+    }
+
+
+def quality_warnings(profile: FarmProfile, practices: list[PracticeType], baseline_yield: float) -> list[str]:
+    fields = quality_fields(profile, practices, baseline_yield)
+    return [rule.message for rule in QUALITY_RULES if rule.violated(fields[rule.field])]
 
 
 def quality_score_from_warnings(warnings: list[str]) -> float:
-    score = max(0.45, 0.95 - (0.08 * len(warnings)))
-    return round(score, 2)
+    penalty = sum(_PENALTY_BY_MESSAGE.get(warning, SEVERITY_PENALTY["warning"]) for warning in warnings)
+    return round(max(MIN_SCORE, BASE_SCORE - penalty), 2)
+
+
+def applicable_rules(columns: Mapping[str, object], rules: Sequence[QualityRule] = QUALITY_RULES) -> list[QualityRule]:
+    return [rule for rule in rules if rule.field in columns]
+
+
+def evaluate_columns(
+    columns: Mapping[str, Sequence[float] | np.ndarray], rules: Sequence[QualityRule] | None = None
+) -> tuple[list[QualityRule], np.ndarray]:
+    """Evaluate the rule table column-wise over a DataFrame (or a dict of arrays).
+
+    Returns the rules that could be evaluated and an (n_rows, n_rules) boolean matrix of violations; each
+    rule is a single vectorized comparison over its column.
+    """
+    rules = applicable_rules(columns, QUALITY_RULES if rules is None else rules)
+    values = {field: np.asarray(columns[field], dtype=np.float64) for field in {rule.field for rule in rules}}
+    n_rows = len(next(iter(values.values()))) if values else len(getattr(columns, "index", ()))
+    violations = np.zeros((n_rows, len(rules)), dtype=bool)
+    for index, rule in enumerate(rules):
+        violations[:, index] = rule.violated(values[rule.field])
+    return rules, violations
+
+
+def quality_scores(rules: Sequence[QualityRule], violations: np.ndarray) -> np.ndarray:
+    penalties = np.array([SEVERITY_PENALTY[rule.severity] for rule in rules], dtype=np.float64)
+    return np.round(np.maximum(MIN_SCORE, BASE_SCORE - violations @ penalties), 2)
+
+
+def critical_rows(rules: Sequence[QualityRule], violations: np.ndarray) -> np.ndarray:
+    """Boolean mask of rows that break at least one critical rule."""
+    critical = np.array([rule.severity == "critical" for rule in rules], dtype=bool)
+    return violations[:, critical].any(axis=1)
+
+
+def warnings_by_row(rules: Sequence[QualityRule], violations: np.ndarray) -> list[list[str]]:
+    return [[rules[index].message for index in np.flatnonzero(row)] for row in violations]
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+
+import numpy as np
+
+Estimate = tuple[float, float, str, str]
+
+# Features are rounded before keying so float noise from upstream parsing (2.4 vs 2.4000000000000004) still hits.
+KEY_DECIMALS = 6
+
+
+def estimate_keys(version: str, features: np.ndarray, practice_counts: Sequence[int]) -> list[Hashable]:
+    """Cache keys for rows of a `FEATURE_COLUMNS` matrix.
+
+    A key is the model version, the rounded feature vector and the practice count (heuristic confidence
+    depends on it). Practice order is already gone from the features (`practice_score` is a sum), and
+    identifiers such as `farmer_id` never reach the feature matrix, so no PII ends up in a key.
+    """
+    rows = np.round(features, KEY_DECIMALS).tolist()
+    return [(version, *row, int(count)) for row, count in zip(rows, practice_counts)]
+
+
+class EstimateCache:
+    """Bounded LRU of MRV estimates whose entries also expire after `ttl_seconds`. `maxsize=0` disables it."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Estimate]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[Hashable]) -> list[Estimate | None]:
+        if not self.maxsize:
+            return [None] * len(keys)
+        now = self._clock()
+        found: list[Estimate | None] = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self._entries[key]
+                    entry = None
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                found.append(None if entry is None else entry[1])
+        return found
+
+    def put_many(self, keys: Sequence[Hashable], values: Sequence[Estimate]) -> None:
+        if not self.maxsize:
+            return
+        expires = self._clock() + self.ttl_seconds
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
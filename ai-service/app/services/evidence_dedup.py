@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import fcntl
+import logging
+import math
+import os
+import threading
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.monitoring import metrics_store
+
+logger = logging.getLogger("agri-trust.ai.evidence")
+
+METRES_PER_DEGREE = 111_320.0
+# Longitude cells are sized for this latitude, where a degree of longitude is shortest among the latitudes
+# we hash, so a cell is always at least the radius wide and the 3x3 neighbourhood covers it up to 60 degrees.
+_MIN_LONGITUDE_SCALE = math.cos(math.radians(60))
+
+
+@dataclass(frozen=True)
+class EvidencePoint:
+    farmer_id: str
+    latitude: float
+    longitude: float
+    soil_organic_carbon_pct: float
+
+
+def distance_m(a: EvidencePoint, b: EvidencePoint) -> float:
+    """Equirectangular distance at the pair's mean latitude; accurate to well under a metre at these radii."""
+    scale = math.cos(math.radians((a.latitude + b.latitude) / 2))
+    return math.hypot((a.longitude - b.longitude) * scale, a.latitude - b.latitude) * METRES_PER_DEGREE
+
+
+def _cell(point: EvidencePoint, radius_m: float) -> tuple[int, int]:
+    return (
+        math.floor(point.longitude * METRES_PER_DEGREE * _MIN_LONGITUDE_SCALE / radius_m),
+        math.floor(point.latitude * METRES_PER_DEGREE / radius_m),
+    )
+
+
+class DuplicateEvidenceDetector:
+    """Flags evidence that reuses another farmer's GPS point or soil test.
+
+    Two spatial hashes over a sliding window of recent submissions:
+    - GPS grid: cells at least `gps_radius_m` wide; a point collides with any other farmer's point within that radius.
+      This is an issue: the evidence should not be accepted.
+    - Soil grid: cells at least `soil_radius_m` wide, crossed with soil readings bucketed by `soil_tolerance`; a reading
+      collides with another farmer's reading within the tolerance in the same area. A lab value reused for
+      a neighbour's plot shows up here even when the GPS points were moved apart. Labs report soil organic
+      carbon to two decimals, so honest neighbours often share a value; a soil match is only a warning
+      for the verifier.
+    A lookup only visits the 3x3 (GPS) or 3x3x3 (soil) neighbouring buckets, so checking a submission costs
+    the same however large the window is. The oldest submissions are evicted once `window` are held, and a
+    farmer resubmitting an identical point does not add a second entry.
+    """
+
+    def __init__(
+        self,
+        window: int = 100_000,
+        gps_radius_m: float = 15.0,
+        soil_radius_m: float = 500.0,
+        soil_tolerance: float = 0.005,
+    ) -> None:
+        self.window = window
+        self.gps_radius_m = gps_radius_m
+        self.soil_radius_m = soil_radius_m
+        self.soil_tolerance = soil_tolerance
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            # Insertion-ordered, so the first key is always the oldest submission.
+            self._points: dict[int, EvidencePoint] = {}
+            self._ids: dict[EvidencePoint, int] = {}
+            self._gps_cells: dict[tuple[int, int], set[int]] = defaultdict(set)
+            self._soil_cells: dict[tuple[int, int, int], set[int]] = defaultdict(set)
+            self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _soil_key(self, point: EvidencePoint) -> tuple[int, int, int]:
+        return (*_cell(point, self.soil_radius_m), math.floor(point.soil_organic_carbon_pct / self.soil_tolerance))
+
+    def _colliding_farmers(self, point: EvidencePoint) -> tuple[set[str], set[str]]:
+        gps: set[str] = set()
+        gx, gy = _cell(point, self.gps_radius_m)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for entry_id in self._gps_cells.get((gx + dx, gy + dy), ()):
+                    other = self._points[entry_id]
+                    if other.farmer_id != point.farmer_id and distance_m(point, other) <= self.gps_radius_m:
+                        gps.add(other.farmer_id)
+
+        soil: set[str] = set()
+        sx, sy, sv = self._soil_key(point)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dv in (-1, 0, 1):
+                    for entry_id in self._soil_cells.get((sx + dx, sy + dy, sv + dv), ()):
+                        other = self._points[entry_id]
+                        if (
+                            other.farmer_id != point.farmer_id
+                            and abs(other.soil_organic_carbon_pct - point.soil_organic_carbon_pct) <= self.soil_tolerance
+                            and distance_m(point, other) <= self.soil_radius_m
+                        ):
+                            soil.add(other.farmer_id)
+        return gps, soil
+
+    def _add(self, point: EvidencePoint) -> None:
+        if point in self._ids:
+            return
+        entry_id = self._next_id
+        self._next_id += 1
+        self._points[entry_id] = point
+        self._ids[point] = entry_id
+        self._gps_cells[_cell(point, self.gps_radius_m)].add(entry_id)
+        self._soil_cells[self._soil_key(point)].add(entry_id)
+        while len(self._points) > self.window:
+            self._evict(next(iter(self._points)))
+
+    def _evict(self, entry_id: int) -> None:
+        point = self._points.pop(entry_id)
+        del self._ids[point]
+        for cells, key in (
+            (self._gps_cells, _cell(point, self.gps_radius_m)),
+            (self._soil_cells, self._soil_key(point)),
+        ):
+            bucket = cells[key]
+            bucket.discard(entry_id)
+            if not bucket:
+                del cells[key]
+
+    def _findings(self, gps: set[str], soil: set[str]) -> tuple[list[str], list[str]]:
+        issues: list[str] = []
+        warnings: list[str] = []
+        if gps:
+            issues.append(
+                f"GPS point reused: within {self.gps_radius_m:g} m of evidence submitted for "
+                f"{len(gps)} other farmer ID(s)."
+            )
+        if soil:
+            warnings.append(
+                f"Soil test appears reused: same soil organic carbon reading (within {self.soil_tolerance:g}) as "
+                f"{len(soil)} other farmer ID(s) within {self.soil_radius_m:g} m."
+            )
+        return issues, warnings
+
+    def check(
+        self, points: Iterable[EvidencePoint], record: bool | Sequence[bool] = True, record_flagged: bool = True
+    ) -> list[tuple[list[str], list[str]]]:
+        """`(issues, warnings)` for each submission, in order; each one is compared with the window and the
+        earlier recorded items.
+
+        `record` says which submissions join the window (all, none, or per item). With `record_flagged=False`,
+        a submission with an issue is not recorded either, so rejected evidence never flags later farmers.
+        """
+        results: list[tuple[list[str], list[str]]] = []
+        gps_hits = soil_hits = clean = 0
+        with self._lock:
+            for row, point in enumerate(points):
+                gps, soil = self._colliding_farmers(point)
+                gps_hits += bool(gps)
+                soil_hits += bool(soil)
+                clean += not (gps or soil)
+                results.append(self._findings(gps, soil))
+                keep = record if isinstance(record, bool) else record[row]
+                if keep and (record_flagged or not gps):
+                    self._add(point)
+        metrics_store.record_evidence_duplicates(gps_hits, soil_hits, clean)
+        return results
+
+    def rescan(self, points: Iterable[EvidencePoint]) -> Iterator[tuple[int, list[str], list[str]]]:
+        """One linear pass over a historical dataset (in submission order), yielding `(row, issues, warnings)`
+        for every flagged row. Rows stream through the window, so memory stays bounded by `window`."""
+        for row, point in enumerate(points):
+            ((issues, warnings),) = self.check([point])
+            if issues or warnings:
+                yield row, issues, warnings
+
+    def merge(self, other: DuplicateEvidenceDetector) -> None:
+        """Add `other`'s window after this one (oldest first), skipping submissions already held."""
+        with other._lock:
+            points = list(other._points.values())
+        with self._lock:
+            for point in points:
+                self._add(point)
+
+    def save(self, path: Path) -> None:
+        """Persist the window (oldest first) so a restart does not forget recent submissions. The file is
+        replaced atomically, so a reader never sees a partial one."""
+        with self._lock:
+            points = list(self._points.values())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as handle:
+            np.savez(
+                handle,
+                farmer_id=np.array([point.farmer_id for point in points], dtype=str),
+                latitude=np.array([point.latitude for point in points], dtype=np.float64),
+                longitude=np.array([point.longitude for point in points], dtype=np.float64),
+                soil_organic_carbon_pct=np.array([point.soil_organic_carbon_pct for point in points], dtype=np.float64),
+            )
+        os.replace(tmp_path, path)
+
+    def load(self, path: Path) -> int:
+        """Replace the window with a saved one; returns the number of submissions loaded."""
+        with np.load(path, allow_pickle=False) as arrays:
+            columns = [arrays[name].tolist() for name in ("farmer_id", "latitude", "longitude", "soil_organic_carbon_pct")]
+        self.clear()
+        with self._lock:
+            for farmer_id, latitude, longitude, soil in zip(*columns):
+                self._add(EvidencePoint(farmer_id, latitude, longitude, soil))
+        return len(self._points)
+
+
+def load_duplicate_detector(detector: DuplicateEvidenceDetector) -> None:
+    if not settings.evidence_dedup_state_path:
+        return
+    path = Path(settings.evidence_dedup_state_path)
+    if not path.exists():
+        return
+    try:
+        logger.info("evidence_dedup_loaded submissions=%s", detector.load(path))
+    except (OSError, ValueError, KeyError):
+        logger.exception("evidence_dedup_load_failed path=%s", path)
+
+
+def save_duplicate_detector(detector: DuplicateEvidenceDetector) -> None:
+    """Fold this worker's window into the shared snapshot.
+
+    Each uvicorn worker holds its own window and saves it at shutdown. Under an exclusive lock on a sidecar
+    file, the saved snapshot is loaded and this window merged on top, so a worker saving last keeps the
+    submissions the others saved.
+    """
+    if not settings.evidence_dedup_state_path:
+        return
+    path = Path(settings.evidence_dedup_state_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.with_name(path.name + ".lock").open("a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        merged = DuplicateEvidenceDetector(
+            window=detector.window,
+            gps_radius_m=detector.gps_radius_m,
+            soil_radius_m=detector.soil_radius_m,
+            soil_tolerance=detector.soil_tolerance,
+        )
+        if path.exists():
+            try:
+                merged.load(path)
+            except (OSError, ValueError, KeyError):
+                logger.exception("evidence_dedup_load_failed path=%s", path)
+        merged.merge(detector)
+        merged.save(path)
+        logger.info("evidence_dedup_saved submissions=%s", len(merged))
+
+
+duplicate_detector = DuplicateEvidenceDetector(
+    window=settings.evidence_dedup_window,
+    gps_radius_m=settings.evidence_dedup_gps_radius_m,
+    soil_radius_m=settings.evidence_dedup_soil_radius_m,
+    soil_tolerance=settings.evidence_dedup_soil_tolerance,
+)
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.models.schemas import EvidenceStatus, EvidenceTransitionRequest, EvidenceTransitionResponse
+from app.services.evidence_workflow import validate_transition
+
+# Evidence the store has never seen is treated as freshly submitted by the farmer app.
+INITIAL_STATUS: EvidenceStatus = "submitted"
+
+
+@dataclass(frozen=True)
+class EvidenceState:
+    evidence_id: str
+    status: EvidenceStatus
+    version: int
+
+
+@dataclass(frozen=True)
+class TransitionLogEntry:
+    evidence_id: str
+    from_status: EvidenceStatus
+    to_status: EvidenceStatus
+    version: int
+    actor: str
+    note: str | None
+    created_at: float
+
+
+class EvidenceStore(ABC):
+    """Evidence workflow state with optimistic concurrency.
+
+    Every applied transition bumps the evidence's `version` with a compare-and-swap, so two verifiers acting
+    on the same version cannot both succeed, and is appended to a transition log.
+    """
+
+    @abstractmethod
+    def get(self, evidence_id: str) -> EvidenceState: ...
+
+    @abstractmethod
+    def apply(
+        self, requests: Sequence[EvidenceTransitionRequest], actor: str, atomic: bool = False
+    ) -> list[EvidenceTransitionResponse]:
+        """Apply transitions in order within one transaction. With `atomic`, any rejection rolls back all."""
+
+    @abstractmethod
+    def history(self, evidence_id: str) -> list[TransitionLogEntry]: ...
+
+
+class SqliteEvidenceStore(EvidenceStore):
+    """Embedded SQLite store; `":memory:"` for tests and local runs, a file path to persist across restarts.
+
+    State lookups go through the `evidence_id` primary key. One connection is shared behind a lock, and each
+    batch runs in a `BEGIN IMMEDIATE` transaction, so other processes sharing the file wait rather than
+    interleave; the version check in the UPDATE still guards against a concurrent writer.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS evidence_state (
+                    evidence_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS evidence_transition_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    evidence_id TEXT NOT NULL,
+                    from_status TEXT NOT NULL,
+                    to_status TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    actor TEXT NOT NULL,
+                    note TEXT,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS evidence_transition_log_evidence
+                    ON evidence_transition_log (evidence_id, id);
+                -- The log is append-only.
+                CREATE TRIGGER IF NOT EXISTS evidence_transition_log_no_update
+                    BEFORE UPDATE ON evidence_transition_log
+                    BEGIN SELECT RAISE(ABORT, 'evidence_transition_log is append-only'); END;
+                CREATE TRIGGER IF NOT EXISTS evidence_transition_log_no_delete
+                    BEFORE DELETE ON evidence_transition_log
+                    BEGIN SELECT RAISE(ABORT, 'evidence_transition_log is append-only'); END;
+                """
+            )
+
+    def _state(self, evidence_id: str) -> EvidenceState:
+        row = self._conn.execute(
+            "SELECT status, version FROM evidence_state WHERE evidence_id = ?", (evidence_id,)
+        ).fetchone()
+        if row is None:
+            return EvidenceState(evidence_id, INITIAL_STATUS, 0)
+        return EvidenceState(evidence_id, row[0], row[1])
+
+    def get(self, evidence_id: str) -> EvidenceState:
+        with self._lock:
+            return self._state(evidence_id)
+
+    def _swap(self, current: EvidenceState, to_status: EvidenceStatus, now: float) -> bool:
+        if current.version == 0:
+            cursor = self._conn.execute(
+                "INSERT INTO evidence_state (evidence_id, status, version, updated_at) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT (evidence_id) DO NOTHING",
+                (current.evidence_id, to_status, now),
+            )
+        else:
+            cursor = self._conn.execute(
+                "UPDATE evidence_state SET status = ?, version = version + 1, updated_at = ? "
+                "WHERE evidence_id = ? AND version = ?",
+                (to_status, now, current.evidence_id, current.version),
+            )
+        return cursor.rowcount == 1
+
+    def _apply_one(self, request: EvidenceTransitionRequest, actor: str, now: float) -> EvidenceTransitionResponse:
+        current = self._state(request.evidence_id)
+        if request.expected_version is not None and request.expected_version != current.version:
+            # The client decided on a state that no longer exists; report that rather than the workflow rule.
+            allowed, message = False, f"Version conflict: expected {request.expected_version}, current is {current.version}"
+        else:
+            allowed, message = validate_transition(current.status, request.to_status)
+        if allowed and not self._swap(current, request.to_status, now):
+            allowed, message = False, "Version conflict: evidence was updated concurrently"
+
+        version = current.version
+        if allowed:
+            version += 1
+            self._conn.execute(
+                "INSERT INTO evidence_transition_log "
+                "(evidence_id, from_status, to_status, version, actor, note, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (request.evidence_id, current.status, request.to_status, version, actor, request.note, now),
+            )
+        return EvidenceTransitionResponse(
+            evidence_id=request.evidence_id,
+            from_status=current.status,
+            to_status=request.to_status,
+            allowed=allowed,
+            message=message,
+            version=version,
+        )
+
+    def apply(
+        self, requests: Sequence[EvidenceTransitionRequest], actor: str, atomic: bool = False
+    ) -> list[EvidenceTransitionResponse]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                results = [self._apply_one(request, actor, now) for request in requests]
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            if atomic and not all(result.allowed for result in results):
+                self._conn.execute("ROLLBACK")
+                # Report what each item would have done, but nothing was persisted.
+                rolled_back = "Rolled back: another transition in the batch was rejected"
+                return [
+                    result.model_copy(
+                        update={
+                            "allowed": False,
+                            "message": result.message if not result.allowed else rolled_back,
+                            "version": self._state(result.evidence_id).version,
+                        }
+                    )
+                    for result in results
+                ]
+            self._conn.execute("COMMIT")
+        return results
+
+    def history(self, evidence_id: str) -> list[TransitionLogEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT evidence_id, from_status, to_status, version, actor, note, created_at "
+                "FROM evidence_transition_log WHERE evidence_id = ? ORDER BY id",
+                (evidence_id,),
+            ).fetchall()
+        return [TransitionLogEntry(*row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+evidence_store: EvidenceStore = SqliteEvidenceStore(settings.evidence_db_path)
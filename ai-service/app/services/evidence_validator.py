@@ -1,16 +1,149 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.evidence_dedup import EvidencePoint, duplicate_detector
+from app.services.geo_index import DEFAULT_BOUNDARIES_PATH, BoundaryIndex
+
+OUTSIDE_INDIA = "Coordinates appear outside India bounds."
+SOIL_OUT_OF_RANGE = "Soil organic carbon value must be between 0 and 10."
+
+
+@lru_cache(maxsize=1)
+def boundary_index() -> BoundaryIndex:
+    path = Path(settings.geo_boundaries_path) if settings.geo_boundaries_path else DEFAULT_BOUNDARIES_PATH
+    return BoundaryIndex.from_file(path)
+
 
 def coordinates_in_india(latitude: float, longitude: float) -> bool:
-    return 6.0 <= latitude <= 38.0 and 68.0 <= longitude <= 98.0
+    """Inside India's land boundary (simplified polygons, plus the boundary tolerance), not just its bounding box."""
+    index = boundary_index()
+    lats, lons = np.array([latitude], dtype=np.float64), np.array([longitude], dtype=np.float64)
+    return bool(_in_country(index, index.locate(lats, lons).country, lats, lons)[0])
+
+
+def _in_country(index: BoundaryIndex, found_ids: np.ndarray, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Points inside a country polygon, or outside it by no more than the boundary tolerance."""
+    inside = found_ids >= 0
+    rows = np.flatnonzero(~inside & np.isfinite(lats) & np.isfinite(lons))
+    countries = [region for region, info in enumerate(index.regions) if info.level == "country"]
+    if len(rows) and countries:
+        # The outline is simplified; a coastal farm just beyond it is far likelier than one at sea.
+        distance = np.min([index.distance_km(region, lats[rows], lons[rows]) for region in countries], axis=0)
+        inside[rows[distance <= settings.geo_boundary_tolerance_km]] = True
+    return inside
+
+
+def _region_id(index: BoundaryIndex, level: str, name: str | None, state: str | None) -> int:
+    region = index.region_id(level, name, state) if name else None
+    return -1 if region is None else region
+
+
+def _claim_mismatches(
+    index: BoundaryIndex,
+    claimed_ids: np.ndarray,
+    found_ids: np.ndarray,
+    lats: np.ndarray,
+    lons: np.ndarray,
+) -> np.ndarray:
+    """Points whose claimed region is known but which lie outside it by more than the boundary tolerance."""
+    mismatch = (claimed_ids >= 0) & (found_ids != claimed_ids)
+    for region in np.unique(claimed_ids[mismatch]).tolist():
+        rows = np.flatnonzero(mismatch & (claimed_ids == region))
+        # Boundaries are simplified; a farm a few km across the line is more likely our outline than fraud.
+        near = index.distance_km(region, lats[rows], lons[rows]) <= settings.geo_boundary_tolerance_km
+        mismatch[rows[near]] = False
+    return mismatch
+
+
+def validate_evidence_batch(
+    latitudes: Sequence[float],
+    longitudes: Sequence[float],
+    soil_test_values: Sequence[float],
+    states: Sequence[str | None] | None = None,
+    districts: Sequence[str | None] | None = None,
+    farmer_ids: Sequence[str] | None = None,
+) -> list[tuple[bool, list[str], list[str]]]:
+    """Validate many evidence points at once: one grid-indexed polygon lookup for the whole batch.
+
+    Returns `(valid, issues, warnings)` per point; only issues make evidence invalid. A claimed state (and
+    district within it) is only checked when the boundary file has a polygon for it, and a mismatch is a
+    warning: the bundled polygons are simplified and misplace real border towns. With `farmer_ids`, the
+    points are also checked for reuse of another farmer's GPS point (an issue) or soil reading (a warning),
+    and points that pass validation are recorded with the duplicate detector.
+    """
+    index = boundary_index()
+    count = len(latitudes)
+    lats = np.asarray(latitudes, dtype=np.float64)
+    lons = np.asarray(longitudes, dtype=np.float64)
+    soil = np.asarray(soil_test_values, dtype=np.float64)
+    states = list(states) if states is not None else [None] * count
+    districts = list(districts) if districts is not None else [None] * count
+
+    found = index.locate(lats, lons)
+    in_india = _in_country(index, found.country, lats, lons)
+    state_ids = np.array([_region_id(index, "state", state, None) for state in states], dtype=np.int64)
+    district_ids = np.array(
+        [_region_id(index, "district", district, state) for state, district in zip(states, districts)], dtype=np.int64
+    )
+    state_ids[~in_india] = -1
+    district_ids[~in_india] = -1
+
+    wrong_state = _claim_mismatches(index, state_ids, found.state, lats, lons)
+    district_ids[wrong_state] = -1
+    wrong_district = _claim_mismatches(index, district_ids, found.district, lats, lons)
+    bad_soil = (soil < 0) | (soil > 10)
+    passed = in_india & ~bad_soil
+    duplicates = (
+        # Only evidence that is accepted joins the window, so rejected or corrected submissions never flag others.
+        duplicate_detector.check(
+            (
+                EvidencePoint(farmer_id, lat, lon, value)
+                for farmer_id, lat, lon, value in zip(farmer_ids, lats.tolist(), lons.tolist(), soil.tolist())
+            ),
+            record=passed.tolist(),
+            record_flagged=False,
+        )
+        if farmer_ids is not None
+        else [([], []) for _ in range(count)]
+    )
+
+    results: list[tuple[bool, list[str], list[str]]] = []
+    for row in range(count):
+        issues: list[str] = []
+        if not in_india[row]:
+            issues.append(OUTSIDE_INDIA)
+        if bad_soil[row]:
+            issues.append(SOIL_OUT_OF_RANGE)
+        duplicate_issues, duplicate_warnings = duplicates[row]
+        issues.extend(duplicate_issues)
+        warnings: list[str] = []
+        if wrong_state[row]:
+            warnings.append(_mismatch_message("state", states[row], index, found.state[row]))
+        if wrong_district[row]:
+            warnings.append(_mismatch_message("district", districts[row], index, found.district[row]))
+        warnings.extend(duplicate_warnings)
+        results.append((not issues, issues, warnings))
+    return results
 
 
-def validate_evidence_payload(latitude: float, longitude: float, soil_test_value: float) -> tuple[bool, list[str]]:
-    issues: list[str] = []
+def _mismatch_message(level: str, claimed: str | None, index: BoundaryIndex, found: int) -> str:
+    where = f"; they fall in {index.regions[found].name}" if found >= 0 else ""
+    return f"Coordinates are not in the claimed {level} {claimed}{where}."
 
-    if not coordinates_in_india(latitude, longitude):
-        issues.append("Coordinates appear outside India bounds.")
-    if soil_test_value < 0 or soil_test_value > 10:
-        issues.append("Soil organic carbon value must be between 0 and 10.")
 
-    return len(issues) == 0, issues
+def validate_evidence_payload(
+    latitude: float,
+    longitude: float,
+    soil_test_value: float,
+    state: str | None = None,
+    district: str | None = None,
+    farmer_id: str | None = None,
+) -> tuple[bool, list[str], list[str]]:
+    farmer_ids = None if farmer_id is None else [farmer_id]
+    return validate_evidence_batch([latitude], [longitude], [soil_test_value], [state], [district], farmer_ids)[0]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+FOREST_FORMAT_VERSION = 1
+_NODE_ARRAYS = ("feature", "threshold", "children", "value", "roots")
+
+# Rows scored per traversal pass; bounds the (rows x trees) node-index scratch arrays for large batches.
+_CHUNK_ROWS = 4096
+
+
+@dataclass(frozen=True)
+class CompiledForest:
+    """Array-backed regression forest evaluated with NumPy instead of sklearn's per-call dispatch.
+
+    All trees are flattened into one node table. `children[node]` holds the (right, left) child ids so the
+    split outcome indexes it directly. Leaves point at themselves on both sides, so every row can walk
+    `max_depth` steps without masking and still end on its leaf.
+    """
+
+    feature: np.ndarray
+    threshold: np.ndarray
+    children: np.ndarray
+    value: np.ndarray
+    roots: np.ndarray
+    max_depth: int
+    n_features: int
+
+    @property
+    def n_trees(self) -> int:
+        return int(self.roots.shape[0])
+
+    @property
+    def left(self) -> np.ndarray:
+        return self.children[:, 1]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.children[:, 0]
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> CompiledForest:
+        estimators = getattr(model, "estimators_", None) or [model]
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("Only single-output regression forests can be compiled")
+
+        features: list[np.ndarray] = []
+        thresholds: list[np.ndarray] = []
+        lefts: list[np.ndarray] = []
+        rights: list[np.ndarray] = []
+        values: list[np.ndarray] = []
+        roots: list[int] = []
+        max_depth = 0
+        offset = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count, dtype=np.intp) + offset
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            thresholds.append(tree.threshold.astype(np.float64))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+            max_depth = max(max_depth, int(tree.max_depth))
+            offset += tree.node_count
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.stack([np.concatenate(rights), np.concatenate(lefts)], axis=1).astype(np.intp),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=int(model.n_features_in_),
+        )
+
+    def save(self, directory: Path) -> None:
+        """Write one `.npy` file per node array plus a JSON header, so `load` can memory-map them.
+
+        Running workers may have the previous files mapped; truncating those in place makes their next read fault
+        with SIGBUS. Each file is therefore written beside its target and swapped in with `os.replace`, which
+        leaves the old inode intact for anyone still mapping it.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in _NODE_ARRAYS:
+            tmp_path = directory / f"{name}.npy.tmp"
+            with tmp_path.open("wb") as handle:
+                np.save(handle, np.ascontiguousarray(getattr(self, name)), allow_pickle=False)
+            os.replace(tmp_path, directory / f"{name}.npy")
+        header = {
+            "format_version": FOREST_FORMAT_VERSION,
+            "max_depth": self.max_depth,
+            "n_features": self.n_features,
+            "n_trees": self.n_trees,
+            "n_nodes": int(self.feature.shape[0]),
+        }
+        tmp_path = directory / "forest.json.tmp"
+        tmp_path.write_text(json.dumps(header, indent=2), encoding="utf-8")
+        os.replace(tmp_path, directory / "forest.json")
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> CompiledForest:
+        """Open a saved forest. With `mmap=True` node arrays stay file-backed and are shared via the page cache."""
+        header = json.loads((directory / "forest.json").read_text(encoding="utf-8"))
+        if header.get("format_version") != FOREST_FORMAT_VERSION:
+            raise ValueError(f"Unsupported forest format version: {header.get('format_version')}")
+
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False) for name in _NODE_ARRAYS}
+        return cls(**arrays, max_depth=int(header["max_depth"]), n_features=int(header["n_features"]))
+
+    def predict(self, X: Any) -> np.ndarray:
+        # sklearn trees compare float32 inputs against float64 thresholds; casting the same way keeps parity exact.
+        rows = np.ascontiguousarray(X, dtype=np.float32)
+        if rows.ndim != 2 or rows.shape[1] != self.n_features:
+            raise ValueError(f"Expected input of shape (n, {self.n_features}), got {rows.shape}")
+
+        if rows.shape[0] <= _CHUNK_ROWS:
+            return self._predict_chunk(rows)
+        return np.concatenate(
+            [self._predict_chunk(rows[start : start + _CHUNK_ROWS]) for start in range(0, rows.shape[0], _CHUNK_ROWS)]
+        )
+
+    def _predict_chunk(self, rows: np.ndarray) -> np.ndarray:
+        n_rows = rows.shape[0]
+        flat_rows = rows.ravel()
+        row_base = (np.arange(n_rows, dtype=np.intp) * self.n_features)[:, None]
+        children = self.children.ravel()
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+
+        for _ in range(self.max_depth):
+            go_left = np.take(flat_rows, row_base + np.take(self.feature, nodes)) <= np.take(self.threshold, nodes)
+            nodes = np.take(children, nodes * 2 + go_left)
+
+        # sklearn accumulates tree outputs one tree at a time; cumsum keeps that summation order.
+        totals = np.cumsum(np.take(self.value, nodes), axis=1)[:, -1]
+        return totals / self.n_trees
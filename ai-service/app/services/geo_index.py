@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+import math
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_BOUNDARIES_PATH = Path(__file__).resolve().parent.parent / "data" / "india_boundaries.geojson"
+LEVELS = ("country", "state", "district")
+KM_PER_DEGREE = 111.32
+
+
+def region_key(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+
+@dataclass(frozen=True)
+class _Part:
+    """One polygon (outer ring plus holes) of a region, flattened into edge arrays for even-odd ray casting."""
+
+    region: int
+    x1: np.ndarray
+    y1: np.ndarray
+    x2: np.ndarray
+    y2: np.ndarray
+    bbox: tuple[float, float, float, float]
+
+    @classmethod
+    def from_rings(cls, region: int, rings: Sequence[Sequence[Sequence[float]]]) -> _Part:
+        starts, ends = [], []
+        for ring in rings:
+            points = np.asarray(ring, dtype=np.float64)[:, :2]
+            starts.append(points)
+            ends.append(np.roll(points, -1, axis=0))
+        start, end = np.concatenate(starts), np.concatenate(ends)
+        bbox = (start[:, 0].min(), start[:, 1].min(), start[:, 0].max(), start[:, 1].max())
+        return cls(region, start[:, 0], start[:, 1], end[:, 0], end[:, 1], tuple(float(v) for v in bbox))
+
+    def contains(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        x, y = lons[:, None], lats[:, None]
+        crosses = (self.y1 > y) != (self.y2 > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_at_y = self.x1 + (y - self.y1) * (self.x2 - self.x1) / (self.y2 - self.y1)
+        return np.count_nonzero(crosses & (x < x_at_y), axis=1) % 2 == 1
+
+    def distance_km(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """Distance to the nearest edge in a local equirectangular projection; accurate enough at ~10 km."""
+        scale = np.cos(np.radians(lats))[:, None]
+        px, py = lons[:, None] * scale, lats[:, None]
+        ax, ay, bx, by = self.x1 * scale, self.y1, self.x2 * scale, self.y2
+        dx, dy = bx - ax, by - ay
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = np.clip(((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy), 0.0, 1.0)
+        t = np.nan_to_num(t)
+        return np.hypot(px - (ax + t * dx), py - (ay + t * dy)).min(axis=1) * KM_PER_DEGREE
+
+
+@dataclass(frozen=True)
+class Region:
+    level: str
+    name: str
+    state: str | None
+
+
+@dataclass(frozen=True)
+class Locations:
+    """Per-point lookup result: region ids per level (-1 when the point is in no region of that level)."""
+
+    country: np.ndarray
+    state: np.ndarray
+    district: np.ndarray
+
+
+class BoundaryIndex:
+    """Point-in-polygon lookup over country/state/district boundaries, bucketed on a regular lon/lat grid.
+
+    At build time every grid cell records the polygons whose bounding box reaches it, and whether the cell
+    lies wholly inside the polygon (no edge passes through it). A lookup only looks at its own cell's
+    entries and only ray-casts against polygons whose boundary crosses the cell, so the per-point cost
+    depends on local boundary density rather than on the total number of polygons.
+    """
+
+    def __init__(self, regions: Sequence[Region], parts: Sequence[_Part], cell_degrees: float = 0.5) -> None:
+        self.regions = tuple(regions)
+        self.parts = tuple(parts)
+        self.cell_degrees = cell_degrees
+        self._by_name = {(region.level, region_key(region.name), region_key(region.state or "")): index
+                         for index, region in enumerate(self.regions)}  # fmt: skip
+        self._levels = np.array([LEVELS.index(region.level) for region in self.regions], dtype=np.int64)
+
+        if parts:
+            self._lon0 = min(part.bbox[0] for part in parts)
+            self._lat0 = min(part.bbox[1] for part in parts)
+            self._nx = int(math.floor((max(part.bbox[2] for part in parts) - self._lon0) / cell_degrees)) + 1
+            self._ny = int(math.floor((max(part.bbox[3] for part in parts) - self._lat0) / cell_degrees)) + 1
+        else:
+            self._lon0 = self._lat0 = 0.0
+            self._nx = self._ny = 0
+        # cell id -> [(part id, needs exact test)], then flattened CSR-style so lookups are pure array work.
+        cells: dict[int, list[tuple[int, bool]]] = defaultdict(list)
+        for part_id, part in enumerate(self.parts):
+            self._bucket(cells, part_id, part)
+        entries = [(cell, part_id, exact) for cell in sorted(cells) for part_id, exact in cells[cell]]
+        counts = np.bincount([cell for cell, _, _ in entries], minlength=self._nx * self._ny)
+        self._cell_start = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._entry_part = np.array([part_id for _, part_id, _ in entries], dtype=np.int64)
+        self._entry_exact = np.array([exact for _, _, exact in entries], dtype=bool)
+
+        self._part_region = np.array([part.region for part in self.parts], dtype=np.int64)
+        self._part_level = self._levels[self._part_region] if parts else np.empty(0, dtype=np.int64)
+        edge_counts = [len(part.x1) for part in self.parts]
+        self._edge_start = np.concatenate([[0], np.cumsum(edge_counts)]).astype(np.int64)
+        self._edges = tuple(
+            np.concatenate([getattr(part, name) for part in self.parts]) if parts else np.empty(0)
+            for name in ("x1", "y1", "x2", "y2")
+        )
+
+    def _bucket(self, cells: dict[int, list[tuple[int, bool]]], part_id: int, part: _Part) -> None:
+        size = self.cell_degrees
+        x_from, x_to = (int(math.floor((v - self._lon0) / size)) for v in (part.bbox[0], part.bbox[2]))
+        y_from, y_to = (int(math.floor((v - self._lat0) / size)) for v in (part.bbox[1], part.bbox[3]))
+        cx, cy = np.meshgrid(np.arange(x_from, x_to + 1), np.arange(y_from, y_to + 1), indexing="ij")
+        cx, cy = cx.ravel(), cy.ravel()
+        left, bottom = self._lon0 + cx * size, self._lat0 + cy * size
+
+        # An edge can only touch a cell its bounding box overlaps; that conservative test is enough to
+        # decide which cells need ray casting.
+        edge_left, edge_right = np.minimum(part.x1, part.x2), np.maximum(part.x1, part.x2)
+        edge_bottom, edge_top = np.minimum(part.y1, part.y2), np.maximum(part.y1, part.y2)
+        crossed = (
+            (edge_left[None, :] <= left[:, None] + size)
+            & (edge_right[None, :] >= left[:, None])
+            & (edge_bottom[None, :] <= bottom[:, None] + size)
+            & (edge_top[None, :] >= bottom[:, None])
+        ).any(axis=1)
+        centre_inside = part.contains(left + size / 2, bottom + size / 2)
+
+        for x, y, exact, inside in zip(cx.tolist(), cy.tolist(), crossed.tolist(), centre_inside.tolist()):
+            if exact or inside:
+                cells[x * self._ny + y].append((part_id, exact))
+
+    @classmethod
+    def from_geojson(cls, data: dict, cell_degrees: float = 0.5) -> BoundaryIndex:
+        regions: list[Region] = []
+        parts: list[_Part] = []
+        for feature in data["features"]:
+            properties = feature["properties"]
+            if properties.get("level") not in LEVELS:
+                raise ValueError(f"Boundary feature level must be one of {LEVELS}: {properties}")
+            region_id = len(regions)
+            regions.append(Region(properties["level"], properties["name"], properties.get("state")))
+            geometry = feature["geometry"]
+            polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+            parts.extend(_Part.from_rings(region_id, rings) for rings in polygons)
+        return cls(regions, parts, cell_degrees)
+
+    @classmethod
+    def from_file(cls, path: Path, cell_degrees: float = 0.5) -> BoundaryIndex:
+        return cls.from_geojson(json.loads(path.read_text(encoding="utf-8")), cell_degrees)
+
+    def region_id(self, level: str, name: str, state: str | None = None) -> int | None:
+        return self._by_name.get((level, region_key(name), region_key(state or "")))
+
+    def locate(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> Locations:
+        lats = np.asarray(latitudes, dtype=np.float64)
+        lons = np.asarray(longitudes, dtype=np.float64)
+        found = np.full((len(LEVELS), len(lats)), -1, dtype=np.int64)
+        if not len(lats) or not self.parts:
+            return Locations(*found)
+
+        cx = np.floor((lons - self._lon0) / self.cell_degrees).astype(np.int64)
+        cy = np.floor((lats - self._lat0) / self.cell_degrees).astype(np.int64)
+        on_grid = (cx >= 0) & (cx < self._nx) & (cy >= 0) & (cy < self._ny) & np.isfinite(lats) & np.isfinite(lons)
+        points = np.flatnonzero(on_grid)
+        if not len(points):
+            return Locations(*found)
+        cells = cx[points] * self._ny + cy[points]
+
+        # Expand every point into (point, candidate part) pairs from its cell's entries.
+        starts, counts = self._cell_start[cells], self._cell_start[cells + 1] - self._cell_start[cells]
+        pair_point = np.repeat(points, counts)
+        pair_entry = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(len(pair_point))
+        pair_part = self._entry_part[pair_entry]
+        inside = ~self._entry_exact[pair_entry]
+        exact = np.flatnonzero(~inside)
+        inside[exact] = self._ray_cast(lons[pair_point[exact]], lats[pair_point[exact]], pair_part[exact])
+
+        # Overlapping parts of one level: the first part in file order wins.
+        no_part = len(self.parts)
+        for level in range(len(LEVELS)):
+            hits = inside & (self._part_level[pair_part] == level)
+            best = np.full(len(lats), no_part, dtype=np.int64)
+            np.minimum.at(best, pair_point[hits], pair_part[hits])
+            located = best < no_part
+            found[level, located] = self._part_region[best[located]]
+        return Locations(*found)
+
+    def _ray_cast(self, lons: np.ndarray, lats: np.ndarray, part_ids: np.ndarray, chunk_edges: int = 1 << 20) -> np.ndarray:
+        """Even-odd test of each (point, part) pair against that part's edges, in bounded-size chunks."""
+        inside = np.zeros(len(part_ids), dtype=bool)
+        edge_counts = self._edge_start[part_ids + 1] - self._edge_start[part_ids]
+        edges_before = np.concatenate([[0], np.cumsum(edge_counts)])
+        begin = 0
+        while begin < len(part_ids):
+            end = max(int(np.searchsorted(edges_before, edges_before[begin] + chunk_edges, side="right")) - 1, begin + 1)
+            counts = edge_counts[begin:end]
+            pair = np.repeat(np.arange(end - begin), counts)
+            edge = np.repeat(self._edge_start[part_ids[begin:end]] - np.cumsum(counts) + counts, counts) + np.arange(len(pair))
+            x1, y1, x2, y2 = (values[edge] for values in self._edges)
+            x, y = lons[begin:end][pair], lats[begin:end][pair]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                crosses = ((y1 > y) != (y2 > y)) & (x < x1 + (y - y1) * (x2 - x1) / (y2 - y1))
+            inside[begin:end] = np.bincount(pair, weights=crosses, minlength=end - begin) % 2 == 1
+            begin = end
+        return inside
+
+    def distance_km(self, region: int, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        parts = [part for part in self.parts if part.region == region]
+        return np.min([part.distance_km(longitudes, latitudes) for part in parts], axis=0)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.services.text_normalization import normalize_transcript
+
+DEFAULT_LEXICON_PATH = Path(__file__).resolve().parent.parent / "data" / "intent_lexicon.json"
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher: finds every occurrence of every pattern in one pass over the text.
+
+    States are stored as parallel lists; `outputs[state]` already includes the patterns reachable through
+    failure links, so matching never walks the failure chain to report a hit.
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: list[str] = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._outputs: list[tuple[int, ...]] = [()]
+
+        for pattern_id, pattern in enumerate(patterns):
+            if not pattern:
+                raise ValueError("Empty patterns are not allowed")
+            self.patterns.append(pattern)
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                state = next_state
+            self._outputs[state] += (pattern_id,)
+
+        self._link()
+
+    def _link(self) -> None:
+        # Breadth-first, so a state's failure target is always finalized before the state itself.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._outputs[child] += self._outputs[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield `(end_index, pattern_id)` for every occurrence, overlapping ones included."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in outputs[state]:
+                yield index, pattern_id
+
+    def matched_ids(self, text: str) -> set[int]:
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: set[int] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+@dataclass(frozen=True)
+class IntentSpec:
+    name: str
+    confidence: float
+    response_text: str
+    keywords: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    intent: str
+    confidence: float
+    response_text: str
+    matched_keywords: tuple[str, ...]
+
+
+class IntentLexicon:
+    """Keyword intents compiled once into a token index plus a substring automaton.
+
+    Transcripts and keywords go through the same `normalize_transcript` pipeline, so script, case and
+    Romanization variants of a keyword need only one entry. Keywords are found by token lookup. A keyword
+    token of `PREFIX_MIN_LENGTH` or more characters also matches longer words that start with it
+    ("recommend" matches "recommendations"). The substring automaton runs only when no token matches.
+
+    Intents are listed in priority order: when a transcript hits several, `best` returns the first one,
+    which is how the hand-written keyword checks behaved.
+    """
+
+    PREFIX_MIN_LENGTH = 4
+
+    def __init__(self, intents: Sequence[IntentSpec], fallback: IntentMatch) -> None:
+        self.intents = tuple(intents)
+        self.fallback = fallback
+        self._keywords: list[str] = []
+        self._keyword_intent: list[int] = []
+        # First token -> (keyword tokens, keyword id) for every keyword starting with that token.
+        self._index: dict[str, list[tuple[tuple[str, ...], int]]] = {}
+        folded: list[str] = []
+        for intent_index, spec in enumerate(self.intents):
+            for keyword in spec.keywords:
+                normalized = normalize_transcript(keyword)
+                if not normalized.tokens:
+                    continue
+                keyword_id = len(self._keywords)
+                self._keywords.append(keyword.strip())
+                self._keyword_intent.append(intent_index)
+                self._index.setdefault(normalized.tokens[0], []).append((normalized.tokens, keyword_id))
+                folded.append(normalized.text)
+        self._automaton = AhoCorasick(folded)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> IntentLexicon:
+        intents = [
+            IntentSpec(
+                name=item["name"],
+                confidence=float(item["confidence"]),
+                response_text=item["response_text"],
+                keywords=tuple(item["keywords"]),
+            )
+            for item in data["intents"]
+        ]
+        fallback = data["fallback"]
+        return cls(
+            intents,
+            IntentMatch(
+                intent=fallback["name"],
+                confidence=float(fallback["confidence"]),
+                response_text=fallback["response_text"],
+                matched_keywords=(),
+            ),
+        )
+
+    @classmethod
+    def from_file(cls, path: Path) -> IntentLexicon:
+        return cls.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+    @property
+    def keyword_count(self) -> int:
+        return len(self._keywords)
+
+    def _token_matches(self, token: str, keyword_token: str) -> bool:
+        return token == keyword_token or (
+            len(keyword_token) >= self.PREFIX_MIN_LENGTH and token.startswith(keyword_token)
+        )
+
+    def _indexed_ids(self, tokens: tuple[str, ...]) -> set[int]:
+        found: set[int] = set()
+        index = self._index
+        for position, token in enumerate(tokens):
+            heads = [token] + [
+                token[:length] for length in range(self.PREFIX_MIN_LENGTH, len(token)) if token[:length] in index
+            ]
+            for head in heads:
+                for keyword_tokens, keyword_id in index.get(head, ()):
+                    following = tokens[position + 1 : position + len(keyword_tokens)]
+                    if len(following) == len(keyword_tokens) - 1 and all(
+                        self._token_matches(word, keyword_token)
+                        for word, keyword_token in zip(following, keyword_tokens[1:])
+                    ):
+                        found.add(keyword_id)
+        return found
+
+    def match(self, transcript: str) -> list[IntentMatch]:
+        """Every intent with at least one keyword in the transcript, in priority order."""
+        normalized = normalize_transcript(transcript)
+        keyword_ids = self._indexed_ids(normalized.tokens) or self._automaton.matched_ids(normalized.text)
+
+        hits: dict[int, list[str]] = {}
+        for keyword_id in sorted(keyword_ids):
+            hits.setdefault(self._keyword_intent[keyword_id], []).append(self._keywords[keyword_id])
+
+        return [
+            IntentMatch(
+                intent=self.intents[index].name,
+                confidence=self.intents[index].confidence,
+                response_text=self.intents[index].response_text,
+                matched_keywords=tuple(keywords),
+            )
+            for index, keywords in sorted(hits.items())
+        ]
+
+    def best(self, transcript: str) -> IntentMatch:
+        matches = self.match(transcript)
+        return matches[0] if matches else self.fallback
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.model_registry import ARTIFACT_DIR, LoadedModel, ModelRegistry
+from app.services.text_normalization import normalize_transcript
+
+INTENT_MODEL_PATH = ARTIFACT_DIR / "intent_model.npz"
+INTENT_META_PATH = ARTIFACT_DIR / "intent_model_meta.json"
+INTENT_VERSIONS_DIR = ARTIFACT_DIR / "intent"
+
+KEYWORD_INTENT_VERSION = "keyword_lexicon_v1"
+
+
+@dataclass(frozen=True)
+class HashedNgramFeaturizer:
+    """Character n-grams of the normalized transcript, hashed into a fixed number of buckets.
+
+    Hashing needs no vocabulary file, and working on `normalize_transcript` output means Devanagari and
+    Romanized spellings of a word share features.
+    """
+
+    n_features: int = 2**14
+    ngram_min: int = 2
+    ngram_max: int = 4
+
+    def features(self, transcript: str) -> tuple[np.ndarray, np.ndarray]:
+        """Bucket ids and L2-normalized counts for one transcript."""
+        _, indices, values = self.transform([transcript])
+        return indices, values
+
+    def transform(self, transcripts: Sequence[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR-style (row ids, bucket ids, values) for a batch; also what the training script feeds to scipy."""
+        row_ids: list[int] = []
+        buckets: list[np.ndarray] = []
+        for row, transcript in enumerate(transcripts):
+            for token in normalize_transcript(transcript).tokens:
+                token_buckets = _token_buckets(token, self.n_features, self.ngram_min, self.ngram_max)
+                buckets.append(token_buckets)
+                row_ids.extend([row] * len(token_buckets))
+        if not buckets:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, np.empty(0, dtype=np.float32)
+
+        # One unique() over (row, bucket) keys counts every transcript's n-grams at once.
+        keys, counts = np.unique(
+            np.asarray(row_ids, dtype=np.int64) * self.n_features + np.concatenate(buckets), return_counts=True
+        )
+        rows, indices = np.divmod(keys, self.n_features)
+        values = counts.astype(np.float32)
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=len(transcripts)))
+        return rows, indices, (values / norms[rows]).astype(np.float32)
+
+
+@lru_cache(maxsize=65_536)
+def _token_buckets(token: str, n_features: int, ngram_min: int, ngram_max: int) -> np.ndarray:
+    # N-grams stay within a word (padded with spaces, like sklearn's "char_wb"), so a word always maps to
+    # the same buckets and can be memoized; farmers' vocabulary is small and repeats across utterances.
+    text = f" {token} "
+    return np.array(
+        [
+            zlib.crc32(text[start : start + n].encode("utf-8")) % n_features
+            for n in range(ngram_min, ngram_max + 1)
+            for start in range(len(text) - n + 1)
+        ],
+        dtype=np.int64,
+    )
+
+
+class IntentClassifier:
+    """Multinomial linear model over hashed n-grams; scoring a batch is one gather and one sum per class."""
+
+    def __init__(
+        self, weights: np.ndarray, bias: np.ndarray, classes: Sequence[str], featurizer: HashedNgramFeaturizer
+    ) -> None:
+        if weights.shape != (featurizer.n_features, len(classes)) or bias.shape != (len(classes),):
+            raise ValueError(
+                f"Intent model shapes {weights.shape}/{bias.shape} do not match "
+                f"{featurizer.n_features} features and {len(classes)} classes"
+            )
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.classes = tuple(classes)
+        self.featurizer = featurizer
+
+    def predict_proba(self, transcripts: Sequence[str]) -> np.ndarray:
+        rows, indices, values = self.featurizer.transform(transcripts)
+        contributions = self.weights[indices] * values[:, None]
+        scores = np.column_stack(
+            [np.bincount(rows, weights=contributions[:, k], minlength=len(transcripts)) for k in range(len(self.classes))]
+        )
+        scores += self.bias
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def save(self, model_path: Path) -> None:
+        np.savez(model_path, weights=self.weights, bias=self.bias, classes=np.array(self.classes))
+
+    @classmethod
+    def load(cls, model_path: Path, metadata: dict) -> IntentClassifier:
+        featurizer = HashedNgramFeaturizer(
+            n_features=int(metadata["n_features"]),
+            ngram_min=int(metadata["ngram_min"]),
+            ngram_max=int(metadata["ngram_max"]),
+        )
+        with np.load(model_path, allow_pickle=False) as arrays:
+            return cls(arrays["weights"], arrays["bias"], [str(name) for name in arrays["classes"]], featurizer)
+
+
+def load_intent_artifact(directory: Path) -> LoadedModel:
+    model_path = directory / "intent_model.npz"
+    meta_path = directory / "intent_model_meta.json"
+    if not (model_path.exists() and meta_path.exists()):
+        return LoadedModel(
+            model=None,
+            metadata={"model_version": KEYWORD_INTENT_VERSION},
+            version=KEYWORD_INTENT_VERSION,
+            source=directory,
+        )
+
+    metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+    model = IntentClassifier.load(model_path, metadata)
+    version = str(metadata.get("model_version", "intent_model_unknown"))
+    return LoadedModel(model=model, metadata=metadata, version=version, source=directory)
+
+
+intent_registry = ModelRegistry(
+    versions_dir=INTENT_VERSIONS_DIR,
+    legacy_dir=ARTIFACT_DIR,
+    loader=load_intent_artifact,
+    legacy_files=(INTENT_META_PATH, INTENT_MODEL_PATH),
+    poll_seconds=settings.intent_model_poll_seconds,
+)
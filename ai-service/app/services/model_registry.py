@@ -1,26 +1,274 @@
 from __future__ import annotations
 
 import json
-from functools import lru_cache
+import logging
+import os
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import joblib
 
+from app.core.config import settings
+from app.services.forest_inference import CompiledForest
+
+logger = logging.getLogger("agri-trust.ai.registry")
+
 ARTIFACT_DIR = Path(__file__).resolve().parent.parent / "models" / "artifacts"
 MODEL_PATH = ARTIFACT_DIR / "mrv_model.joblib"
 META_PATH = ARTIFACT_DIR / "mrv_model_meta.json"
+FOREST_DIR = ARTIFACT_DIR / "mrv_forest"
+
+# Versioned layout: mrv/<version>/{mrv_model_meta.json, mrv_forest/, mrv_model.joblib} plus mrv/manifest.json
+# naming the version to serve. Without a manifest the flat files above are served.
+MRV_VERSIONS_DIR = ARTIFACT_DIR / "mrv"
+MANIFEST_NAME = "manifest.json"
+
+HEURISTIC_MODEL_VERSION = "heuristic_v1_india_smallholder"
+
+# Column order the MRV model is trained on (see ml/train_mrv_model.py); online feature arrays follow it.
+FEATURE_COLUMNS = [
+    "farm_size_hectares",
+    "state_factor",
+    "soil_organic_carbon_pct",
+    "baseline_yield_ton_per_hectare",
+    "practice_score",
+]
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """A model and the metadata it was published with; always read and swapped as one unit."""
+
+    model: Any | None
+    metadata: dict[str, Any] = field(default_factory=dict)
+    version: str = HEURISTIC_MODEL_VERSION
+    source: Path | None = None
+
+
+# Optional satellite-derived columns (see app/services/raster_features.py). A model trained with them lists them
+# after FEATURE_COLUMNS in its metadata, and online scoring then appends them to the feature matrix.
+RASTER_FEATURE_COLUMNS = ["ndvi_mean", "rainfall_mm_mean"]
+FEATURE_LAYOUTS = (FEATURE_COLUMNS, FEATURE_COLUMNS + RASTER_FEATURE_COLUMNS)
+
+
+def model_feature_columns(metadata: dict[str, Any]) -> list[str]:
+    return list(metadata.get("feature_columns", FEATURE_COLUMNS))
+
+
+def prepare_mrv_model(model: Any, metadata: dict[str, Any]) -> Any:
+    """Check the artifact's feature layout once so the hot path can pass bare float64 arrays."""
+    columns = model_feature_columns(metadata)
+    if columns not in FEATURE_LAYOUTS:
+        raise ValueError(
+            f"MRV model feature columns {columns} do not match expected {FEATURE_COLUMNS} "
+            f"(optionally followed by {RASTER_FEATURE_COLUMNS})"
+        )
+
+    n_features = getattr(model, "n_features_in_", getattr(model, "n_features", len(columns)))
+    if n_features != len(columns):
+        raise ValueError(f"MRV model expects {n_features} features, expected {len(columns)}")
+
+    fitted_names = getattr(model, "feature_names_in_", None)
+    if fitted_names is not None:
+        if list(fitted_names) != columns:
+            raise ValueError(f"MRV model was fitted on {list(fitted_names)}, expected {columns}")
+        # Names are verified above; dropping them skips sklearn's per-call name check for ndarray input.
+        del model.feature_names_in_
+    return model
+
+
+def load_mrv_artifact(directory: Path) -> LoadedModel:
+    """Load model and metadata from one artifact directory (flat legacy layout or a version folder)."""
+    meta_path = directory / "mrv_model_meta.json"
+    metadata = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+
+    # Prefer the memory-mapped node arrays; fall back to compiling the pickled sklearn forest.
+    if (directory / "mrv_forest" / "forest.json").exists():
+        model = prepare_mrv_model(CompiledForest.load(directory / "mrv_forest", mmap=True), metadata)
+    elif (directory / "mrv_model.joblib").exists():
+        model = CompiledForest.from_sklearn(prepare_mrv_model(joblib.load(directory / "mrv_model.joblib"), metadata))
+    else:
+        return LoadedModel(model=None, metadata={"model_version": HEURISTIC_MODEL_VERSION}, source=directory)
+
+    version = str(metadata.get("model_version", "mrv_model_unknown"))
+    return LoadedModel(model=model, metadata=metadata, version=version, source=directory)
+
+
+def publish_version(versions_dir: Path, version: str, key: str = "current") -> None:
+    """Point the manifest at `version`. The manifest is replaced atomically so watchers never see a partial file."""
+    manifest_path = versions_dir / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    manifest[key] = version
+
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+
+class ModelRegistry:
+    """Serves the active version of a model and hot-swaps it when the artifact manifest changes.
+
+    `current()` is a single attribute read, so request threads never block on a reload and always get a
+    model/metadata pair from the same version. Reloads happen on a background polling thread.
+    """
+
+    def __init__(
+        self,
+        versions_dir: Path,
+        legacy_dir: Path,
+        loader: Callable[[Path], LoadedModel],
+        legacy_files: Sequence[Path] = (),
+        poll_seconds: float = 30.0,
+    ) -> None:
+        self.versions_dir = versions_dir
+        self.legacy_dir = legacy_dir
+        self.legacy_files = tuple(legacy_files)
+        self.poll_seconds = poll_seconds
+        self._loader = loader
+        self._current: LoadedModel | None = None
+        self._candidate: LoadedModel | None = None
+        self._signature: tuple | None = None
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: threading.Thread | None = None
+        self._listeners: list[Callable[[LoadedModel], None]] = []
+
+    def current(self) -> LoadedModel:
+        snapshot = self._current
+        if snapshot is None:
+            self.refresh()
+            snapshot = self._current
+        return snapshot
+
+    def install(self, snapshot: LoadedModel) -> None:
+        """Swap in a loaded model; in-flight callers keep the snapshot they already hold."""
+        self._current = snapshot
+        for listener in list(self._listeners):
+            listener(snapshot)
+
+    def subscribe(self, listener: Callable[[LoadedModel], None]) -> None:
+        self._listeners.append(listener)
+
+    def refresh(self) -> bool:
+        """Reload if the manifest (or legacy artifact files) changed; returns True when a new version was swapped in."""
+        with self._load_lock:
+            signature = self._artifact_signature()
+            if self._current is not None and signature == self._signature:
+                return False
+
+            manifest = self._manifest()
+            artifact_dir = self._artifact_dir(manifest)
+            try:
+                snapshot = self._loader(artifact_dir)
+            except Exception:
+                if self._current is None:
+                    raise
+                logger.exception("model_reload_failed dir=%s", artifact_dir)
+                # Remember the broken signature so the watcher does not retry until the artifacts change again.
+                self._signature = signature
+                return False
+
+            previous = self._current
+            self._signature = signature
+            self._candidate = self._load_candidate(manifest)
+            self.install(snapshot)
+
+        if previous is not None:
+            logger.info("model_swapped from_version=%s to_version=%s", previous.version, snapshot.version)
+        return True
+
+    def candidate(self) -> LoadedModel | None:
+        """The version named by the manifest's `candidate` key, used for shadow and canary scoring."""
+        if self._current is None:
+            self.refresh()
+        return self._candidate
+
+    def install_candidate(self, snapshot: LoadedModel | None) -> None:
+        self._candidate = snapshot
+
+    def _load_candidate(self, manifest: dict[str, Any] | None) -> LoadedModel | None:
+        version = (manifest or {}).get("candidate")
+        if not version:
+            return None
+        try:
+            candidate = self._loader(self.versions_dir / str(version))
+        except Exception:
+            # A broken candidate must never take the primary down; shadow scoring just stays off.
+            logger.exception("candidate_load_failed version=%s", version)
+            return None
+        return candidate if candidate.model is not None else None
+
+    def start_watching(self) -> None:
+        if self.poll_seconds <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="model-registry-watch", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception:  # pragma: no cover - refresh already logs reload failures
+                logger.exception("model_watch_failed")
+
+    def _manifest(self) -> dict[str, Any] | None:
+        manifest_path = self.versions_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            return None
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    def _artifact_dir(self, manifest: dict[str, Any] | None) -> Path:
+        if manifest is None or not manifest.get("current"):
+            return self.legacy_dir
+        return self.versions_dir / str(manifest["current"])
+
+    def _artifact_signature(self) -> tuple:
+        # Cheap stat() calls only; the manifest is replaced atomically on publish so its mtime marks a new version.
+        manifest_path = self.versions_dir / MANIFEST_NAME
+        paths = [manifest_path] if manifest_path.exists() else list(self.legacy_files)
+
+        signature = []
+        for path in paths:
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+
+mrv_registry = ModelRegistry(
+    versions_dir=MRV_VERSIONS_DIR,
+    legacy_dir=ARTIFACT_DIR,
+    loader=load_mrv_artifact,
+    legacy_files=(META_PATH, MODEL_PATH, FOREST_DIR / "forest.json"),
+    poll_seconds=settings.mrv_model_poll_seconds,
+)
 
 
-@lru_cache(maxsize=1)
 def load_mrv_model() -> Any | None:
-    if not MODEL_PATH.exists():
-        return None
-    return joblib.load(MODEL_PATH)
+    return mrv_registry.current().model
 
 
-@lru_cache(maxsize=1)
 def load_mrv_metadata() -> dict[str, Any]:
-    if not META_PATH.exists():
-        return {"model_version": "heuristic_v1_india_smallholder"}
-    return json.loads(META_PATH.read_text(encoding="utf-8"))
+    return mrv_registry.current().metadata
+
+
+def warm_mrv_model() -> str | None:
+    """Load the MRV model ahead of the first request; returns its version, or None when serving the heuristic."""
+    snapshot = mrv_registry.current()
+    if snapshot.model is None:
+        return None
+    # One throwaway prediction faults in the root-level node pages and NumPy's code paths.
+    snapshot.model.predict([[0.0] * len(model_feature_columns(snapshot.metadata))])
+    return snapshot.version
@@ -1,9 +1,25 @@
 from __future__ import annotations
 
-import pandas as pd
+from collections.abc import Sequence
+from dataclasses import replace
 
-from app.models.schemas import FarmProfile, PracticeType
-from app.services.model_registry import load_mrv_metadata, load_mrv_model
+import numpy as np
+
+from app.core.config import settings
+from app.core.monitoring import metrics_store
+from app.models.schemas import FarmProfile, MrvEstimateRequest, PracticeType
+from app.services.agro_climate import agro_climate_table
+from app.services.estimate_cache import Estimate, EstimateCache, estimate_keys
+from app.services.model_registry import (
+    FEATURE_COLUMNS,
+    HEURISTIC_MODEL_VERSION,
+    RASTER_FEATURE_COLUMNS,
+    LoadedModel,
+    model_feature_columns,
+    mrv_registry,
+)
+from app.services.raster_features import raster_feature_matrix
+from app.services.shadow_scoring import ShadowJob, in_canary, shadow_scorer
 
 PRACTICE_FACTORS: dict[PracticeType, float] = {
     "no_till": 0.42,
@@ -16,69 +32,260 @@ PRACTICE_FACTORS: dict[PracticeType, float] = {
     "residue_retention": 0.33,
 }
 
-STATE_RAINFALL_FACTOR = {
-    "maharashtra": 1.03,
-    "punjab": 0.94,
-    "haryana": 0.95,
-    "uttar pradesh": 1.01,
-    "karnataka": 1.06,
-    "madhya pradesh": 1.02,
-    "rajasthan": 0.91,
-    "bihar": 1.05,
-}
-
 
-def _state_factor(state: str) -> float:
-    return STATE_RAINFALL_FACTOR.get(state.strip().lower(), 1.0)
+def _agro_climate_factor(profile: FarmProfile) -> float:
+    return agro_climate_table().factor(profile.state, profile.district)
 
 
 def _practice_score(practices: list[PracticeType]) -> float:
     return round(sum(PRACTICE_FACTORS[p] for p in practices), 4)
 
 
+HEURISTIC_EXPLANATION = (
+    "Hybrid estimation using farm size, district agro-climate proxy, soil carbon, and selected low-emission practices. "
+    "For carbon credit issuance, attach satellite + soil test evidence and third-party verification."
+)
+
+MODEL_EXPLANATION = (
+    "Model-based estimate generated from calibrated MRV features. "
+    "For issuance-grade accounting, combine with verification evidence and approved methodology."
+)
+
+
+# Estimates are a pure function of the model version and the feature vector, so repeated scoring of the same
+# farm (dashboard refreshes, offline sync) is served from memory. A model swap clears it.
+estimate_cache = EstimateCache(settings.mrv_estimate_cache_size, settings.mrv_estimate_cache_ttl_seconds)
+mrv_registry.subscribe(lambda _snapshot: estimate_cache.clear())
+
+
 def _heuristic_estimate(profile: FarmProfile, practices: list[PracticeType], baseline_yield: float) -> tuple[float, float, str]:
     factor_sum = _practice_score(practices)
-    rainfall_factor = _state_factor(profile.state)
+    rainfall_factor = _agro_climate_factor(profile)
     soil_factor = 1 + (profile.soil_organic_carbon_pct / 10)
     yield_factor = min(1.2, max(0.8, baseline_yield / 3.0))
 
     estimate = profile.farm_size_hectares * factor_sum * rainfall_factor * soil_factor * yield_factor
     confidence = min(0.95, 0.55 + 0.04 * len(practices))
-    explanation = (
-        "Hybrid estimation using farm size, state agro-climate proxy, soil carbon, and selected low-emission practices. "
-        "For carbon credit issuance, attach satellite + soil test evidence and third-party verification."
-    )
-    return round(estimate, 2), round(confidence, 2), explanation
+    return round(estimate, 2), round(confidence, 2), HEURISTIC_EXPLANATION
 
 
-def estimate_annual_co2e(
+def _heuristic_estimate_batch(features: np.ndarray, practice_counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `_heuristic_estimate` over a feature matrix in `FEATURE_COLUMNS` order."""
+    farm_size, state_factor, soil, baseline_yield, practice_score = features.T
+    soil_factor = 1 + (soil / 10)
+    yield_factor = np.clip(baseline_yield / 3.0, 0.8, 1.2)
+
+    estimates = farm_size * practice_score * state_factor * soil_factor * yield_factor
+    confidences = np.minimum(0.95, 0.55 + 0.04 * practice_counts)
+    return estimates, confidences
+
+
+class _HeuristicModel:
+    """`_heuristic_estimate_batch` behind a `predict` method, so a shadow job can re-score a heuristic primary."""
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return _heuristic_estimate_batch(features, np.zeros(len(features)))[0]
+
+
+def _feature_row(
     profile: FarmProfile, practices: list[PracticeType], baseline_yield: float
-) -> tuple[float, float, str, str]:
-    model = load_mrv_model()
-    metadata = load_mrv_metadata()
+) -> tuple[float, float, float, float, float]:
+    return (
+        profile.farm_size_hectares,
+        _agro_climate_factor(profile),
+        profile.soil_organic_carbon_pct,
+        baseline_yield,
+        _practice_score(practices),
+    )
+
+
+STATE_FACTOR_COLUMN = FEATURE_COLUMNS.index("state_factor")
+
 
-    if model is None:
-        estimate, confidence, explanation = _heuristic_estimate(profile, practices, baseline_yield)
-        return estimate, confidence, explanation, "heuristic_v1_india_smallholder"
+def encode_features(profile: FarmProfile, practices: list[PracticeType], baseline_yield: float) -> np.ndarray:
+    """Encode one farm as a contiguous (1, n_features) float64 array in `FEATURE_COLUMNS` order."""
+    return np.array([_feature_row(profile, practices, baseline_yield)], dtype=np.float64)
 
-    features = pd.DataFrame(
+
+def encode_feature_matrix(items: Sequence[MrvEstimateRequest]) -> np.ndarray:
+    """Encode many farms as a contiguous (n, n_features) float64 array in `FEATURE_COLUMNS` order."""
+    features = np.array(
         [
-            {
-                "farm_size_hectares": profile.farm_size_hectares,
-                "state_factor": _state_factor(profile.state),
-                "soil_organic_carbon_pct": profile.soil_organic_carbon_pct,
-                "baseline_yield_ton_per_hectare": baseline_yield,
-                "practice_score": _practice_score(practices),
-            }
-        ]
+            (
+                item.profile.farm_size_hectares,
+                0.0,
+                item.profile.soil_organic_carbon_pct,
+                item.baseline_yield_ton_per_hectare,
+                _practice_score(list(item.practices)),
+            )
+            for item in items
+        ],
+        dtype=np.float64,
+    ).reshape(len(items), len(FEATURE_COLUMNS))
+    # One vectorized lookup for the whole batch; each distinct (state, district) pair is resolved once.
+    features[:, STATE_FACTOR_COLUMN] = agro_climate_table().factors_for(
+        [item.profile.state for item in items], [item.profile.district for item in items]
     )
+    return features
+
+
+PRACTICE_SCORE_COLUMN = FEATURE_COLUMNS.index("practice_score")
+
+
+def encode_counterfactual_matrix(
+    profile: FarmProfile, practice_sets: Sequence[Sequence[PracticeType]], baseline_yield: float
+) -> np.ndarray:
+    """One farm repeated once per practice set; only the `practice_score` column differs between rows."""
+    features = np.repeat(encode_features(profile, [], baseline_yield), len(practice_sets), axis=0)
+    features[:, PRACTICE_SCORE_COLUMN] = [_practice_score(list(practices)) for practices in practice_sets]
+    return features
 
-    pred = float(model.predict(features)[0])
-    model_version = metadata.get("model_version", "mrv_model_unknown")
+
+def model_inputs(snapshot: LoadedModel, features: np.ndarray, profiles: Sequence[FarmProfile]) -> np.ndarray:
+    """The matrix `snapshot` is scored on: the `FEATURE_COLUMNS` features, followed by the raster columns when
+    the model was trained with them. Farms without coordinates or raster coverage get the training medians
+    recorded in the model metadata."""
+    if snapshot.model is None or len(model_feature_columns(snapshot.metadata)) == features.shape[1]:
+        return features
+    raster = raster_feature_matrix(profiles)
+    fill = snapshot.metadata.get("raster_fill_values", {})
+    for index, column in enumerate(RASTER_FEATURE_COLUMNS):
+        raster[np.isnan(raster[:, index]), index] = fill.get(column, 0.0)
+    return np.hstack([features, raster])
+
+
+def _model_confidence(metadata: dict) -> float:
     r2 = metadata.get("r2")
-    confidence = 0.72 if r2 is None else max(0.55, min(0.95, 0.5 + (float(r2) / 2)))
-    explanation = (
-        "Model-based estimate generated from calibrated MRV features. "
-        "For issuance-grade accounting, combine with verification evidence and approved methodology."
+    return 0.72 if r2 is None else max(0.55, min(0.95, 0.5 + (float(r2) / 2)))
+
+
+def _rollout_candidate(mode: str) -> LoadedModel | None:
+    if mode == "off":
+        return None
+    return mrv_registry.candidate()
+
+
+def _submit_shadow(
+    snapshot: LoadedModel, candidate: LoadedModel, features: np.ndarray, profiles: Sequence[FarmProfile]
+) -> None:
+    # The candidate may use a different feature layout (with or without raster columns) than the primary.
+    shadow_scorer.submit(
+        ShadowJob(
+            primary=snapshot if snapshot.model is not None else replace(snapshot, model=_HeuristicModel()),
+            primary_features=features,
+            candidate=candidate,
+            features=model_inputs(candidate, features[:, : len(FEATURE_COLUMNS)], profiles),
+        )
     )
-    return round(max(0.0, pred), 2), round(confidence, 2), explanation, str(model_version)
+
+
+def estimate_annual_co2e(
+    profile: FarmProfile,
+    practices: list[PracticeType],
+    baseline_yield: float,
+    rollout_mode: str | None = None,
+) -> tuple[float, float, str, str]:
+    """Estimate annual tCO2e for one farm.
+
+    `rollout_mode` (default `MRV_ROLLOUT_MODE`) controls the registry's candidate model: "shadow" returns the
+    primary estimate and scores the candidate in the background; "canary" additionally serves the candidate to
+    `MRV_CANARY_PERCENT` of farmers.
+    """
+    # One snapshot per call: a concurrent hot swap cannot pair this model with another version's metadata.
+    snapshot = mrv_registry.current()
+    mode = rollout_mode or settings.mrv_rollout_mode
+    candidate = _rollout_candidate(mode)
+    if candidate is not None and mode == "canary" and in_canary(profile.farmer_id, settings.mrv_canary_percent):
+        snapshot, candidate = candidate, None
+
+    with metrics_store.time_stage("feature_build"):
+        features = model_inputs(snapshot, encode_features(profile, practices, baseline_yield), [profile])
+    key = estimate_keys(snapshot.version, features, [len(practices)])[0]
+    result = estimate_cache.get_many([key])[0]
+    metrics_store.record_estimate_cache(hits=int(result is not None), misses=int(result is None))
+    if result is None:
+        if snapshot.model is None:
+            with metrics_store.time_stage("predict"):
+                estimate, confidence, explanation = _heuristic_estimate(profile, practices, baseline_yield)
+            result = (estimate, confidence, explanation, HEURISTIC_MODEL_VERSION)
+        else:
+            with metrics_store.time_stage("predict"):
+                pred = float(snapshot.model.predict(features)[0])
+            confidence = _model_confidence(snapshot.metadata)
+            result = (round(max(0.0, pred), 2), round(confidence, 2), MODEL_EXPLANATION, snapshot.version)
+        estimate_cache.put_many([key], [result])
+
+    if candidate is not None:
+        _submit_shadow(snapshot, candidate, features, [profile])
+    return result
+
+
+def _score_matrix(
+    snapshot: LoadedModel, features: np.ndarray, practice_counts: np.ndarray
+) -> list[tuple[float, float, str, str]]:
+    if snapshot.model is None:
+        with metrics_store.time_stage("predict"):
+            estimates, confidences = _heuristic_estimate_batch(features, practice_counts)
+        return [
+            (round(float(estimate), 2), round(float(confidence), 2), HEURISTIC_EXPLANATION, HEURISTIC_MODEL_VERSION)
+            for estimate, confidence in zip(estimates, confidences)
+        ]
+    with metrics_store.time_stage("predict"):
+        preds = snapshot.model.predict(features)
+    confidence = round(_model_confidence(snapshot.metadata), 2)
+    return [(round(max(0.0, float(pred)), 2), confidence, MODEL_EXPLANATION, snapshot.version) for pred in preds]
+
+
+def _score_cached(snapshot: LoadedModel, features: np.ndarray, practice_counts: np.ndarray) -> list[Estimate]:
+    """`_score_matrix` that only sends cache misses to the model."""
+    keys = estimate_keys(snapshot.version, features, practice_counts)
+    results = estimate_cache.get_many(keys)
+    misses = [index for index, result in enumerate(results) if result is None]
+    metrics_store.record_estimate_cache(hits=len(results) - len(misses), misses=len(misses))
+    if misses:
+        scored = _score_matrix(snapshot, features[misses], practice_counts[misses])
+        estimate_cache.put_many([keys[index] for index in misses], scored)
+        for index, result in zip(misses, scored):
+            results[index] = result
+    return results
+
+
+def estimate_annual_co2e_batch(
+    items: Sequence[MrvEstimateRequest], rollout_mode: str | None = None
+) -> list[tuple[float, float, str, str]]:
+    """Score many farms with one feature matrix and a single model call.
+
+    Results are returned in input order and match `estimate_annual_co2e` item by item. Batches are always
+    served by the primary model; in "shadow" and "canary" modes the whole matrix is shadow-scored as one job.
+    """
+    if not items:
+        return []
+
+    snapshot = mrv_registry.current()
+    candidate = _rollout_candidate(rollout_mode or settings.mrv_rollout_mode)
+    with metrics_store.time_stage("feature_build"):
+        profiles = [item.profile for item in items]
+        features = model_inputs(snapshot, encode_feature_matrix(items), profiles)
+
+    practice_counts = np.fromiter((len(item.practices) for item in items), dtype=np.float64, count=len(items))
+    results = _score_cached(snapshot, features, practice_counts)
+
+    if candidate is not None:
+        _submit_shadow(snapshot, candidate, features, profiles)
+    return results
+
+
+def estimate_counterfactuals(
+    profile: FarmProfile, practice_sets: Sequence[Sequence[PracticeType]], baseline_yield: float
+) -> list[tuple[float, float, str, str]]:
+    """Score one farm under each practice set with a single model call; item i matches `estimate_annual_co2e`
+    for `practice_sets[i]`. Hypothetical scenarios are served by the primary model and never shadow-scored."""
+    if not practice_sets:
+        return []
+    snapshot = mrv_registry.current()
+    with metrics_store.time_stage("feature_build"):
+        features = model_inputs(
+            snapshot, encode_counterfactual_matrix(profile, practice_sets, baseline_yield), [profile] * len(practice_sets)
+        )
+    practice_counts = np.array([len(practices) for practices in practice_sets], dtype=np.float64)
+    return _score_cached(snapshot, features, practice_counts)
@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.model_registry import RASTER_FEATURE_COLUMNS
+
+logger = logging.getLogger("agri-trust.ai.raster")
+
+METRES_PER_DEGREE = 111_320.0
+# Largest window read at once (pixels; ~16 MB per float64 array). Farms spread wider are split into groups.
+MAX_WINDOW_PIXELS = 1 << 21
+# Raster layer name (sidecar "layer") -> feature column holding its per-farm mean.
+LAYER_COLUMNS = {column.removesuffix("_mean"): column for column in RASTER_FEATURE_COLUMNS}
+
+
+@dataclass(frozen=True)
+class FarmLocation:
+    farm_key: Hashable
+    latitude: float
+    longitude: float
+    farm_size_hectares: float
+
+
+class _RasterioBand:
+    """Band 1 of a GeoTIFF behind the same 2D slicing interface as a memory-mapped .npy tile; each slice is
+    one windowed read."""
+
+    def __init__(self, dataset: Any) -> None:
+        from rasterio.windows import Window
+
+        self._dataset = dataset
+        self._window = Window
+        self.shape = (dataset.height, dataset.width)
+
+    def __getitem__(self, index: tuple[slice, slice]) -> np.ndarray:
+        rows, cols = index
+        window = self._window(cols.start, rows.start, cols.stop - cols.start, rows.stop - rows.start)
+        return self._dataset.read(1, window=window)
+
+
+@dataclass(frozen=True)
+class RasterTile:
+    """A north-up lon/lat grid: pixel (0, 0) has its top-left corner at (`west`, `north`)."""
+
+    tile_id: str
+    layer: str
+    west: float
+    north: float
+    pixel_width: float
+    pixel_height: float
+    nodata: float | None
+    data: Any
+
+    @property
+    def east(self) -> float:
+        return self.west + self.data.shape[1] * self.pixel_width
+
+    @property
+    def south(self) -> float:
+        return self.north - self.data.shape[0] * self.pixel_height
+
+    def covers(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        return (lons >= self.west) & (lons < self.east) & (lats > self.south) & (lats <= self.north)
+
+    @classmethod
+    def from_npy(cls, path: Path) -> RasterTile:
+        """A float array saved with `np.save` plus a `<stem>.json` sidecar:
+        `{"layer", "west", "north", "pixel_size_deg"}` and optionally `"pixel_height_deg"` and `"nodata"`."""
+        meta = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        pixel_width = float(meta["pixel_size_deg"])
+        return cls(
+            tile_id=path.stem,
+            layer=meta["layer"],
+            west=float(meta["west"]),
+            north=float(meta["north"]),
+            pixel_width=pixel_width,
+            pixel_height=float(meta.get("pixel_height_deg", pixel_width)),
+            nodata=meta.get("nodata"),
+            # Memory-mapped: only the pages a zonal window touches are read from disk.
+            data=np.load(path, mmap_mode="r", allow_pickle=False),
+        )
+
+    @classmethod
+    def from_geotiff(cls, path: Path) -> RasterTile:
+        """A single-band GeoTIFF in EPSG:4326; the layer name comes from a `<stem>.json` sidecar."""
+        import rasterio
+
+        dataset = rasterio.open(path)
+        transform = dataset.transform
+        if transform.b or transform.d:
+            raise ValueError(f"Raster tile {path} is rotated; only north-up tiles are supported")
+        meta = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        return cls(
+            tile_id=path.stem,
+            layer=meta["layer"],
+            west=transform.c,
+            north=transform.f,
+            pixel_width=transform.a,
+            pixel_height=-transform.e,
+            nodata=dataset.nodata,
+            data=_RasterioBand(dataset),
+        )
+
+    def zonal_means(
+        self, lats: np.ndarray, lons: np.ndarray, farm_sizes: np.ndarray, max_window_pixels: int = MAX_WINDOW_PIXELS
+    ) -> np.ndarray:
+        """Mean pixel value over each farm's square footprint (area `farm_size_hectares`, centred on the point).
+
+        Farms are served from one read of the window spanning their footprints. Summed-area tables of values
+        and valid-pixel counts then give each farm's mean in constant time. When that window would exceed
+        `max_window_pixels`, the farms are split at the median along the window's longer side until each
+        group's window fits (or one farm is left), so memory stays bounded for farms far apart in a large
+        tile. Footprints are clipped to the tile, and a footprint always includes the pixel under the
+        farm's point. Farms with no valid pixel get NaN.
+        """
+        rows, cols = self.data.shape
+        half_m = np.sqrt(farm_sizes * 10_000.0) / 2
+        row_centre = (self.north - lats) / self.pixel_height
+        col_centre = (lons - self.west) / self.pixel_width
+        half_rows = half_m / (METRES_PER_DEGREE * self.pixel_height)
+        half_cols = half_m / (METRES_PER_DEGREE * np.cos(np.radians(lats)) * self.pixel_width)
+        centre_row = np.clip(np.floor(row_centre), 0, rows - 1).astype(np.int64)
+        centre_col = np.clip(np.floor(col_centre), 0, cols - 1).astype(np.int64)
+        top = np.minimum(np.clip(np.floor(row_centre - half_rows), 0, rows - 1).astype(np.int64), centre_row)
+        bottom = np.maximum(np.clip(np.ceil(row_centre + half_rows), 1, rows).astype(np.int64), centre_row + 1)
+        left = np.minimum(np.clip(np.floor(col_centre - half_cols), 0, cols - 1).astype(np.int64), centre_col)
+        right = np.maximum(np.clip(np.ceil(col_centre + half_cols), 1, cols).astype(np.int64), centre_col + 1)
+
+        result = np.full(len(lats), np.nan)
+        groups = [np.arange(len(lats))] if len(lats) else []
+        while groups:
+            group = groups.pop()
+            height = int(bottom[group].max() - top[group].min())
+            width = int(right[group].max() - left[group].min())
+            if len(group) > 1 and height * width > max_window_pixels:
+                centre = row_centre[group] if height >= width else col_centre[group]
+                order = group[np.argsort(centre, kind="stable")]
+                groups += [order[: len(order) // 2], order[len(order) // 2 :]]
+                continue
+            result[group] = self._window_means(top[group], bottom[group], left[group], right[group])
+        return result
+
+    def _window_means(self, top: np.ndarray, bottom: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        r0, r1, c0, c1 = int(top.min()), int(bottom.max()), int(left.min()), int(right.max())
+        window = np.asarray(self.data[r0:r1, c0:c1], dtype=np.float64)
+        valid = np.isfinite(window)
+        if self.nodata is not None:
+            valid &= window != self.nodata
+        sums = np.zeros((r1 - r0 + 1, c1 - c0 + 1))
+        counts = np.zeros_like(sums)
+        sums[1:, 1:] = np.where(valid, window, 0.0).cumsum(axis=0).cumsum(axis=1)
+        counts[1:, 1:] = valid.cumsum(axis=0).cumsum(axis=1)
+
+        a, b, c, d = top - r0, bottom - r0, left - c0, right - c0
+        total = sums[b, d] - sums[a, d] - sums[b, c] + sums[a, c]
+        count = counts[b, d] - counts[a, d] - counts[b, c] + counts[a, c]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(count > 0, total / count, np.nan)
+
+
+def load_tiles(directory: Path) -> list[RasterTile]:
+    """Every `.npy` tile with a sidecar in `directory`, plus GeoTIFFs when rasterio is installed."""
+    tiles = [RasterTile.from_npy(path) for path in sorted(directory.glob("*.npy")) if path.with_suffix(".json").exists()]
+    geotiffs = sorted([*directory.glob("*.tif"), *directory.glob("*.tiff")])
+    if geotiffs:
+        try:
+            import rasterio  # noqa: F401
+        except ImportError:
+            logger.warning("Skipping %d GeoTIFF tiles in %s: the rasterio package is not installed", len(geotiffs), directory)
+        else:
+            tiles += [RasterTile.from_geotiff(path) for path in geotiffs]
+    unknown = {tile.layer for tile in tiles} - set(LAYER_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown raster layers {sorted(unknown)}; expected one of {sorted(LAYER_COLUMNS)}")
+    return tiles
+
+
+class RasterFeatureStore:
+    """Per-farm zonal means of the raster layers, in `RASTER_FEATURE_COLUMNS` order.
+
+    Farms are grouped by tile, and each tile serves its whole group from one windowed read. Results are
+    cached per (tile, farm) in a bounded LRU, since tiles are static between ingestions.
+    """
+
+    def __init__(self, tiles: Sequence[RasterTile], cache_size: int = 100_000) -> None:
+        self.tiles = tuple(tiles)
+        self.cache_size = cache_size
+        self._cache: OrderedDict[Hashable, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, directory: Path, cache_size: int = 100_000) -> RasterFeatureStore:
+        return cls(load_tiles(directory), cache_size)
+
+    def _cached(self, keys: list[Hashable]) -> list[float | None]:
+        with self._lock:
+            found = [self._cache.get(key) for key in keys]
+            for key, value in zip(keys, found):
+                if value is not None:
+                    self._cache.move_to_end(key)
+        return found
+
+    def _remember(self, keys: list[Hashable], values: list[float]) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._cache[key] = value
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def features(self, farms: Sequence[FarmLocation]) -> np.ndarray:
+        """(n_farms, n_raster_columns) zonal means; NaN where no tile covers the farm or it has no valid pixel."""
+        result = np.full((len(farms), len(RASTER_FEATURE_COLUMNS)), np.nan)
+        if not farms or not self.tiles:
+            return result
+        lats = np.array([farm.latitude for farm in farms], dtype=np.float64)
+        lons = np.array([farm.longitude for farm in farms], dtype=np.float64)
+        sizes = np.array([farm.farm_size_hectares for farm in farms], dtype=np.float64)
+
+        for tile in self.tiles:
+            column = RASTER_FEATURE_COLUMNS.index(LAYER_COLUMNS[tile.layer])
+            rows = np.flatnonzero(np.isnan(result[:, column]) & tile.covers(lats, lons))
+            if not len(rows):
+                continue
+            keys = [(tile.tile_id, farms[row].farm_key, farms[row].farm_size_hectares) for row in rows.tolist()]
+            cached = self._cached(keys)
+            misses = [index for index, value in enumerate(cached) if value is None]
+            if misses:
+                miss_rows = rows[misses]
+                computed = tile.zonal_means(lats[miss_rows], lons[miss_rows], sizes[miss_rows]).tolist()
+                self._remember([keys[index] for index in misses], computed)
+                for index, value in zip(misses, computed):
+                    cached[index] = value
+            result[rows, column] = cached
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+def farm_locations(profiles: Sequence[Any]) -> tuple[np.ndarray, list[FarmLocation]]:
+    """Rows of `profiles` that carry coordinates, and their locations keyed by farmer and point."""
+    rows = [row for row, profile in enumerate(profiles) if profile.latitude is not None and profile.longitude is not None]
+    locations = [
+        FarmLocation(
+            farm_key=(profiles[row].farmer_id, round(profiles[row].latitude, 6), round(profiles[row].longitude, 6)),
+            latitude=profiles[row].latitude,
+            longitude=profiles[row].longitude,
+            farm_size_hectares=profiles[row].farm_size_hectares,
+        )
+        for row in rows
+    ]
+    return np.asarray(rows, dtype=np.int64), locations
+
+
+@lru_cache(maxsize=1)
+def raster_store() -> RasterFeatureStore:
+    if not settings.raster_tile_dir:
+        return RasterFeatureStore([])
+    store = RasterFeatureStore.from_directory(Path(settings.raster_tile_dir), settings.raster_cache_size)
+    logger.info("raster_tiles_loaded tiles=%d dir=%s", len(store.tiles), settings.raster_tile_dir)
+    return store
+
+
+def raster_feature_matrix(profiles: Sequence[Any], store: RasterFeatureStore | None = None) -> np.ndarray:
+    """Raster columns for farm profiles; NaN rows for profiles without coordinates."""
+    result = np.full((len(profiles), len(RASTER_FEATURE_COLUMNS)), np.nan)
+    rows, locations = farm_locations(profiles)
+    if locations:
+        result[rows] = (store or raster_store()).features(locations)
+    return result
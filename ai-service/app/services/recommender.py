@@ -1,4 +1,26 @@
-from app.models.schemas import PracticeType, RecommendationItem, RecommendationRequest
+import math
+from collections.abc import Iterable, Mapping, Sequence
+from typing import get_args
+
+import numpy as np
+
+from app.models.schemas import (
+    PracticeMix,
+    PracticeType,
+    RecommendationItem,
+    RecommendationPlan,
+    RecommendationRequest,
+    RecommendationResponse,
+)
+
+PRACTICES: tuple[PracticeType, ...] = get_args(PracticeType)
+PRACTICE_BIT: dict[PracticeType, int] = {practice: 1 << index for index, practice in enumerate(PRACTICES)}
+TOP_K = 3
+
+ADVISORY_NOTE = (
+    "Recommendations are adapted for Indian smallholder adoption constraints. "
+    "Validate with local FPO/agronomist before farm-wide rollout."
+)
 
 PRACTICE_COST_INR: dict[PracticeType, int] = {
     "no_till": 2500,
@@ -66,17 +88,159 @@ OBJECTIVE_WEIGHT = {
 }
 
 
-def generate_recommendations(payload: RecommendationRequest) -> list[RecommendationItem]:
-    ranking = OBJECTIVE_WEIGHT[payload.objective]
-    candidates = [k for k in ranking if k not in payload.current_practices]
-    sorted_candidates = sorted(candidates, key=lambda x: ranking[x], reverse=True)[:3]
+def practice_mask(practices: Iterable[PracticeType]) -> int:
+    mask = 0
+    for practice in practices:
+        mask |= PRACTICE_BIT[practice]
+    return mask
+
+
+def recommendation_item(practice: PracticeType, impact_score: float) -> RecommendationItem:
+    return RecommendationItem(
+        practice=practice,
+        impact_score=round(impact_score, 2),
+        rationale=PRACTICE_RATIONALE[practice],
+        estimated_cost_inr_per_hectare=PRACTICE_COST_INR[practice],
+    )
+
+
+def _rank(objective: str, mask: int) -> tuple[RecommendationItem, ...]:
+    ranking = OBJECTIVE_WEIGHT[objective]
+    candidates = [practice for practice in ranking if not mask & PRACTICE_BIT[practice]]
+    top = sorted(candidates, key=lambda practice: ranking[practice], reverse=True)[:TOP_K]
+    return tuple(recommendation_item(practice, ranking[practice]) for practice in top)
+
+
+# Every (objective, set of current practices) is only 4 x 2**8 entries, so the ranking and the serialized
+# response are computed once at import and requests become a dictionary lookup.
+_TABLE: dict[tuple[str, int], tuple[RecommendationItem, ...]] = {
+    (objective, mask): _rank(objective, mask) for objective in OBJECTIVE_WEIGHT for mask in range(1 << len(PRACTICES))
+}
+_RESPONSE_JSON: dict[tuple[str, int], bytes] = {
+    key: RecommendationResponse(recommendations=list(items), advisory_note=ADVISORY_NOTE).model_dump_json().encode()
+    for key, items in _TABLE.items()
+}
+
+
+# Bounds on the knapsack table (items x cost units of bools, ~4 MiB at most) so one request cannot exhaust memory.
+MAX_KNAPSACK_ITEMS = 512
+MAX_KNAPSACK_UNITS = 8192
+
+
+def solve_budget_knapsack(
+    costs: Sequence[int], values: Sequence[float], budget: int
+) -> list[tuple[int, float, tuple[int, ...]]]:
+    """0/1 knapsack over positive integer costs, returned as its cost/value Pareto frontier.
+
+    Each entry is `(cost, value, chosen item indices)`, sorted by cost; every entry scores strictly higher
+    than the cheaper ones, and the last is the best found within `budget`. Costs are divided by their common
+    divisor first (INR catalog prices are round numbers), which keeps the solve exact. When that still leaves
+    more than `MAX_KNAPSACK_UNITS` cost units, costs are rounded up to a coarser unit: every plan stays within
+    budget, but one whose cost is within a unit of the limit may be missed. Raises `ValueError` for more than
+    `MAX_KNAPSACK_ITEMS` affordable items.
+    """
+    items = [index for index, cost in enumerate(costs) if 0 < cost <= budget and values[index] > 0]
+    if not items:
+        return []
+    if len(items) > MAX_KNAPSACK_ITEMS:
+        raise ValueError(f"Budget plans support at most {MAX_KNAPSACK_ITEMS} practices, got {len(items)}")
 
+    # A budget at or above the total cost affords every item, so the table never needs to be wider than that.
+    limit = min(budget, sum(costs[index] for index in items))
+    unit = math.gcd(*(costs[index] for index in items))
+    if limit // unit > MAX_KNAPSACK_UNITS:
+        unit = -(-limit // MAX_KNAPSACK_UNITS)
+    weights = [-(-costs[index] // unit) for index in items]
+    capacity = min(budget // unit, sum(weights))
+    # best[c]: highest value whose cost is exactly c units (-inf when no subset costs c).
+    best = np.full(capacity + 1, -np.inf)
+    best[0] = 0.0
+    taken = np.zeros((len(items), capacity + 1), dtype=bool)
+    for row, index in enumerate(items):
+        weight, value = weights[row], float(values[index])
+        if weight > capacity:
+            continue
+        candidate = best[: capacity + 1 - weight] + value
+        improves = candidate > best[weight:]
+        taken[row, weight:] = improves
+        best[weight:] = np.where(improves, candidate, best[weight:])
+
+    # A cost level is on the frontier when it beats every cheaper level.
+    cheaper_best = np.maximum.accumulate(np.concatenate(([0.0], best[:-1])))
+    levels = np.flatnonzero(best > cheaper_best)
+    # Walk the table back for every frontier level at once, one row per item.
+    picked = np.zeros((len(levels), len(items)), dtype=bool)
+    remaining = levels.copy()
+    for row in range(len(items) - 1, -1, -1):
+        picked[:, row] = taken[row, remaining]
+        remaining -= picked[:, row] * weights[row]
+    item_ids = np.asarray(items)
+    item_costs = np.asarray([costs[index] for index in items], dtype=np.int64)
+    points = [
+        (int(item_costs[mask].sum()), float(best[level]), tuple(item_ids[mask].tolist()))
+        for level, mask in zip(levels.tolist(), picked)
+    ]
+
+    # Rounded-up costs can reorder plans by their true cost; keep only those that beat every cheaper one.
+    frontier: list[tuple[int, float, tuple[int, ...]]] = []
+    for point in sorted(points, key=lambda point: (point[0], -point[1])):
+        if not frontier or point[1] > frontier[-1][1]:
+            frontier.append(point)
+    return frontier
+
+
+def practice_scores(objective_weights: Mapping[str, float], practices: Sequence[str] = PRACTICES) -> list[float]:
+    """Weighted impact per practice, with the weights normalized to sum to 1."""
+    total = sum(objective_weights.values())
     return [
-        RecommendationItem(
-            practice=practice,
-            impact_score=round(ranking[practice], 2),
-            rationale=PRACTICE_RATIONALE[practice],
-            estimated_cost_inr_per_hectare=PRACTICE_COST_INR[practice],
-        )
-        for practice in sorted_candidates
+        sum(weight * OBJECTIVE_WEIGHT[objective][practice] for objective, weight in objective_weights.items()) / total
+        for practice in practices
     ]
+
+
+def recommendation_plan(payload: RecommendationRequest) -> RecommendationPlan:
+    weights = dict(payload.objective_weights or {payload.objective: 1.0})
+    candidates = [practice for practice in PRACTICES if practice not in payload.current_practices]
+    scores = practice_scores(weights, candidates)
+    frontier = solve_budget_knapsack(
+        [PRACTICE_COST_INR[practice] for practice in candidates], scores, int(payload.budget_inr_per_hectare)
+    )
+    size = payload.profile.farm_size_hectares
+
+    def mix(cost: int, score: float, chosen: tuple[int, ...]) -> PracticeMix:
+        return PracticeMix(
+            practices=[candidates[index] for index in sorted(chosen, key=lambda index: -scores[index])],
+            score=round(score, 4),
+            cost_inr_per_hectare=cost,
+            total_cost_inr=round(cost * size, 2),
+        )
+
+    points = [mix(*point) for point in frontier]
+    return RecommendationPlan(
+        objective_weights=weights,
+        budget_inr_per_hectare=payload.budget_inr_per_hectare,
+        farm_size_hectares=size,
+        selected=points[-1] if points else mix(0, 0.0, ()),
+        pareto_frontier=points,
+    )
+
+
+def _plan_items(plan: RecommendationPlan) -> list[RecommendationItem]:
+    scores = dict(zip(PRACTICES, practice_scores(plan.objective_weights)))
+    return [recommendation_item(practice, scores[practice]) for practice in plan.selected.practices]
+
+
+def generate_recommendations(payload: RecommendationRequest) -> list[RecommendationItem]:
+    """Practices the farmer does not already follow: the top 3 for `objective`, or with a budget, the best
+    affordable mix under `objective_weights`. Top-3 items are shared; do not mutate."""
+    if payload.budget_inr_per_hectare is not None:
+        return _plan_items(recommendation_plan(payload))
+    return list(_TABLE[payload.objective, practice_mask(payload.current_practices)])
+
+
+def recommendation_response_json(payload: RecommendationRequest) -> bytes:
+    if payload.budget_inr_per_hectare is not None:
+        plan = recommendation_plan(payload)
+        response = RecommendationResponse(recommendations=_plan_items(plan), advisory_note=ADVISORY_NOTE, plan=plan)
+        return response.model_dump_json().encode()
+    return _RESPONSE_JSON[payload.objective, practice_mask(payload.current_practices)]
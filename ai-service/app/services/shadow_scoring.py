@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.monitoring import MetricsStore, metrics_store
+from app.services.model_registry import LoadedModel
+
+logger = logging.getLogger("agri-trust.ai.shadow")
+
+
+@dataclass(frozen=True)
+class ShadowJob:
+    primary: LoadedModel
+    primary_features: np.ndarray
+    candidate: LoadedModel
+    features: np.ndarray
+
+
+class ShadowScorer:
+    """Scores a candidate model off the request path on a fixed pool of daemon threads.
+
+    `submit` never blocks: when the bounded queue is full the job is dropped and counted, so a slow
+    candidate sheds load instead of queueing work without limit or holding up `/mrv/estimate`.
+    """
+
+    def __init__(self, workers: int, queue_size: int, metrics: MetricsStore) -> None:
+        self.workers = workers
+        self._queue: queue.Queue[ShadowJob] = queue.Queue(maxsize=queue_size)
+        self._metrics = metrics
+        self._threads: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+
+    def submit(self, job: ShadowJob) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._metrics.record_shadow_dropped(job.primary.version, job.candidate.version, len(job.features))
+            return False
+        return True
+
+    def join(self) -> None:
+        """Block until every queued job has been scored (used by tests and graceful shutdown)."""
+        self._queue.join()
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"mrv-shadow-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                # Both models score their unrounded rows here. The served estimate is rounded and may come from
+                # the estimate cache, so diffing against it would bias the deltas.
+                primary_predictions = np.maximum(job.primary.model.predict(job.primary_features), 0.0)
+                candidate_predictions = np.maximum(job.candidate.model.predict(job.features), 0.0)
+                deltas = (candidate_predictions - primary_predictions).tolist()
+                self._metrics.record_shadow_deltas(job.primary.version, job.candidate.version, deltas)
+            except Exception:
+                logger.exception("shadow_scoring_failed candidate_version=%s", job.candidate.version)
+            finally:
+                self._queue.task_done()
+
+
+def in_canary(farmer_id: str, percent: int) -> bool:
+    """Stable per-farmer bucketing so a farm sees the same model on every request during a canary."""
+    if percent <= 0:
+        return False
+    return zlib.crc32(farmer_id.encode("utf-8")) % 100 < percent
+
+
+shadow_scorer = ShadowScorer(
+    workers=settings.mrv_shadow_workers,
+    queue_size=settings.mrv_shadow_queue_size,
+    metrics=metrics_store,
+)
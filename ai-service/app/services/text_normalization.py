@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Devanagari is folded onto the same Latin spelling farmers use when typing Hindi/Marathi in Roman script,
+# so "सलाह" and "salah" (or "क्या करूं" and "kya karun") normalize to the same tokens.
+_CONSONANTS = {
+    "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n",
+    "च": "ch", "छ": "chh", "ज": "j", "झ": "jh", "ञ": "n",
+    "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n",
+    "त": "t", "थ": "th", "द": "d", "ध": "dh", "न": "n", "ऩ": "n",
+    "प": "p", "फ": "ph", "ब": "b", "भ": "bh", "म": "m",
+    "य": "y", "र": "r", "ऱ": "r", "ल": "l", "ळ": "l", "ऴ": "l", "व": "v",
+    "श": "sh", "ष": "sh", "स": "s", "ह": "h",
+}  # fmt: skip
+_VOWELS = {
+    "अ": "a", "आ": "aa", "इ": "i", "ई": "ii", "उ": "u", "ऊ": "uu", "ऋ": "ri",
+    "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o", "ऍ": "e",
+}  # fmt: skip
+_MATRAS = {
+    "ा": "aa", "ि": "i", "ी": "ii", "ु": "u", "ू": "uu", "ृ": "ri",
+    "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o", "ॅ": "e",
+}  # fmt: skip
+_SIGNS = {"ं": "n", "ँ": "n", "ः": "h", "।": " ", "॥": " "}
+_DIGITS = {chr(0x0966 + digit): str(digit) for digit in range(10)}
+
+_VIRAMA = "्"
+_NUKTA = "़"
+
+# Spelling variants that Romanized Hindi uses interchangeably; applied to both scripts after transliteration.
+_LATIN_FOLDS = (
+    (re.compile(r"ee"), "i"),
+    (re.compile(r"oo"), "u"),
+    (re.compile(r"(.)\1+"), r"\1"),
+    (re.compile(r"ph"), "f"),
+    (re.compile(r"w"), "v"),
+    (re.compile(r"z"), "j"),
+    (re.compile(r"q"), "k"),
+)
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+@dataclass(frozen=True)
+class NormalizedText:
+    text: str
+    tokens: tuple[str, ...]
+
+
+def transliterate_devanagari(text: str) -> str:
+    """Romanize Devanagari, dropping the inherent vowel before a matra or virama and at the end of a word."""
+    out: list[str] = []
+    pending_schwa = False
+    for char in text:
+        if char == _NUKTA:
+            # क़/ज़/फ़ and friends fold onto the plain consonant.
+            continue
+        if char in _MATRAS:
+            out.append(_MATRAS[char])
+            pending_schwa = False
+            continue
+        if char == _VIRAMA:
+            pending_schwa = False
+            continue
+        if pending_schwa and (char in _CONSONANTS or char in _VOWELS or char in "ंँः"):
+            out.append("a")
+        pending_schwa = False
+
+        if char in _CONSONANTS:
+            out.append(_CONSONANTS[char])
+            pending_schwa = True
+        else:
+            out.append(_VOWELS.get(char) or _SIGNS.get(char) or _DIGITS.get(char) or char)
+    return "".join(out)
+
+
+def fold_latin(text: str) -> str:
+    for pattern, replacement in _LATIN_FOLDS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+@lru_cache(maxsize=4096)
+def normalize_transcript(text: str) -> NormalizedText:
+    """NFC-normalize, transliterate, fold and tokenize. Memoized: IVR prompts repeat the same utterances."""
+    composed = unicodedata.normalize("NFC", text).casefold()
+    tokens = tuple(_TOKEN.findall(fold_latin(transliterate_devanagari(composed))))
+    return NormalizedText(text=" ".join(tokens), tokens=tokens)
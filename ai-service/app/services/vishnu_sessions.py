@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.core.config import settings
+from app.core.monitoring import metrics_store
+from app.models.schemas import VishnuWebhookRequest, VishnuWebhookResponse
+from app.services.text_normalization import normalize_transcript
+from app.services.voice_nlu import infer_intent_texts
+
+logger = logging.getLogger("agri-trust.ai.vishnu")
+
+# Short replies that confirm or continue the previous turn ("हाँ", "haan ji", "ok", "हो"); they carry no new
+# intent, so the session's last answer is reused instead of classifying them.
+FOLLOW_UP_TOKENS = frozenset(
+    token
+    for phrase in ("haan", "हाँ", "ha", "ji", "जी", "yes", "ok", "okay", "theek", "ठीक", "hai", "है", "ho", "हो", "hoy")
+    for token in normalize_transcript(phrase).tokens
+)
+
+
+class ResponseCache(ABC):
+    """String key/value store with per-entry TTL, shared by webhook deliveries and session state."""
+
+    @abstractmethod
+    def get(self, key: str) -> str | None: ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: int) -> None: ...
+
+
+class MemoryResponseCache(ResponseCache):
+    """Process-local bounded LRU; entries also expire after their TTL."""
+
+    def __init__(self, maxsize: int = 10_000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisResponseCache(ResponseCache):
+    """Shared backend so a retry landing on another worker or replica still hits the cache."""
+
+    def __init__(self, client: Any, prefix: str = "agri-trust:vishnu") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> str | None:
+        value = self.client.get(f"{self.prefix}:{key}")
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self.client.set(f"{self.prefix}:{key}", value, ex=ttl_seconds)
+
+
+@dataclass
+class SessionState:
+    intent: str
+    reply: str
+    text: str
+    turns: int = 0
+
+
+class VishnuSessionService:
+    """Answers each Vishnu webhook delivery at most once and remembers each session.
+
+    A delivery is a retry when it carries an already answered `delivery_id`, or, without one, when it repeats
+    the utterance of the session's latest turn; a retry gets the stored response without any work. Keying
+    on the turn as well as the utterance means a later turn that happens to repeat an earlier utterance
+    ("haan" after a new question) is answered afresh. A turn that only confirms the previous one, or repeats
+    it word for word, reuses the session's last answer. Everything else is classified, all in one `classify`
+    call per request.
+    """
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        classify: Callable[[list[str]], list[tuple[str, float, str]]] = infer_intent_texts,
+        delivery_ttl_seconds: int = 300,
+        session_ttl_seconds: int = 1800,
+    ) -> None:
+        self.cache = cache
+        self._classify = classify
+        self.delivery_ttl_seconds = delivery_ttl_seconds
+        self.session_ttl_seconds = session_ttl_seconds
+
+    @staticmethod
+    def delivery_key(session_id: str, utterance: str, turn: int, delivery_id: str | None = None) -> str:
+        """Key of the delivery that was answered as `turn` of the session (turns count from 1)."""
+        if delivery_id is not None:
+            return f"delivery:{session_id}:id:{delivery_id}"
+        digest = hashlib.sha256(utterance.encode("utf-8")).hexdigest()
+        return f"delivery:{session_id}:{turn}:{digest}"
+
+    def _session(self, session_id: str) -> SessionState | None:
+        raw = self.cache.get(f"session:{session_id}")
+        return SessionState(**json.loads(raw)) if raw else None
+
+    def _reusable(self, state: SessionState | None, text: str, tokens: tuple[str, ...]) -> bool:
+        if state is None or not tokens:
+            return False
+        return text == state.text or all(token in FOLLOW_UP_TOKENS for token in tokens)
+
+    def handle(self, items: Sequence[VishnuWebhookRequest]) -> list[VishnuWebhookResponse]:
+        normalized = [normalize_transcript(item.utterance) for item in items]
+        sessions: dict[str, SessionState | None] = {}
+        for item in items:
+            if item.session_id not in sessions:
+                sessions[item.session_id] = self._session(item.session_id)
+
+        # Sort deliveries into retries of an answered turn and new turns, advancing each session's turn count
+        # as the batch will. A retry is looked up under the key of the session's latest turn.
+        turn_counts = {session_id: state.turns if state else 0 for session_id, state in sessions.items()}
+        keys: list[str] = []
+        cached: list[str | None] = []
+        new_turn: list[bool] = []
+        pending: set[str] = set()
+        for item in items:
+            key = self.delivery_key(item.session_id, item.utterance, turn_counts[item.session_id], item.delivery_id)
+            hit = None if key in pending else self.cache.get(key)
+            is_new = key not in pending and hit is None
+            if is_new:
+                turn_counts[item.session_id] += 1
+                key = self.delivery_key(item.session_id, item.utterance, turn_counts[item.session_id], item.delivery_id)
+                pending.add(key)
+            keys.append(key)
+            cached.append(hit)
+            new_turn.append(is_new)
+
+        # Classify, in one call, every new turn that its session (as it will stand when the turn is reached)
+        # cannot answer.
+        to_classify: list[int] = []
+        sessions_with_turn: set[str] = set()
+        for index, item in enumerate(items):
+            if not new_turn[index]:
+                continue
+            text = normalized[index]
+            follow_up = item.session_id in sessions_with_turn and all(token in FOLLOW_UP_TOKENS for token in text.tokens)
+            if not follow_up and not self._reusable(sessions[item.session_id], text.text, text.tokens):
+                to_classify.append(index)
+            sessions_with_turn.add(item.session_id)
+        classified = (
+            dict(zip(to_classify, self._classify([items[index].utterance for index in to_classify])))
+            if to_classify
+            else {}
+        )
+
+        responses: list[VishnuWebhookResponse] = []
+        answered: dict[str, VishnuWebhookResponse] = {}
+        for index, item in enumerate(items):
+            key, text = keys[index], normalized[index]
+            if not new_turn[index]:
+                response = answered.get(key) or VishnuWebhookResponse.model_validate_json(cached[index])
+                metrics_store.record_webhook_delivery("duplicate")
+                responses.append(response)
+                continue
+
+            state = sessions[item.session_id]
+            if self._reusable(state, text.text, text.tokens):
+                intent, reply = state.intent, state.reply
+                metrics_store.record_webhook_delivery("session_follow_up")
+            else:
+                intent, _, reply = classified.get(index) or self._classify([item.utterance])[0]
+                metrics_store.record_webhook_delivery("classified")
+
+            response = VishnuWebhookResponse(session_id=item.session_id, reply=reply, intent=intent)
+            turns = state.turns + 1 if state else 1
+            sessions[item.session_id] = state = SessionState(intent=intent, reply=reply, text=text.text, turns=turns)
+            self.cache.set(f"session:{item.session_id}", json.dumps(asdict(state)), self.session_ttl_seconds)
+            self.cache.set(key, response.model_dump_json(), self.delivery_ttl_seconds)
+            answered[key] = response
+            responses.append(response)
+        return responses
+
+
+def build_response_cache() -> ResponseCache:
+    if settings.vishnu_cache_backend == "redis":
+        try:
+            import redis
+
+            return RedisResponseCache(redis.Redis.from_url(settings.redis_url))
+        except ImportError:  # pragma: no cover
+            logger.warning("vishnu_cache_backend=redis but the redis package is not installed; using memory backend")
+    return MemoryResponseCache(maxsize=settings.vishnu_cache_max_entries)
+
+
+vishnu_sessions = VishnuSessionService(
+    build_response_cache(),
+    delivery_ttl_seconds=settings.vishnu_delivery_ttl_seconds,
+    session_ttl_seconds=settings.vishnu_session_ttl_seconds,
+)
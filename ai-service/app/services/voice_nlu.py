@@ -1,16 +1,64 @@
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
 from app.models.schemas import VoiceIntentRequest
+from app.services.intent_lexicon import DEFAULT_LEXICON_PATH, IntentLexicon
+from app.services.intent_model import intent_registry
 
+# Below this probability the trained model defers to the keyword matcher; artifacts may override it.
+DEFAULT_MIN_CONFIDENCE = 0.55
 
-def infer_intent(payload: VoiceIntentRequest) -> tuple[str, float, str]:
-    transcript = payload.transcript.strip().lower()
 
-    recommendation_keywords = ["recommend", "सलाह", "salah", "recommendation", "kya kare", "क्या करूं"]
-    carbon_keywords = ["carbon", "कार्बन", "credit", "score", "co2", "sequestration"]
+@lru_cache
+def intent_lexicon() -> IntentLexicon:
+    """Compiled once per process; set `VOICE_LEXICON_PATH` to serve a larger lexicon file."""
+    path = Path(settings.voice_lexicon_path) if settings.voice_lexicon_path else DEFAULT_LEXICON_PATH
+    return IntentLexicon.from_file(path)
+
+
+def _keyword_intent(transcript: str) -> tuple[str, float, str]:
+    match = intent_lexicon().best(transcript)
+    return match.intent, match.confidence, match.response_text
+
+
+def infer_intent_texts(transcripts: list[str]) -> list[tuple[str, float, str]]:
+    """Classify many utterances with one model call.
+
+    The trained intent model answers when it is confident about a known intent; everything else (no
+    model published, low probability, or "unknown") goes to the keyword matcher.
+    """
+    if not transcripts:
+        return []
 
-    if any(keyword in transcript for keyword in recommendation_keywords):
-        return "get_recommendations", 0.87, "मैं आपकी खेती के लिए बेहतर कार्बन और उपज वाली सलाह तैयार कर रहा हूँ।"
+    snapshot = intent_registry.current()
+    if snapshot.model is None:
+        return [_keyword_intent(transcript) for transcript in transcripts]
 
-    if any(keyword in transcript for keyword in carbon_keywords):
-        return "get_carbon_score", 0.84, "मैं आपका अनुमानित कार्बन स्कोर निकाल रहा हूँ।"
+    lexicon = intent_lexicon()
+    responses = {spec.name: spec.response_text for spec in lexicon.intents}
+    min_confidence = float(snapshot.metadata.get("min_confidence", DEFAULT_MIN_CONFIDENCE))
+    probabilities = snapshot.model.predict_proba(transcripts)
+    best = probabilities.argmax(axis=1)
 
-    return "unknown", 0.45, "कृपया दोबारा बोलें। आप कार्बन स्कोर या खेती की सलाह पूछ सकते हैं।"
+    results = []
+    for transcript, class_index, row in zip(transcripts, best, probabilities):
+        intent = snapshot.model.classes[class_index]
+        confidence = float(row[class_index])
+        if intent == lexicon.fallback.intent or confidence < min_confidence:
+            results.append(_keyword_intent(transcript))
+        else:
+            results.append((intent, round(confidence, 2), responses.get(intent, lexicon.fallback.response_text)))
+    return results
+
+
+def infer_intents(payloads: list[VoiceIntentRequest]) -> list[tuple[str, float, str]]:
+    return infer_intent_texts([payload.transcript for payload in payloads])
+
+
+def infer_intent_text(transcript: str) -> tuple[str, float, str]:
+    return infer_intent_texts([transcript])[0]
+
+
+def infer_intent(payload: VoiceIntentRequest) -> tuple[str, float, str]:
+    return infer_intent_text(payload.transcript)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from app.models.schemas import MrvWhatIfRequest, MrvWhatIfResponse, MrvWhatIfScenario, PracticeType
+from app.services.mrv_engine import estimate_counterfactuals
+from app.services.recommender import OBJECTIVE_WEIGHT, recommendation_item
+
+
+def score_what_if(payload: MrvWhatIfRequest) -> MrvWhatIfResponse:
+    """Project the CO2e gain of each practice bundle for one farm, ranked by gain.
+
+    The current practices and every bundle added to them are scored together in one model call, so the
+    frontend gets all projections in a single round trip instead of one `/mrv/estimate` per suggestion.
+    """
+    current = list(dict.fromkeys(payload.current_practices))
+    added: list[list[PracticeType]] = [
+        [practice for practice in dict.fromkeys(bundle) if practice not in current] for bundle in payload.bundles
+    ]
+    results = estimate_counterfactuals(
+        payload.profile, [current] + [current + extra for extra in added], payload.baseline_yield_ton_per_hectare
+    )
+    (baseline, _, _, model_version), scenario_results = results[0], results[1:]
+
+    ranking = OBJECTIVE_WEIGHT[payload.objective]
+    scenarios = [
+        MrvWhatIfScenario(
+            practices=extra,
+            estimated_annual_co2e_tons=estimate,
+            co2e_delta_tons=round(estimate - baseline, 2),
+            confidence_score=confidence,
+            recommendations=[recommendation_item(practice, ranking[practice]) for practice in extra],
+        )
+        for extra, (estimate, confidence, _, _) in zip(added, scenario_results)
+    ]
+    # Stable sort: bundles with equal gains keep the order the client sent them in.
+    scenarios.sort(key=lambda scenario: scenario.co2e_delta_tons, reverse=True)
+    return MrvWhatIfResponse(baseline_co2e_tons=baseline, model_version=model_version, scenarios=scenarios)
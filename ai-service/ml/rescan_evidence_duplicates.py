@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.services.evidence_dedup import DuplicateEvidenceDetector, EvidencePoint  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Flag evidence that reuses GPS points or soil tests across farmers")
+    parser.add_argument(
+        "--input",
+        required=True,
+        help="CSV with farmer_id, latitude, longitude, soil_organic_carbon_pct in submission order ('-' for stdin)",
+    )
+    parser.add_argument("--output", default="-", help="NDJSON of flagged rows ('-' for stdout)")
+    parser.add_argument("--window", type=int, default=None, help="Recent submissions to compare against (default: all)")
+    parser.add_argument("--save-state", type=Path, default=None, help="Write the final window for the service to load")
+    return parser.parse_args()
+
+
+def read_points(source) -> Iterator[EvidencePoint]:
+    for row in csv.DictReader(source):
+        yield EvidencePoint(
+            farmer_id=row["farmer_id"],
+            latitude=float(row["latitude"]),
+            longitude=float(row["longitude"]),
+            soil_organic_carbon_pct=float(row["soil_organic_carbon_pct"]),
+        )
+
+
+def main() -> None:
+    args = parse_args()
+    detector = DuplicateEvidenceDetector(
+        window=args.window or sys.maxsize,
+        gps_radius_m=settings.evidence_dedup_gps_radius_m,
+        soil_radius_m=settings.evidence_dedup_soil_radius_m,
+        soil_tolerance=settings.evidence_dedup_soil_tolerance,
+    )
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8-sig", newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    flagged = 0
+    try:
+        for row, issues, warnings in detector.rescan(read_points(source)):
+            sink.write(json.dumps({"index": row, "issues": issues, "warnings": warnings}, ensure_ascii=False) + "\n")
+            flagged += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    if args.save_state:
+        detector.save(args.save_state)
+    print(f"Flagged {flagged} rows; {len(detector)} submissions in the final window", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
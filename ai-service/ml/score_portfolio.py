@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.bulk_scoring import iter_scored  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Score a farm portfolio offline with the MRV model")
+    parser.add_argument("--input", required=True, help="NDJSON or CSV file of MrvEstimateRequest rows ('-' for stdin)")
+    parser.add_argument("--output", default="-", help="NDJSON results file ('-' for stdout)")
+    parser.add_argument(
+        "--format",
+        choices=["ndjson", "csv"],
+        default=None,
+        help="Input format; inferred from the file extension when omitted",
+    )
+    parser.add_argument("--chunk-size", type=int, default=500, help="Rows scored per vectorized model call")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    fmt = args.format or ("csv" if args.input.lower().endswith(".csv") else "ndjson")
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8-sig", newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    succeeded = failed = 0
+    try:
+        for item in iter_scored(source, fmt, chunk_size=args.chunk_size):
+            sink.write(item.model_dump_json() + "\n")
+            if item.result is None:
+                failed += 1
+            else:
+                succeeded += 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(f"Scored {succeeded + failed} rows: {succeeded} succeeded, {failed} failed", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
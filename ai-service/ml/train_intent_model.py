@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.intent_model import HashedNgramFeaturizer, IntentClassifier  # noqa: E402
+from app.services.model_registry import MANIFEST_NAME, publish_version  # noqa: E402
+
+TEXT_COLUMN = "transcript"
+TARGET_COLUMN = "intent"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train the voice intent classifier for Agri-Trust")
+    parser.add_argument("--data", required=True, help="Path to CSV dataset with transcript and intent columns")
+    parser.add_argument(
+        "--outdir",
+        default="app/models/artifacts",
+        help="Output directory for model artifact and metadata",
+    )
+    parser.add_argument(
+        "--version",
+        default=None,
+        help="Publish as a versioned artifact under <outdir>/intent/<version>/ and point the manifest at it",
+    )
+    parser.add_argument(
+        "--min-confidence",
+        type=float,
+        default=0.55,
+        help="Below this probability the service falls back to the keyword matcher",
+    )
+    return parser.parse_args()
+
+
+def featurize(featurizer: HashedNgramFeaturizer, transcripts: list[str]) -> csr_matrix:
+    rows, indices, values = featurizer.transform(transcripts)
+    return csr_matrix((values, (rows, indices)), shape=(len(transcripts), featurizer.n_features))
+
+
+def main() -> None:
+    args = parse_args()
+    data_path = Path(args.data)
+    versions_dir = Path(args.outdir) / "intent"
+    outdir = versions_dir / args.version if args.version else Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    df = pd.read_csv(data_path)
+    missing = [col for col in [TEXT_COLUMN, TARGET_COLUMN] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    featurizer = HashedNgramFeaturizer()
+    transcripts = df[TEXT_COLUMN].astype(str).tolist()
+    labels = df[TARGET_COLUMN].astype(str).to_numpy()
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        transcripts, labels, test_size=0.2, random_state=42, stratify=labels
+    )
+
+    model = LogisticRegression(C=20.0, max_iter=2000)
+    model.fit(featurize(featurizer, X_train), y_train)
+    test_accuracy = accuracy_score(y_test, model.predict(featurize(featurizer, X_test)))
+
+    # Refit on every row for the shipped artifact; the held-out accuracy above is what gets reported.
+    model.fit(featurize(featurizer, transcripts), labels)
+
+    # Binary problems get a single coefficient row from sklearn; expand to one column per class.
+    coef = model.coef_ if len(model.classes_) > 2 else np.vstack([-model.coef_[0], model.coef_[0]])
+    intercept = model.intercept_ if len(model.classes_) > 2 else np.array([-model.intercept_[0], model.intercept_[0]])
+    classifier = IntentClassifier(coef.T, intercept, [str(name) for name in model.classes_], featurizer)
+
+    metrics = {
+        "accuracy": round(float(test_accuracy), 4),
+        "train_rows": int(len(X_train)),
+        "test_rows": int(len(X_test)),
+        "classes": list(classifier.classes),
+        "n_features": featurizer.n_features,
+        "ngram_min": featurizer.ngram_min,
+        "ngram_max": featurizer.ngram_max,
+        "min_confidence": args.min_confidence,
+        "model_type": "HashedNgramLogisticRegression",
+        "model_version": args.version or "intent_lr_v1",
+    }
+
+    model_path = outdir / "intent_model.npz"
+    meta_path = outdir / "intent_model_meta.json"
+    classifier.save(model_path)
+    meta_path.write_text(json.dumps(metrics, indent=2), encoding="utf-8")
+    if args.version:
+        # Publish last: running services only switch once every file of the version is on disk.
+        publish_version(versions_dir, args.version)
+
+    print(
+        json.dumps(
+            {
+                "model": str(model_path),
+                "metadata": str(meta_path),
+                "manifest": str(versions_dir / MANIFEST_NAME) if args.version else None,
+                **metrics,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 
 import joblib
@@ -10,13 +11,19 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 from sklearn.model_selection import train_test_split
 
-FEATURE_COLUMNS = [
-    "farm_size_hectares",
-    "state_factor",
-    "soil_organic_carbon_pct",
-    "baseline_yield_ton_per_hectare",
-    "practice_score",
-]
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.agro_climate import agro_climate_table  # noqa: E402
+from app.services.data_quality import critical_rows, evaluate_columns  # noqa: E402
+from app.services.forest_inference import CompiledForest  # noqa: E402
+from app.services.model_registry import (  # noqa: E402
+    FEATURE_COLUMNS,
+    MANIFEST_NAME,
+    RASTER_FEATURE_COLUMNS,
+    publish_version,
+)
+from app.services.raster_features import FarmLocation, RasterFeatureStore  # noqa: E402
+
 TARGET_COLUMN = "target_co2e"
 
 
@@ -28,21 +35,82 @@ def parse_args() -> argparse.Namespace:
         default="app/models/artifacts",
         help="Output directory for model artifact and metadata",
     )
+    parser.add_argument(
+        "--version",
+        default=None,
+        help="Publish as a versioned artifact under <outdir>/mrv/<version>/ and point the manifest at it",
+    )
+    parser.add_argument(
+        "--raster-dir",
+        default=None,
+        help="Directory of NDVI/rainfall raster tiles; adds their per-farm means as features "
+        "(needs latitude and longitude columns)",
+    )
     return parser.parse_args()
 
 
+def add_raster_columns(df: pd.DataFrame, raster_dir: Path) -> tuple[pd.DataFrame, dict[str, float], dict[str, float]]:
+    """Append `RASTER_FEATURE_COLUMNS` with the same zonal means the service computes online. Rows without
+    coverage get the column median, which is also what the service substitutes; returns the medians and
+    the covered fraction per column."""
+    missing = [col for col in ("latitude", "longitude") if col not in df.columns]
+    if missing:
+        raise ValueError(f"--raster-dir needs columns {missing}")
+    located = df[["latitude", "longitude"]].notna().all(axis=1).to_numpy()
+    keys = df["farmer_id"].tolist() if "farmer_id" in df.columns else df.index.tolist()
+    farms = [
+        FarmLocation(farm_key=(key, lat, lon), latitude=lat, longitude=lon, farm_size_hectares=size)
+        for key, lat, lon, size, has_point in zip(
+            keys, df["latitude"], df["longitude"], df["farm_size_hectares"], located
+        )
+        if has_point
+    ]
+    store = RasterFeatureStore.from_directory(raster_dir, cache_size=0)
+    values = pd.DataFrame(float("nan"), index=df.index, columns=RASTER_FEATURE_COLUMNS)
+    if farms:
+        values.loc[located, RASTER_FEATURE_COLUMNS] = store.features(farms)
+    coverage = {column: round(float(values[column].notna().mean()), 4) for column in RASTER_FEATURE_COLUMNS}
+    uncovered = [column for column, fraction in coverage.items() if not fraction]
+    if uncovered:
+        raise ValueError(f"No training row has a value for {uncovered} from the raster tiles in {raster_dir}")
+    fill_values = {column: round(float(values[column].median()), 6) for column in RASTER_FEATURE_COLUMNS}
+    return df.assign(**values.fillna(fill_values)), fill_values, coverage
+
+
 def main() -> None:
     args = parse_args()
     data_path = Path(args.data)
-    outdir = Path(args.outdir)
+    versions_dir = Path(args.outdir) / "mrv"
+    outdir = versions_dir / args.version if args.version else Path(args.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
 
     df = pd.read_csv(data_path)
+    if "state_factor" not in df.columns and "state" in df.columns:
+        # Raw farm records: derive the factor exactly as online scoring does.
+        districts = df["district"] if "district" in df.columns else None
+        df["state_factor"] = agro_climate_table().factors_for(df["state"], districts)
     missing = [col for col in FEATURE_COLUMNS + [TARGET_COLUMN] if col not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
-    X = df[FEATURE_COLUMNS]
+    # Rows with missing values or a critical data-quality violation (unit errors and the like) are not fit on.
+    complete = df.dropna(subset=FEATURE_COLUMNS + [TARGET_COLUMN])
+    rules, violations = evaluate_columns(complete)
+    flagged = critical_rows(rules, violations)
+    dropped = {"missing_values": int(len(df) - len(complete))}
+    for rule, count in zip(rules, violations[flagged].sum(axis=0)):
+        if rule.severity == "critical" and count:
+            dropped[rule.label] = int(count)
+    df = complete[~flagged]
+
+    feature_columns = FEATURE_COLUMNS
+    raster_metadata = {}
+    if args.raster_dir:
+        df, fill_values, coverage = add_raster_columns(df, Path(args.raster_dir))
+        feature_columns = FEATURE_COLUMNS + RASTER_FEATURE_COLUMNS
+        raster_metadata = {"raster_fill_values": fill_values, "raster_coverage": coverage}
+
+    X = df[feature_columns]
     y = df[TARGET_COLUMN]
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
@@ -60,18 +128,36 @@ def main() -> None:
         "r2": round(float(r2_score(y_test, preds)), 4),
         "train_rows": int(len(X_train)),
         "test_rows": int(len(X_test)),
-        "feature_columns": FEATURE_COLUMNS,
+        "dropped_rows": dropped,
+        "feature_columns": feature_columns,
+        **raster_metadata,
         "target_column": TARGET_COLUMN,
         "model_type": "RandomForestRegressor",
-        "model_version": "mrv_rf_v1",
+        "model_version": args.version or "mrv_rf_v1",
     }
 
     model_path = outdir / "mrv_model.joblib"
     meta_path = outdir / "mrv_model_meta.json"
+    forest_dir = outdir / "mrv_forest"
     joblib.dump(model, model_path)
+    CompiledForest.from_sklearn(model).save(forest_dir)
     meta_path.write_text(json.dumps(metrics, indent=2), encoding="utf-8")
-
-    print(json.dumps({"model": str(model_path), "metadata": str(meta_path), **metrics}, indent=2))
+    if args.version:
+        # Publish last: running services only switch once every file of the version is on disk.
+        publish_version(versions_dir, args.version)
+
+    print(
+        json.dumps(
+            {
+                "model": str(model_path),
+                "forest": str(forest_dir),
+                "metadata": str(meta_path),
+                "manifest": str(versions_dir / MANIFEST_NAME) if args.version else None,
+                **metrics,
+            },
+            indent=2,
+        )
+    )
 
 
 if __name__ == "__main__":
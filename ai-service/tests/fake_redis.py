@@ -0,0 +1,78 @@
+"""In-process stand-in for the subset of the Redis client API used by shared backends."""
+
+import threading
+import time
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self._data: dict[str, bytes] = {}
+        self._expires: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            return self._data[key] if self._live(key) else None
+
+    def set(self, key: str, value: bytes | str, ex: int | None = None, nx: bool = False) -> bool | None:
+        with self._lock:
+            if nx and self._live(key):
+                return None
+            self._data[key] = value.encode() if isinstance(value, str) else value
+            if ex is not None:
+                self._expires[key] = time.monotonic() + ex
+            else:
+                self._expires.pop(key, None)
+            return True
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            value = int(self._data[key]) + amount if self._live(key) else amount
+            self._data[key] = str(value).encode()
+            return value
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        return self.incr(key, -amount)
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            if not self._live(key):
+                return False
+            self._expires[key] = time.monotonic() + seconds
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            removed = sum(1 for key in keys if self._live(key))
+            for key in keys:
+                self._data.pop(key, None)
+                self._expires.pop(key, None)
+            return removed
+
+    def pipeline(self) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self._client = client
+        self._calls: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs) -> "FakePipeline":
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> list:
+        results = [getattr(self._client, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+        self._calls.clear()
+        return results
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from app.services.agro_climate import DEFAULT_FACTOR, AgroClimateTable, agro_climate_table, place_key
+
+
+@pytest.mark.parametrize(
+    ("variant", "canonical"),
+    [
+        ("Nasik", "Nashik"),
+        ("  NASHIK district ", "Nashik"),
+        ("Hissar", "Hisar"),
+        ("Bhatinda", "Bathinda"),
+        ("Chattisgarh", "Chhattisgarh"),
+        ("Dakshina-Kannada", "Dakshina Kannada"),
+        ("Bélgaum", "Belgaum"),
+    ],
+)
+def test_place_key_folds_spelling_variants(variant: str, canonical: str) -> None:
+    assert place_key(variant) == place_key(canonical)
+
+
+# The factors the service used before the table existed; the bundled table must reproduce them exactly.
+LEGACY_STATE_FACTORS = {
+    "maharashtra": 1.03,
+    "punjab": 0.94,
+    "haryana": 0.95,
+    "uttar pradesh": 1.01,
+    "karnataka": 1.06,
+    "madhya pradesh": 1.02,
+    "rajasthan": 0.91,
+    "bihar": 1.05,
+}
+
+
+def _district_table() -> AgroClimateTable:
+    # Illustrative values only, to exercise district rows and aliases.
+    return AgroClimateTable(
+        [
+            ("Maharashtra", None, 1.03, []),
+            ("Maharashtra", "Nashik", 0.5, []),
+            ("Maharashtra", "Chhatrapati Sambhajinagar", 0.6, ["Aurangabad"]),
+            ("Maharashtra", "Kolhapur", 0.7, []),
+            ("Karnataka", None, 1.06, []),
+            ("Karnataka", "Mysuru", 0.8, ["Mysore"]),
+            ("Odisha", None, 1.5, ["Orissa"]),
+        ]
+    )
+
+
+@pytest.mark.parametrize("state", [*LEGACY_STATE_FACTORS, "Madhya Pradesh", " PUNJAB ", "Kerala", "Gujarat", "Andhra Pradesh"])
+def test_bundled_state_lookups_match_legacy_factors(state: str) -> None:
+    expected = LEGACY_STATE_FACTORS.get(state.strip().lower(), DEFAULT_FACTOR)
+    assert agro_climate_table().factor(state) == expected
+    # The bundled table has no district rows, so a district never changes the factor.
+    assert agro_climate_table().factor(state, "Nashik") == expected
+
+
+def test_district_rows_aliases_and_fuzzy_matches() -> None:
+    table = _district_table()
+    assert table.factor("Maharashtra", "Nasik") == 0.5
+    # Old name (alias), romanization variant and a typo (fuzzy) all reach the district row.
+    assert table.factor("maharashtra", "Aurangabad") == table.factor("Maharashtra", "Chhatrapati Sambhajinagar")
+    assert table.factor("Karnataka", "Mysore") == table.factor("Karnataka", "Mysuru")
+    assert table.factor("Karnatak", "Mysuru") == 0.8
+    assert table.factor("Maharashtra", "Kolhapure") == 0.7
+    # Unknown district -> state-wide factor; unknown state -> default.
+    assert table.factor("Maharashtra", "Test") == 1.03
+    assert table.factor("Orissa", None) == table.factor("Odisha", "Khordha") == 1.5
+    assert table.factor("Atlantis", "Nashik") == DEFAULT_FACTOR
+
+
+def test_vectorized_lookup_matches_single_lookups() -> None:
+    table = _district_table()
+    rng = np.random.default_rng(2)
+    states = rng.choice(["Maharashtra", "karnataka ", "Orissa", "Kerala", "Atlantis", ""], 500).tolist()
+    districts = rng.choice(["Pune", "Mysore", "Aurangabad", "Nasik", "", None], 500).tolist()
+    np.testing.assert_array_equal(
+        table.factors_for(states, districts), [table.factor(state, district) for state, district in zip(states, districts)]
+    )
+    np.testing.assert_array_equal(agro_climate_table().factors_for(["Punjab", "Bihar"]), [0.94, 1.05])
+
+
+def test_colliding_names_are_rejected() -> None:
+    with pytest.raises(ValueError, match="both normalize to"):
+        AgroClimateTable([("Punjab", "Hisar", 0.9, []), ("Punjab", "Hissar", 0.8, [])])
+    with pytest.raises(ValueError, match="positive"):
+        AgroClimateTable([("Punjab", None, 0.0, [])])
+
+
+def test_table_loads_from_csv(tmp_path) -> None:
+    path = tmp_path / "factors.csv"
+    path.write_text("state,district,factor,aliases\nGoa,,1.2,\nGoa,North Goa,1.25,Bardez;Pernem\n", encoding="utf-8")
+    table = AgroClimateTable.from_csv(path)
+    assert table.factor("goa", "Pernem") == 1.25
+    assert table.factor("Goa", "South Goa") == 1.2
@@ -49,6 +49,30 @@ def test_voice_intent() -> None:
     assert response.json()["intent"] == "get_carbon_score"
 
 
+def test_vishnu_webhook_batch_answers_every_utterance() -> None:
+    response = client.post(
+        "/api/v1/integrations/vishnu/webhook:batch",
+        headers={"x-vishnu-secret": "dev-secret"},
+        json={
+            "items": [
+                {"session_id": "s-1", "utterance": "मुझे कार्बन स्कोर बताओ"},
+                {"session_id": "s-2", "utterance": "kya kare is mausam mein"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(item["session_id"], item["intent"]) for item in results] == [
+        ("s-1", "get_carbon_score"),
+        ("s-2", "get_recommendations"),
+    ]
+
+    rejected = client.post(
+        "/api/v1/integrations/vishnu/webhook:batch", json={"items": [{"session_id": "s", "utterance": "hi"}]}
+    )
+    assert rejected.status_code == 401
+
+
 def test_evidence_validation() -> None:
     response = client.post(
         "/api/v1/mrv/evidence/validate",
@@ -76,6 +100,17 @@ def test_ops_metrics_endpoint() -> None:
     assert "requests_by_path" in data
 
 
+def test_ops_metrics_prometheus_endpoint() -> None:
+    client.post("/api/v1/mrv/estimate", json=_estimate_payload())
+    response = client.get("/api/v1/ops/metrics/prometheus")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'agri_trust_http_request_duration_seconds_count{route="/api/v1/mrv/estimate",status_class="2xx"}' in body
+    for stage in ("rate_limit", "predict", "serialization"):
+        assert f'agri_trust_stage_duration_seconds_count{{stage="{stage}"}}' in body
+
+
 def test_auth_required_rejects_missing_token(monkeypatch) -> None:
     monkeypatch.setenv("AUTH_REQUIRED", "true")
     monkeypatch.setenv("AUTH_PROVIDER", "dev")
@@ -133,3 +168,203 @@ def test_role_guard_on_evidence_transition(monkeypatch) -> None:
 
     monkeypatch.setenv("AUTH_REQUIRED", "false")
     reset_auth_cache()
+
+
+def test_mrv_estimate_batch_reports_per_item_errors() -> None:
+    bad = _estimate_payload()
+    bad["practices"] = []
+    response = client.post("/api/v1/mrv/estimate:batch", json={"items": [_estimate_payload(), bad]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["succeeded"] == 1
+    assert data["failed"] == 1
+
+    single = client.post("/api/v1/mrv/estimate", json=_estimate_payload()).json()
+    assert data["results"][0]["result"] == single
+    assert data["results"][1]["result"] is None
+    assert "practices" in data["results"][1]["error"]
+
+
+def test_mrv_estimate_stream_scores_ndjson_and_csv() -> None:
+    import json
+
+    row = _estimate_payload()
+    body = "\n".join([json.dumps(row), "{broken", json.dumps(row)]) + "\n"
+    response = client.post(
+        "/api/v1/mrv/estimate:stream", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    single = client.post("/api/v1/mrv/estimate", json=row).json()
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[0]["result"] == single == lines[2]["result"]
+    assert lines[1]["result"] is None and lines[1]["error"]
+
+    profile = row["profile"]
+    csv_body = (
+        "farmer_id,state,district,farm_size_hectares,crop,irrigation_type,soil_organic_carbon_pct,language,"
+        "practices,baseline_yield_ton_per_hectare\n"
+        f"{profile['farmer_id']},{profile['state']},{profile['district']},{profile['farm_size_hectares']},"
+        f"{profile['crop']},{profile['irrigation_type']},{profile['soil_organic_carbon_pct']},{profile['language']},"
+        f"{';'.join(row['practices'])},{row['baseline_yield_ton_per_hectare']}\n"
+    )
+    response = client.post("/api/v1/mrv/estimate:stream", content=csv_body, headers={"content-type": "text/csv"})
+    assert [json.loads(line)["result"] for line in response.text.splitlines()] == [single]
+
+
+def test_mrv_estimate_stream_waits_for_a_saturated_pool(monkeypatch) -> None:
+    import json
+    import threading
+
+    from app.api import routes
+    from app.core.executors import BoundedExecutor
+
+    executor = BoundedExecutor(max_workers=1, max_pending=0, name="test-inference")
+    monkeypatch.setattr(routes, "inference_executor", executor)
+    executor._slots.acquire()
+    threading.Timer(0.2, executor._slots.release).start()
+    try:
+        body = "\n".join(json.dumps(_estimate_payload()) for _ in range(3)) + "\n"
+        response = client.post(
+            "/api/v1/mrv/estimate:stream", content=body, headers={"content-type": "application/x-ndjson"}
+        )
+    finally:
+        executor.shutdown()
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["error"] for line in lines] == [None, None, None]
+    assert all(line["result"] for line in lines)
+
+
+def test_rate_limited_request_returns_429(monkeypatch) -> None:
+    from app.core.rate_limit import rate_limiter
+
+    monkeypatch.setattr(rate_limiter, "limit", 0)
+    response = client.get("/health")
+    assert response.status_code == 429
+    assert response.headers.get("x-request-id") == response.json()["request_id"]
+
+
+def test_vishnu_webhook_retry_returns_stored_response() -> None:
+    body = {"session_id": "s-retry", "utterance": "mujhe salah chahiye"}
+    first = client.post("/api/v1/integrations/vishnu/webhook", headers={"x-vishnu-secret": "dev-secret"}, json=body)
+    retry = client.post("/api/v1/integrations/vishnu/webhook", headers={"x-vishnu-secret": "dev-secret"}, json=body)
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+
+    wrong = client.post("/api/v1/integrations/vishnu/webhook", headers={"x-vishnu-secret": "dev-secreT"}, json=body)
+    assert wrong.status_code == 401
+
+
+def test_recommendations_with_budget_return_plan() -> None:
+    body = {
+        "profile": _estimate_payload()["profile"],
+        "budget_inr_per_hectare": 8000,
+        "objective_weights": {"carbon": 1, "water": 1},
+    }
+    response = client.post("/api/v1/recommendations", json=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["plan"]["selected"]["cost_inr_per_hectare"] <= 8000
+    assert [item["practice"] for item in data["recommendations"]] == data["plan"]["selected"]["practices"]
+
+    top3 = client.post("/api/v1/recommendations", json={"profile": body["profile"]}).json()
+    assert len(top3["recommendations"]) == 3 and top3["plan"] is None
+
+
+def test_mrv_what_if_ranks_bundles_by_co2e_gain() -> None:
+    estimate = _estimate_payload()
+    body = {
+        "profile": estimate["profile"],
+        "current_practices": estimate["practices"],
+        "baseline_yield_ton_per_hectare": estimate["baseline_yield_ton_per_hectare"],
+        "bundles": [["residue_retention"], ["agroforestry", "biochar"], ["cover_crop", "drip_irrigation"]],
+    }
+    response = client.post("/api/v1/mrv/what-if", json=body)
+    assert response.status_code == 200
+    data = response.json()
+
+    baseline = client.post("/api/v1/mrv/estimate", json=estimate).json()
+    assert data["baseline_co2e_tons"] == baseline["estimated_annual_co2e_tons"]
+    deltas = [scenario["co2e_delta_tons"] for scenario in data["scenarios"]]
+    assert deltas == sorted(deltas, reverse=True)
+    assert data["scenarios"][0]["practices"] == ["agroforestry", "biochar"]
+    # cover_crop is already practised, so only drip irrigation is new in that bundle.
+    drip = next(scenario for scenario in data["scenarios"] if "drip_irrigation" in scenario["practices"])
+    assert [item["practice"] for item in drip["recommendations"]] == ["drip_irrigation"]
+
+
+def test_evidence_bulk_transition_persists_state() -> None:
+    body = {
+        "items": [
+            {"evidence_id": "bulk-1", "to_status": "in_review"},
+            {"evidence_id": "bulk-1", "to_status": "approved", "expected_version": 1},
+            {"evidence_id": "bulk-2", "to_status": "approved"},
+        ]
+    }
+    response = client.post("/api/v1/mrv/evidence/transition:bulk", json=body)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["applied"], data["rejected"]) == (2, 1)
+    assert [item["version"] for item in data["results"]] == [1, 2, 0]
+
+    again = client.post("/api/v1/mrv/evidence/transition", json={"evidence_id": "bulk-1", "to_status": "rejected"})
+    assert again.json()["from_status"] == "approved"
+    assert again.json()["allowed"] is False
+
+
+def test_evidence_batch_validation() -> None:
+    point = {"farmer_id": "f-001", "latitude": 18.52, "longitude": 73.86, "soil_organic_carbon_pct": 0.8}
+    response = client.post(
+        "/api/v1/mrv/evidence/validate:batch",
+        json={
+            "items": [
+                {**point, "state": "Maharashtra", "district": "Pune"},
+                {**point, "state": "Karnataka"},
+                {**point, "latitude": 31.55, "longitude": 74.34},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["valid"], body["invalid"]) == (2, 1)
+    assert [result["valid"] for result in body["results"]] == [True, True, False]
+    assert body["results"][1]["warnings"] == [
+        "Coordinates are not in the claimed state Karnataka; they fall in Maharashtra."
+    ]
+    assert body["results"][2]["issues"] == ["Coordinates appear outside India bounds."]
+
+
+def test_evidence_validation_flags_gps_point_reused_across_farmers() -> None:
+    point = {"latitude": 20.011, "longitude": 73.791, "soil_organic_carbon_pct": 0.61}
+    first = client.post("/api/v1/mrv/evidence/validate", json={**point, "farmer_id": "dup-a"})
+    assert first.json()["valid"] is True
+
+    second = client.post(
+        "/api/v1/mrv/evidence/validate", json={**point, "farmer_id": "dup-b", "soil_organic_carbon_pct": 1.4}
+    )
+    assert second.json()["valid"] is False
+    assert second.json()["issues"] == ["GPS point reused: within 15 m of evidence submitted for 1 other farmer ID(s)."]
+
+
+def test_evidence_soil_match_is_a_warning_and_rejected_evidence_is_not_recorded() -> None:
+    point = {"latitude": 19.52, "longitude": 74.41, "soil_organic_carbon_pct": 0.72}
+    assert client.post("/api/v1/mrv/evidence/validate", json={**point, "farmer_id": "soil-a"}).json()["valid"]
+
+    neighbour = client.post(
+        "/api/v1/mrv/evidence/validate", json={**point, "latitude": 19.5215, "farmer_id": "soil-b"}
+    ).json()
+    assert neighbour["valid"] is True and neighbour["issues"] == []
+    assert neighbour["warnings"][0].startswith("Soil test appears reused")
+
+    # Rejected (11 m from soil-a's point), so it must not flag the next farmer 11 m further on.
+    rejected = client.post(
+        "/api/v1/mrv/evidence/validate",
+        json={**point, "latitude": 19.5201, "soil_organic_carbon_pct": 1.9, "farmer_id": "soil-c"},
+    ).json()
+    assert rejected["valid"] is False
+    later = client.post(
+        "/api/v1/mrv/evidence/validate",
+        json={**point, "latitude": 19.5202, "soil_organic_carbon_pct": 2.5, "farmer_id": "soil-d"},
+    ).json()
+    assert later["valid"] is True and later["warnings"] == []
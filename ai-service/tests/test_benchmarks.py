@@ -0,0 +1,476 @@
+"""Latency benchmarks for hot paths. Opt in with RUN_BENCHMARKS=1 and run `pytest -s tests/test_benchmarks.py`."""
+
+import asyncio
+import logging
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+
+import httpx
+import pandas as pd
+import pytest
+from fastapi import Depends, FastAPI
+from sklearn.ensemble import RandomForestRegressor
+
+from app.core.rate_limit import SlidingWindowCounterLimiter, rate_limiter
+from app.main import app, request_context_middleware
+from app.models.schemas import (
+    FarmProfile,
+    RecommendationItem,
+    RecommendationRequest,
+    RecommendationResponse,
+    VoiceIntentRequest,
+)
+from app.services.evidence_dedup import DuplicateEvidenceDetector, EvidencePoint, distance_m
+from app.services.forest_inference import CompiledForest
+from app.services.geo_index import BoundaryIndex
+from app.services.intent_lexicon import IntentLexicon, IntentMatch, IntentSpec
+from app.services.model_registry import FEATURE_COLUMNS, prepare_mrv_model
+from app.services.mrv_engine import encode_features
+from app.services.recommender import (
+    OBJECTIVE_WEIGHT,
+    PRACTICE_COST_INR,
+    PRACTICE_RATIONALE,
+    generate_recommendations,
+    recommendation_response_json,
+    solve_budget_knapsack,
+)
+from app.services.text_normalization import normalize_transcript
+from app.services.voice_nlu import infer_intent
+
+pytestmark = pytest.mark.skipif(os.getenv("RUN_BENCHMARKS") != "1", reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+DATASET = Path(__file__).resolve().parents[2] / "docs" / "datasets" / "sample_mrv_training_data.csv"
+
+PROFILE = FarmProfile(
+    farmer_id="bench",
+    state="Maharashtra",
+    district="Nashik",
+    farm_size_hectares=2.4,
+    crop="millets",
+    irrigation_type="rainfed",
+    soil_organic_carbon_pct=0.9,
+)
+PRACTICES = ["cover_crop", "reduced_till"]
+
+
+def _per_call_us(fn: Callable[[], object], repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def _report(name: str, results: dict[str, float]) -> None:
+    print(f"\n{name}")
+    for label, value in results.items():
+        print(f"  {label:<32} {value:>12.1f} us/call")
+
+
+@pytest.fixture(scope="module")
+def production_forest() -> RandomForestRegressor:
+    df = pd.read_csv(DATASET)
+    model = RandomForestRegressor(n_estimators=300, max_depth=10, random_state=42)
+    model.fit(df[FEATURE_COLUMNS], df["target_co2e"])
+    return model
+
+
+def test_bench_feature_encoding(production_forest) -> None:
+    def dataframe_path() -> float:
+        frame = pd.DataFrame(
+            [
+                {
+                    "farm_size_hectares": PROFILE.farm_size_hectares,
+                    "state_factor": 1.03,
+                    "soil_organic_carbon_pct": PROFILE.soil_organic_carbon_pct,
+                    "baseline_yield_ton_per_hectare": 1.8,
+                    "practice_score": 0.76,
+                }
+            ]
+        )
+        return production_forest.predict(frame)[0]
+
+    results = {
+        "encode DataFrame": _per_call_us(lambda: pd.DataFrame([dict(zip(FEATURE_COLUMNS, range(5)))]), 2000),
+        "encode ndarray": _per_call_us(lambda: encode_features(PROFILE, PRACTICES, 1.8), 2000),
+        "DataFrame + predict": _per_call_us(dataframe_path, 100),
+    }
+    array_model = prepare_mrv_model(production_forest, {"feature_columns": FEATURE_COLUMNS})
+    results["ndarray + predict"] = _per_call_us(
+        lambda: array_model.predict(encode_features(PROFILE, PRACTICES, 1.8))[0], 100
+    )
+    _report("MRV single-request feature path (300-tree forest)", results)
+
+    assert results["encode ndarray"] < results["encode DataFrame"]
+
+
+def test_bench_compiled_forest(production_forest) -> None:
+    df = pd.read_csv(DATASET)
+    batch = df[FEATURE_COLUMNS].to_numpy(dtype="float64")
+    single = batch[:1]
+    compiled = CompiledForest.from_sklearn(production_forest)
+
+    results = {
+        "sklearn predict (1 row)": _per_call_us(lambda: production_forest.predict(single), 50),
+        "compiled predict (1 row)": _per_call_us(lambda: compiled.predict(single), 500),
+        f"sklearn predict ({len(batch)} rows)": _per_call_us(lambda: production_forest.predict(batch), 20),
+        f"compiled predict ({len(batch)} rows)": _per_call_us(lambda: compiled.predict(batch), 20),
+    }
+    _report("MRV forest inference (300 trees, depth 10)", results)
+
+    assert results["compiled predict (1 row)"] < results["sklearn predict (1 row)"]
+
+
+def _allocated_bytes(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    keep = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keep
+    return size
+
+
+def test_bench_rate_limiter_memory_and_contention() -> None:
+    keys, hits_per_key = 200, 100
+
+    def deque_store() -> dict:
+        store: dict[str, deque] = {}
+        for k in range(keys):
+            store[f"10.0.0.{k}:/api"] = deque(6000.0 + i * 0.01 for i in range(hits_per_key))
+        return store
+
+    def counter_store() -> SlidingWindowCounterLimiter:
+        limiter = SlidingWindowCounterLimiter(limit=10_000, window_seconds=60)
+        for k in range(keys):
+            for i in range(hits_per_key):
+                limiter.hit(f"10.0.0.{k}:/api", now=6000.0 + i * 0.01)
+        return limiter
+
+    print(f"\nRate limiter memory ({keys} keys x {hits_per_key} hits in window)")
+    print(f"  deque of timestamps              {_allocated_bytes(deque_store) / keys:>10.0f} B/key")
+    print(f"  sliding-window counter           {_allocated_bytes(counter_store) / keys:>10.0f} B/key")
+
+    def throughput(stripes: int, threads: int = 8, hits: int = 20_000) -> float:
+        limiter = SlidingWindowCounterLimiter(limit=10**9, window_seconds=60, stripes=stripes)
+
+        def worker(worker_id: int) -> None:
+            for i in range(hits):
+                limiter.hit(f"10.0.{worker_id}.{i % 50}:/api")
+
+        pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        started = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return threads * hits / (time.perf_counter() - started)
+
+    print("Rate limiter throughput, 8 threads")
+    for stripes in (1, 64):
+        print(f"  {stripes:>2} stripe(s)                      {throughput(stripes):>10.0f} hits/s")
+
+
+def _threadpool_app() -> FastAPI:
+    """The same CPU-cheap handlers declared as plain `def`, i.e. dispatched through the anyio threadpool."""
+    sync_app = FastAPI()
+    sync_app.middleware("http")(request_context_middleware)
+
+    def sync_user() -> dict:
+        return {"uid": "anonymous", "role": "admin"}
+
+    @sync_app.post("/api/v1/voice/intent")
+    def voice_intent(payload: VoiceIntentRequest, _: dict = Depends(sync_user)) -> dict:
+        intent, confidence, response = infer_intent(payload)
+        return {"intent": intent, "confidence": confidence, "response_text": response}
+
+    @sync_app.post("/api/v1/recommendations")
+    def recommendations(payload: RecommendationRequest, _: dict = Depends(sync_user)) -> dict:
+        return {"recommendations": [item.model_dump() for item in generate_recommendations(payload)]}
+
+    return sync_app
+
+
+async def _load(asgi_app: FastAPI, path: str, body: dict, requests: int, concurrency: int) -> tuple[float, float, float]:
+    transport = httpx.ASGITransport(app=asgi_app)
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+
+        async def one() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await http.post(path, json=body)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return requests / elapsed, statistics.median(latencies) * 1e3, latencies[int(len(latencies) * 0.99)] * 1e3
+
+
+def test_bench_async_routes_in_process(monkeypatch) -> None:
+    monkeypatch.setattr(rate_limiter, "limit", 10**9)
+    monkeypatch.setattr(logging.getLogger("agri-trust.ai"), "disabled", True)
+    cases = {
+        "/api/v1/voice/intent": {"transcript": "मुझे कार्बन स्कोर बताओ", "language": "hi"},
+        "/api/v1/recommendations": {"profile": PROFILE.model_dump(), "objective": "carbon"},
+    }
+    print("\nIn-process ASGI load test (2000 requests, concurrency 64)")
+    for path, body in cases.items():
+        for label, asgi_app in (("threadpool def", _threadpool_app()), ("async def", app)):
+            rps, p50, p99 = asyncio.run(_load(asgi_app, path, body, requests=2000, concurrency=64))
+            print(f"  {path:<26} {label:<15} {rps:>8.0f} req/s  p50 {p50:>6.2f} ms  p99 {p99:>6.2f} ms")
+
+
+def test_intent_lexicon_with_10k_terms() -> None:
+    import random
+
+    rng = random.Random(0)
+    alphabet = "abcdefghijklmnopqrstuvwxyzकखगघचछजझटठडढतथदधनपफबभमयरलवशसह"
+    intents = []
+    for intent_index in range(20):
+        keywords = {"".join(rng.choices(alphabet, k=rng.randint(4, 12))) for _ in range(500)}
+        intents.append(IntentSpec(f"intent_{intent_index}", 0.8, "", tuple(sorted(keywords))))
+    fallback = IntentMatch("unknown", 0.45, "", ())
+
+    started = time.perf_counter()
+    lexicon = IntentLexicon(intents, fallback)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    transcript = "kal mere khet mein barish hogi kya aur carbon score kitna hai मुझे सलाह चाहिए " + intents[19].keywords[3]
+    keyword_lists = [[keyword.lower() for keyword in spec.keywords] for spec in intents]
+
+    def substring_scan() -> str:
+        text = transcript.strip().lower()
+        for spec, keywords in zip(intents, keyword_lists):
+            if any(keyword in text for keyword in keywords):
+                return spec.name
+        return "unknown"
+
+    assert substring_scan() == lexicon.best(transcript).intent == "intent_19"
+    def cold_lookup() -> str:
+        normalize_transcript.cache_clear()
+        return lexicon.best(transcript).intent
+
+    print(f"\nintent lexicon: {lexicon.keyword_count} terms, index built in {build_ms:.0f} ms")
+    _report(
+        "intent match, 10k-term lexicon",
+        {
+            "`in` scan over every keyword": _per_call_us(substring_scan, 200),
+            "token index, cold normalize": _per_call_us(cold_lookup, 2000),
+            "token index, memoized normalize": _per_call_us(lambda: lexicon.best(transcript), 2000),
+        },
+    )
+
+
+def test_intent_model_latency(tmp_path) -> None:
+    import subprocess
+    import sys
+
+    from app.services.intent_model import load_intent_artifact
+
+    service_dir = Path(__file__).resolve().parents[1]
+    subprocess.run(
+        [
+            sys.executable,
+            "ml/train_intent_model.py",
+            "--data",
+            str(DATASET.parent / "sample_intent_training_data.csv"),
+            "--outdir",
+            str(tmp_path),
+        ],
+        cwd=service_dir,
+        check=True,
+        capture_output=True,
+    )
+    model = load_intent_artifact(tmp_path).model
+    utterances = [
+        "mujhe apni fasal ke liye salah chahiye",
+        "मेरा कार्बन स्कोर कितना है",
+        "carbon credit kitna milega is saal",
+        "aaj mandi bhav kya hai",
+    ]
+
+    def percentiles(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - started)
+        latencies.sort()
+        return statistics.median(latencies) * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+    print("\nintent model inference (us)")
+    for label, fn in {
+        "single utterance, cold normalize": lambda: (normalize_transcript.cache_clear(), model.predict_proba(utterances[:1])),
+        "single utterance": lambda: model.predict_proba(utterances[:1]),
+        "batch of 32": lambda: model.predict_proba(utterances * 8),
+    }.items():
+        p50, p99 = percentiles(fn, 3000)
+        print(f"  {label:<34} p50 {p50:>8.1f}  p99 {p99:>8.1f}")
+        assert p99 < 1000 or label == "batch of 32"
+
+
+def test_bench_recommendations() -> None:
+    payload = RecommendationRequest(profile=PROFILE, current_practices=PRACTICES, objective="carbon")
+
+    def per_request() -> bytes:
+        ranking = OBJECTIVE_WEIGHT[payload.objective]
+        candidates = [k for k in ranking if k not in payload.current_practices]
+        items = [
+            RecommendationItem(
+                practice=practice,
+                impact_score=round(ranking[practice], 2),
+                rationale=PRACTICE_RATIONALE[practice],
+                estimated_cost_inr_per_hectare=PRACTICE_COST_INR[practice],
+            )
+            for practice in sorted(candidates, key=lambda x: ranking[x], reverse=True)[:3]
+        ]
+        return RecommendationResponse(recommendations=items, advisory_note="").model_dump_json().encode()
+
+    _report(
+        "recommendations, rank + serialize",
+        {
+            "per-request sort and dump": _per_call_us(per_request, 20_000),
+            "precomputed table": _per_call_us(lambda: generate_recommendations(payload), 20_000),
+            "pre-serialized response": _per_call_us(lambda: recommendation_response_json(payload), 20_000),
+        },
+    )
+
+
+def test_bench_budget_optimizer_catalog_sizes() -> None:
+    import random
+
+    rng = random.Random(0)
+    print("\nbudget knapsack, exact frontier (budget 50,000 INR/ha)")
+    for size in (8, 100, 300):
+        for step, label in ((100, "prices in 100s"), (1, "arbitrary prices")):
+            costs = [rng.randint(5, 250) * 100 + (rng.randint(0, 99) if step == 1 else 0) for _ in range(size)]
+            values = [rng.random() for _ in range(size)]
+            per_call = _per_call_us(lambda: solve_budget_knapsack(costs, values, 50_000), 5 if step == 1 else 50)
+            print(f"  {size:>3} practices, {label:<17} {per_call / 1000:>10.2f} ms/call")
+
+
+def test_bench_boundary_lookup_polygon_counts() -> None:
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    print("\npoint-in-polygon, per point (batch of 1,000)")
+    for side in (10, 32, 100):
+        # side x side hexagon-ish cells tiling a 30-degree square, like districts over India.
+        size = 30.0 / side
+        features = []
+        for x in range(side):
+            for y in range(side):
+                cx, cy = 68.0 + (x + 0.5) * size, 6.0 + (y + 0.5) * size
+                ring = [[cx + 0.5 * size * np.cos(a), cy + 0.5 * size * np.sin(a)] for a in np.linspace(0, 2 * np.pi, 7)]
+                features.append(
+                    {
+                        "properties": {"level": "district", "name": f"d{x}-{y}", "state": "s"},
+                        "geometry": {"type": "Polygon", "coordinates": [ring]},
+                    }
+                )
+        index = BoundaryIndex.from_geojson({"features": features}, cell_degrees=size)
+        lats, lons = rng.uniform(6.0, 36.0, 1_000), rng.uniform(68.0, 98.0, 1_000)
+
+        def linear_scan() -> np.ndarray:
+            found = np.full(len(lats), -1)
+            for part in index.parts:
+                found[(found < 0) & part.contains(lons, lats)] = part.region
+            return found
+
+        np.testing.assert_array_equal(index.locate(lats, lons).district, linear_scan())
+        indexed = _per_call_us(lambda: index.locate(lats, lons), 20) / len(lats)
+        linear = _per_call_us(linear_scan, 3) / len(lats)
+        print(f"  {side * side:>6} polygons  grid index {indexed:>8.2f} us  linear scan {linear:>9.2f} us")
+
+
+def test_bench_evidence_duplicate_check_window_sizes() -> None:
+    import random
+
+    rng = random.Random(0)
+
+    def submission(index: int) -> EvidencePoint:
+        return EvidencePoint(f"f-{index}", rng.uniform(8.0, 32.0), rng.uniform(70.0, 90.0), round(rng.uniform(0.2, 2.0), 2))
+
+    print("\nevidence duplicate check, per submission")
+    for window in (1_000, 10_000, 100_000):
+        history = [submission(index) for index in range(window)]
+        detector = DuplicateEvidenceDetector(window=window)
+        detector.check(history)
+        probes = [submission(window + index) for index in range(200)]
+
+        def linear_scan(point: EvidencePoint) -> bool:
+            return any(other.farmer_id != point.farmer_id and distance_m(point, other) <= 15 for other in history)
+
+        hashed = _per_call_us(lambda: detector.check(probes, record=False), 20) / len(probes)
+        linear = _per_call_us(lambda: [linear_scan(point) for point in probes[:5]], 1) / 5
+        print(f"  window {window:>7,}  spatial hash {hashed:>8.2f} us  linear scan {linear:>10.1f} us")
+
+
+def test_bench_raster_zonal_features(tmp_path) -> None:
+    import json
+
+    import numpy as np
+
+    from app.services.raster_features import FarmLocation, RasterFeatureStore
+
+    rng = np.random.default_rng(0)
+    # A 10 m NDVI tile over ~22 km x 22 km, memory-mapped from disk, and a coarse rainfall tile.
+    np.save(tmp_path / "ndvi.npy", rng.uniform(0.0, 0.9, (2_000, 2_000)).astype(np.float32))
+    (tmp_path / "ndvi.json").write_text(json.dumps({"layer": "ndvi", "west": 73.0, "north": 20.2, "pixel_size_deg": 0.0001}))
+    np.save(tmp_path / "rainfall.npy", rng.uniform(500, 1_200, (10, 10)))
+    (tmp_path / "rainfall.json").write_text(
+        json.dumps({"layer": "rainfall_mm", "west": 72.9, "north": 20.3, "pixel_size_deg": 0.05})
+    )
+    farms = [
+        FarmLocation(f"f-{index}", rng.uniform(20.02, 20.18), rng.uniform(73.02, 73.18), rng.uniform(0.5, 5.0))
+        for index in range(1_000)
+    ]
+    store = RasterFeatureStore.from_directory(tmp_path)
+    uncached = RasterFeatureStore(store.tiles, cache_size=0)
+
+    _report(
+        "raster zonal features, per farm (1,000 farms, 10 m NDVI)",
+        {
+            "one read per farm": _per_call_us(lambda: [uncached.features([farm]) for farm in farms], 1) / len(farms),
+            "one read per tile": _per_call_us(lambda: uncached.features(farms), 5) / len(farms),
+            "cached (tile, farm)": _per_call_us(lambda: store.features(farms), 20) / len(farms),
+        },
+    )
+
+
+def test_bench_agro_climate_lookup() -> None:
+    import numpy as np
+
+    from app.services.agro_climate import agro_climate_table
+
+    table = agro_climate_table()
+    legacy = {"maharashtra": 1.03, "punjab": 0.94, "karnataka": 1.06, "bihar": 1.05}
+    rng = np.random.default_rng(0)
+    states = rng.choice(["Maharashtra", "Punjab ", "karnataka", "Bihar", "Kerala"], 10_000).tolist()
+    districts = rng.choice(["Nashik", "Nasik", "Ludhiana", "Mysore", "Patna", "Idukki"], 10_000).tolist()
+    table.factors_for(states, districts)
+
+    _report(
+        "agro-climate factor, per farm",
+        {
+            "state dict (old, no district)": _per_call_us(lambda: legacy.get("Punjab ".strip().lower(), 1.0), 200_000),
+            "table.factor (memoized slot)": _per_call_us(lambda: table.factor("Punjab ", "Ludhiana"), 200_000),
+            "row loop, 10k farms": _per_call_us(
+                lambda: [table.factor(state, district) for state, district in zip(states, districts)], 5
+            )
+            / len(states),
+            "factors_for, 10k farms": _per_call_us(lambda: table.factors_for(states, districts), 20) / len(states),
+        },
+    )
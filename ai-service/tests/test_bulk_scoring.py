@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+from app.models.schemas import MrvEstimateRequest
+from app.services.bulk_scoring import (
+    RecordDecoder,
+    aiter_lines,
+    iter_scored,
+    score_records,
+)
+from app.services.mrv_engine import estimate_annual_co2e
+
+ROW = {
+    "profile": {
+        "farmer_id": "f-bulk",
+        "state": "Punjab",
+        "district": "Ludhiana",
+        "farm_size_hectares": 3.0,
+        "crop": "wheat",
+        "irrigation_type": "flood",
+        "soil_organic_carbon_pct": 0.6,
+    },
+    "practices": ["cover_crop", "reduced_till"],
+    "baseline_yield_ton_per_hectare": 3.2,
+}
+
+CSV_HEADER = "farmer_id,state,district,farm_size_hectares,crop,irrigation_type,soil_organic_carbon_pct,practices,baseline_yield_ton_per_hectare"
+CSV_ROW = "f-bulk,Punjab,Ludhiana,3.0,wheat,flood,0.6,cover_crop;reduced_till,3.2"
+
+
+async def _collect(chunks: list[bytes], max_line_bytes: int) -> list:
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    return [line async for line in aiter_lines(source(), max_line_bytes)]
+
+
+def test_csv_rows_decode_to_the_same_request_as_ndjson() -> None:
+    decoder = RecordDecoder("csv")
+    assert decoder.feed(CSV_HEADER) is None
+    record = decoder.feed(CSV_ROW)
+    assert MrvEstimateRequest.model_validate(record) == MrvEstimateRequest.model_validate(ROW)
+
+
+def test_unknown_csv_columns_are_reported_on_every_row() -> None:
+    decoder = RecordDecoder("csv")
+    decoder.feed("farmer_id,acreage")
+    try:
+        decoder.feed("f-1,3")
+    except ValueError as exc:
+        assert "acreage" in str(exc)
+    else:  # pragma: no cover
+        raise AssertionError("expected ValueError")
+
+
+def test_stream_results_keep_input_indexes_across_chunks() -> None:
+    lines = [json.dumps(ROW), "", "not json", json.dumps({**ROW, "practices": []}), json.dumps(ROW)]
+    results = list(iter_scored(lines, "ndjson", chunk_size=2))
+
+    assert [item.index for item in results] == [0, 1, 2, 3]
+    assert results[0].result is not None and results[3].result is not None
+    assert results[1].error and results[2].error and "practices" in results[2].error
+
+    estimate, confidence, _, model_version = estimate_annual_co2e(
+        MrvEstimateRequest.model_validate(ROW).profile, ROW["practices"], ROW["baseline_yield_ton_per_hectare"]
+    )
+    assert results[0].result.estimated_annual_co2e_tons == estimate
+    assert results[0].result.model_version == model_version
+
+
+def test_score_records_reports_decode_errors_in_place() -> None:
+    results = score_records([ValueError("bad line"), ROW], start_index=10)
+    assert [item.index for item in results] == [10, 11]
+    assert results[0].error == "bad line"
+    assert results[1].result is not None
+
+
+def test_line_splitter_handles_split_chunks_and_oversized_lines() -> None:
+    lines = asyncio.run(_collect([b"ab", b"c\r\nde", b"f\n" + b"x" * 30, b"x" * 30 + b"\nlast"], max_line_bytes=16))
+    assert lines[:2] == ["abc", "def"]
+    assert isinstance(lines[2], ValueError) and "exceeds" in str(lines[2])
+    assert lines[3:] == ["last"]
@@ -0,0 +1,80 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from app.models.schemas import FarmProfile
+from app.services.data_quality import (
+    QUALITY_RULES,
+    critical_rows,
+    evaluate_columns,
+    quality_score_from_warnings,
+    quality_scores,
+    quality_warnings,
+    warnings_by_row,
+)
+
+SIZES = [0.5, 8, 8.01, 150]
+YIELDS = [0.8, 1.2, 3.0, 7.6, 20]
+SOILS = [0.1, 0.4, 2.0, 7.0]
+PRACTICES = [["cover_crop"], ["cover_crop", "biochar"]]
+
+
+def _grid() -> list[tuple[float, float, float, list[str]]]:
+    return list(itertools.product(SIZES, YIELDS, SOILS, PRACTICES))
+
+
+def test_columnwise_evaluation_matches_row_by_row() -> None:
+    grid = _grid()
+    frame = pd.DataFrame(
+        {
+            "farm_size_hectares": [size for size, *_ in grid],
+            "baseline_yield_ton_per_hectare": [baseline for _, baseline, *_ in grid],
+            "soil_organic_carbon_pct": [soil for *_, soil, _ in grid],
+            "practice_count": [len(practices) for *_, practices in grid],
+        }
+    )
+    rules, violations = evaluate_columns(frame)
+    assert rules == list(QUALITY_RULES)
+
+    expected = []
+    for size, baseline, soil, practices in grid:
+        profile = FarmProfile(
+            farmer_id="f",
+            state="Bihar",
+            district="Patna",
+            farm_size_hectares=size,
+            crop="rice",
+            irrigation_type="flood",
+            soil_organic_carbon_pct=soil,
+        )
+        expected.append(quality_warnings(profile, practices, baseline))
+
+    assert warnings_by_row(rules, violations) == expected
+    assert quality_scores(rules, violations).tolist() == [quality_score_from_warnings(w) for w in expected]
+
+
+def test_severity_weights_scores() -> None:
+    info, warning, critical = (
+        next(rule.message for rule in QUALITY_RULES if rule.severity == severity)
+        for severity in ("info", "warning", "critical")
+    )
+    assert quality_score_from_warnings([]) == 0.95
+    assert quality_score_from_warnings([info]) == 0.91
+    assert quality_score_from_warnings([warning]) == 0.87
+    assert quality_score_from_warnings([critical]) == 0.7
+    assert quality_score_from_warnings([critical, critical, warning]) == 0.45
+
+
+def test_training_frame_skips_rules_without_columns_and_flags_critical_rows() -> None:
+    frame = pd.DataFrame(
+        {
+            "farm_size_hectares": [2.0, 250.0, 3.0],
+            "baseline_yield_ton_per_hectare": [2.5, 2.5, 9.0],
+            "soil_organic_carbon_pct": [0.8, 0.8, 0.8],
+        }
+    )
+    rules, violations = evaluate_columns(frame)
+    assert all(rule.field != "practice_count" for rule in rules)
+    assert critical_rows(rules, violations).tolist() == [False, True, False]
+    assert np.array_equal(violations.any(axis=1), [False, True, True])
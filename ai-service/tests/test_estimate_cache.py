@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from app.core.monitoring import metrics_store
+from app.models.schemas import FarmProfile, MrvEstimateRequest
+from app.services.estimate_cache import EstimateCache, estimate_keys
+from app.services.model_registry import LoadedModel, mrv_registry
+from app.services.mrv_engine import estimate_annual_co2e, estimate_annual_co2e_batch, estimate_cache
+
+
+class CountingModel:
+    def __init__(self) -> None:
+        self.rows: list[int] = []
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        self.rows.append(len(features))
+        return features[:, 0] * 1.5 + features[:, -1]
+
+
+def _profile(farmer_id: str = "f-1", size: float = 2.4) -> FarmProfile:
+    return FarmProfile(
+        farmer_id=farmer_id,
+        state="Punjab",
+        district="Ludhiana",
+        farm_size_hectares=size,
+        crop="wheat",
+        irrigation_type="flood",
+    )
+
+
+@pytest.fixture
+def model():
+    previous = mrv_registry.current()
+    counting = CountingModel()
+    mrv_registry.install(LoadedModel(model=counting, metadata={"r2": 0.8}, version="cache_test_v1"))
+    yield counting
+    mrv_registry.install(previous)
+
+
+def _cache_counts() -> dict[str, int]:
+    return dict(metrics_store.snapshot()["mrv_estimate_cache"])
+
+
+def test_repeat_estimate_is_served_from_cache_regardless_of_order_and_farmer(model) -> None:
+    before = _cache_counts()
+    first = estimate_annual_co2e(_profile("f-1"), ["cover_crop", "biochar"], 2.0)
+    again = estimate_annual_co2e(_profile("f-2"), ["biochar", "cover_crop"], 2.0)
+    # 2.4 written differently by an upstream parser still lands on the same key.
+    noisy = estimate_annual_co2e(_profile("f-3", size=2.4000000000000004), ["cover_crop", "biochar"], 2.0)
+
+    assert first == again == noisy
+    assert model.rows == [1]
+    after = _cache_counts()
+    assert after.get("hit", 0) - before.get("hit", 0) == 2
+    assert after.get("miss", 0) - before.get("miss", 0) == 1
+
+
+def test_keys_hold_only_version_and_features() -> None:
+    features = np.array([[2.4, 0.94, 0.7, 2.0, 1.14]])
+    (key,) = estimate_keys("v1", features, [2])
+    assert key == ("v1", 2.4, 0.94, 0.7, 2.0, 1.14, 2)
+
+
+def test_model_swap_clears_cache(model) -> None:
+    estimate_annual_co2e(_profile(), ["no_till"], 2.0)
+    assert len(estimate_cache) > 0
+    mrv_registry.install(LoadedModel(model=model, metadata={"r2": 0.8}, version="cache_test_v2"))
+    assert len(estimate_cache) == 0
+    assert estimate_annual_co2e(_profile(), ["no_till"], 2.0)[3] == "cache_test_v2"
+
+
+def test_batch_scores_only_cache_misses(model) -> None:
+    items = [
+        MrvEstimateRequest(profile=_profile(size=size), practices=["cover_crop"], baseline_yield_ton_per_hectare=2.0)
+        for size in (1.0, 2.0, 3.0)
+    ]
+    single = estimate_annual_co2e(items[1].profile, ["cover_crop"], 2.0)
+    results = estimate_annual_co2e_batch(items)
+
+    assert results[1] == single
+    assert model.rows == [1, 2]
+    assert estimate_annual_co2e_batch(items) == results
+    assert model.rows == [1, 2]
+
+
+def test_cache_ttl_and_bound() -> None:
+    now = [0.0]
+    cache = EstimateCache(maxsize=2, ttl_seconds=10, clock=lambda: now[0])
+    value = (1.0, 0.7, "x", "v1")
+    cache.put_many(["a", "b", "c"], [value] * 3)
+    assert cache.get_many(["a", "b", "c"]) == [None, value, value]
+
+    now[0] = 11
+    assert cache.get_many(["b", "c"]) == [None, None]
+    assert len(cache) == 0
+
+    disabled = EstimateCache(maxsize=0, ttl_seconds=10)
+    disabled.put_many(["a"], [value])
+    assert disabled.get_many(["a"]) == [None]
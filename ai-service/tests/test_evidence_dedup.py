@@ -0,0 +1,130 @@
+import math
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.evidence_dedup import (
+    DuplicateEvidenceDetector,
+    EvidencePoint,
+    load_duplicate_detector,
+    save_duplicate_detector,
+)
+
+NASHIK = (20.0, 73.79)
+# ~0.000009 degrees of latitude per metre.
+METRE = 1 / 111_320
+
+
+def _point(farmer_id: str, north_m: float = 0.0, soil: float = 0.8, east_m: float = 0.0) -> EvidencePoint:
+    lat, lon = NASHIK
+    return EvidencePoint(farmer_id, lat + north_m * METRE, lon + east_m * METRE / math.cos(math.radians(lat)), soil)
+
+
+def test_gps_point_reused_by_another_farmer() -> None:
+    detector = DuplicateEvidenceDetector(gps_radius_m=15, soil_radius_m=500, soil_tolerance=0.005)
+    first, same_farmer, neighbour, far = detector.check(
+        [_point("f-1"), _point("f-1", 3, 0.7), _point("f-2", 10, 0.6, 5), _point("f-3", 40, 1.2)]
+    )
+    assert first == same_farmer == far == ([], [])
+    assert neighbour == (["GPS point reused: within 15 m of evidence submitted for 1 other farmer ID(s)."], [])
+
+
+def test_soil_reading_reused_nearby() -> None:
+    detector = DuplicateEvidenceDetector(gps_radius_m=15, soil_radius_m=500, soil_tolerance=0.005)
+    detector.check([_point("f-1", soil=0.734)])
+    moved, other_value, too_far = detector.check(
+        [_point("f-2", 300, 0.737), _point("f-3", 0, 0.9, 300), _point("f-4", 2_000, 0.734)]
+    )
+    # Honest neighbours can share a two-decimal lab value, so a soil match is a warning, not an issue.
+    assert moved == ([], ["Soil test appears reused: same soil organic carbon reading (within 0.005) as "
+                          "1 other farmer ID(s) within 500 m."])  # fmt: skip
+    assert other_value == too_far == ([], [])
+
+
+def test_check_without_recording_and_window_eviction() -> None:
+    detector = DuplicateEvidenceDetector(window=2)
+    detector.check([_point("f-1")], record=False)
+    assert len(detector) == 0
+
+    detector.check([_point("f-1"), _point("f-2", 1_000, 2.0), _point("f-3", 2_000, 3.0)])
+    assert len(detector) == 2
+    # f-1 has been evicted, so reusing its point is no longer caught.
+    assert detector.check([_point("f-9")]) == [([], [])]
+
+
+def test_save_and_load_round_trip(tmp_path) -> None:
+    detector = DuplicateEvidenceDetector()
+    detector.check([_point("f-1"), _point("f-2", 1_000, 2.0)])
+    path = tmp_path / "state" / "dedup.npz"
+    detector.save(path)
+
+    restored = DuplicateEvidenceDetector()
+    assert restored.load(path) == 2
+    assert restored.check([_point("f-3", 1_000, 2.0)], record=False) == detector.check(
+        [_point("f-3", 1_000, 2.0)], record=False
+    )
+    assert restored.check([_point("f-3", 1_000, 2.0)])[0][0]
+
+
+def test_workers_saving_to_one_path_keep_each_others_submissions(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "evidence_dedup_state_path", str(tmp_path / "dedup.npz"))
+    workers = [DuplicateEvidenceDetector(), DuplicateEvidenceDetector()]
+    for worker in workers:
+        load_duplicate_detector(worker)
+    workers[0].check([_point("f-1"), _point("f-2", 1_000, 2.0)])
+    workers[1].check([_point("f-2", 1_000, 2.0), _point("f-3", 2_000, 3.0)])
+    for worker in workers:
+        save_duplicate_detector(worker)
+
+    restarted = DuplicateEvidenceDetector()
+    load_duplicate_detector(restarted)
+    assert len(restarted) == 3
+    assert restarted.check([_point("f-9"), _point("f-9", 2_000)], record=False)[1][0]
+
+
+def test_only_accepted_points_are_recorded_and_retries_are_not_duplicated() -> None:
+    detector = DuplicateEvidenceDetector()
+    detector.check([_point("f-1"), _point("f-2", 1_000, 2.0)], record=[False, True])
+    assert len(detector) == 1
+    # f-1 was rejected elsewhere, so f-3 reusing its point is not flagged.
+    assert detector.check([_point("f-3")], record=False) == [([], [])]
+
+    # A GPS collision is not recorded when flagged submissions are excluded.
+    detector.check([_point("f-4", 1_000, 3.0)], record_flagged=False)
+    assert len(detector) == 1
+
+    detector.check([_point("f-2", 1_000, 2.0)] * 3)
+    assert len(detector) == 1
+
+
+def test_rescan_matches_pairwise_comparison() -> None:
+    rng = np.random.default_rng(11)
+    count = 600
+    north, east = rng.uniform(0, 3_000, count), rng.uniform(0, 3_000, count)
+    soil = rng.choice([0.5, 0.52, 0.8, 1.1], count) + rng.uniform(0, 0.003, count)
+    farmers = [f"f-{farmer}" for farmer in rng.integers(0, 400, count)]
+    # Plant exact reuses of earlier rows under new farmer IDs.
+    for row in range(100, count, 50):
+        north[row], east[row], soil[row] = north[row - 7], east[row - 7], soil[row - 7]
+        farmers[row] = f"fraud-{row}"
+    points = [_point(farmers[i], north[i], soil[i], east[i]) for i in range(count)]
+
+    def pairwise(row: int, slack: float) -> tuple[set[str], set[str]]:
+        dist = np.hypot(north[:row] - north[row], east[:row] - east[row])
+        close_soil = np.abs(soil[:row] - soil[row]) <= 0.005 * slack
+        others = np.array([farmer != farmers[row] for farmer in farmers[:row]], dtype=bool)
+        gps = {farmers[i] for i in np.flatnonzero(others & (dist <= 15 * slack))}
+        same_soil = {farmers[i] for i in np.flatnonzero(others & (dist <= 500 * slack) & close_soil)}
+        return gps, same_soil
+
+    flagged = {row: issues + warnings for row, issues, warnings in DuplicateEvidenceDetector(window=count).rescan(points)}
+    assert all(row in flagged for row in range(100, count, 50))
+    # The detector projects slightly differently from this flat-plane check; allow 0.1% at the radius edges.
+    for row in range(count):
+        must_gps, must_soil = pairwise(row, 0.999)
+        may_gps, may_soil = pairwise(row, 1.001)
+        issues = flagged.get(row, [])
+        gps = [int(issue.split(" for ")[1].split()[0]) for issue in issues if issue.startswith("GPS")]
+        same_soil = [int(issue.split(" as ")[1].split()[0]) for issue in issues if issue.startswith("Soil")]
+        assert len(must_gps) <= sum(gps) <= len(may_gps)
+        assert len(must_soil) <= sum(same_soil) <= len(may_soil)
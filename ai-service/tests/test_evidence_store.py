@@ -0,0 +1,86 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app.models.schemas import EvidenceTransitionRequest
+from app.services.evidence_store import SqliteEvidenceStore
+
+
+def _move(evidence_id: str, to_status: str, expected_version: int | None = None) -> EvidenceTransitionRequest:
+    return EvidenceTransitionRequest(evidence_id=evidence_id, to_status=to_status, expected_version=expected_version)
+
+
+@pytest.fixture
+def store():
+    evidence = SqliteEvidenceStore()
+    yield evidence
+    evidence.close()
+
+
+def test_unknown_evidence_starts_submitted_and_transitions_are_logged(store) -> None:
+    assert store.get("e-1").status == "submitted"
+    assert store.get("e-1").version == 0
+
+    (result,) = store.apply([_move("e-1", "in_review")], actor="verifier-a")
+    assert (result.from_status, result.allowed, result.version) == ("submitted", True, 1)
+    assert store.get("e-1").status == "in_review"
+
+    (rejected,) = store.apply([_move("e-1", "draft")], actor="verifier-a")
+    assert not rejected.allowed and rejected.version == 1
+
+    history = store.history("e-1")
+    assert [(entry.from_status, entry.to_status, entry.version, entry.actor) for entry in history] == [
+        ("submitted", "in_review", 1, "verifier-a")
+    ]
+
+
+def test_stale_version_cannot_double_approve(store) -> None:
+    store.apply([_move("e-2", "in_review")], actor="a")
+    first, second = store.apply([_move("e-2", "approved", 1), _move("e-2", "rejected", 1)], actor="a")
+    assert first.allowed
+    assert not second.allowed and "Version conflict" in second.message
+    assert store.get("e-2").status == "approved"
+    assert [entry.to_status for entry in store.history("e-2")] == ["in_review", "approved"]
+
+
+def test_concurrent_verifiers_on_shared_file_approve_once(tmp_path) -> None:
+    path = str(tmp_path / "evidence.sqlite3")
+    setup = SqliteEvidenceStore(path)
+    setup.apply([_move("e-3", "in_review")], actor="setup")
+    stores = [SqliteEvidenceStore(path) for _ in range(8)]
+    barrier = threading.Barrier(len(stores))
+    outcomes: list[bool] = []
+
+    def verify(store: SqliteEvidenceStore) -> None:
+        barrier.wait()
+        outcomes.append(store.apply([_move("e-3", "approved", 1)], actor="verifier")[0].allowed)
+
+    threads = [threading.Thread(target=verify, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == [False] * 7 + [True]
+    assert [entry.to_status for entry in setup.history("e-3")] == ["in_review", "approved"]
+
+
+def test_atomic_bulk_rolls_back_everything_on_any_rejection(store) -> None:
+    results = store.apply([_move("e-4", "in_review"), _move("e-5", "approved")], actor="a", atomic=True)
+    assert [result.allowed for result in results] == [False, False]
+    assert "Rolled back" in results[0].message
+    assert store.get("e-4").version == 0 and store.history("e-4") == []
+
+    results = store.apply([_move("e-4", "in_review"), _move("e-4", "approved")], actor="a", atomic=True)
+    assert [result.version for result in results] == [1, 2]
+
+
+def test_state_survives_reopen_and_log_is_append_only(tmp_path) -> None:
+    path = str(tmp_path / "evidence.sqlite3")
+    SqliteEvidenceStore(path).apply([_move("e-6", "in_review")], actor="a")
+    reopened = SqliteEvidenceStore(path)
+    assert reopened.get("e-6").status == "in_review"
+
+    with pytest.raises(sqlite3.IntegrityError):
+        reopened._conn.execute("DELETE FROM evidence_transition_log")
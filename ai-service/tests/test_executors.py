@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.executors import BoundedExecutor
+
+
+def test_bounded_executor_rejects_when_saturated() -> None:
+    executor = BoundedExecutor(max_workers=1, max_pending=0, name="test-inference")
+    release = threading.Event()
+
+    async def scenario() -> None:
+        busy = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(lambda: None)
+        assert exc_info.value.status_code == 503
+
+        release.set()
+        assert await busy is True
+        assert await executor.run(lambda value: value * 2, 21) == 42
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_run_when_available_waits_for_a_slot() -> None:
+    executor = BoundedExecutor(max_workers=1, max_pending=0, name="test-inference")
+    release = threading.Event()
+
+    async def scenario() -> None:
+        busy = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.ensure_future(executor.run_when_available(lambda value: value * 2, 21))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+
+        release.set()
+        assert await busy is True
+        assert await asyncio.wait_for(waiting, 5) == 42
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
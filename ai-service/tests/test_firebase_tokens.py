@@ -0,0 +1,199 @@
+import json
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.testclient import TestClient
+
+from app.core import auth
+from app.core.auth import reset_auth_cache
+from app.core.config import settings
+from app.core.firebase_tokens import FirebaseTokenVerifier, JwksCache, TokenClaimsCache
+from app.main import app
+
+PROJECT = "agri-trust-test"
+
+
+class Clock:
+    def __init__(self, now: float = 1_800_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class KeyServer:
+    """Local stand-in for Google's JWKS endpoint, served through httpx.MockTransport."""
+
+    def __init__(self, max_age: int = 3600) -> None:
+        self.max_age = max_age
+        self.requests = 0
+        self.keys: dict[str, rsa.RSAPrivateKey] = {}
+        self.rotate("key-1")
+
+    def rotate(self, kid: str) -> None:
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        jwks = []
+        for kid, private_key in self.keys.items():
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+            jwks.append({**jwk, "kid": kid, "alg": "RS256", "use": "sig"})
+        return httpx.Response(200, json={"keys": jwks}, headers={"Cache-Control": f"public, max-age={self.max_age}"})
+
+    def token(self, kid: str, now: float, ttl: float = 3600, **claims) -> str:
+        payload = {
+            "iss": f"https://securetoken.google.com/{PROJECT}",
+            "aud": PROJECT,
+            "sub": "farmer-123",
+            "iat": int(now),
+            "auth_time": int(now),
+            "exp": int(now + ttl),
+            **claims,
+        }
+        return jwt.encode(payload, self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def key_server() -> KeyServer:
+    return KeyServer()
+
+
+def _verifier(key_server: KeyServer, clock: Clock, cache_size: int = 100) -> FirebaseTokenVerifier:
+    client = httpx.Client(transport=httpx.MockTransport(key_server.handler))
+    jwks = JwksCache(url="https://keys.test/jwks", client=client, clock=clock)
+    return FirebaseTokenVerifier(PROJECT, jwks=jwks, cache=TokenClaimsCache(cache_size), clock=clock)
+
+
+def test_repeat_tokens_skip_signature_verification(key_server, monkeypatch) -> None:
+    clock = Clock()
+    verifier = _verifier(key_server, clock)
+    token = key_server.token("key-1", clock.now, role="verifier")
+
+    claims = verifier.verify(token)
+    assert claims["uid"] == "farmer-123"
+    assert claims["role"] == "verifier"
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError("signature should not be re-verified for a cached token")
+
+    monkeypatch.setattr(jwt, "decode", fail_decode)
+    assert verifier.verify(token) == claims
+    assert verifier.cache.hits == 1
+    assert key_server.requests == 1
+
+
+def test_cold_token_counts_one_miss(key_server) -> None:
+    clock = Clock()
+    verifier = _verifier(key_server, clock)
+    token = key_server.token("key-1", clock.now)
+
+    assert verifier.cached(token) is None
+    verifier.verify(token, cache_checked=True)
+    assert verifier.cached(token) is not None
+    assert (verifier.cache.hits, verifier.cache.misses) == (1, 1)
+
+
+def test_cached_claims_expire_with_the_token(key_server) -> None:
+    clock = Clock()
+    verifier = _verifier(key_server, clock)
+    token = key_server.token("key-1", clock.now, ttl=60)
+    verifier.verify(token)
+
+    clock.now += 61
+    assert verifier.cached(token) is None
+    with pytest.raises(jwt.ExpiredSignatureError):
+        verifier.verify(token)
+
+
+def test_rejects_wrong_audience_and_bad_signature(key_server) -> None:
+    clock = Clock()
+    verifier = _verifier(key_server, clock)
+    with pytest.raises(jwt.InvalidAudienceError):
+        verifier.verify(key_server.token("key-1", clock.now, aud="other-project"))
+
+    forged = KeyServer()
+    with pytest.raises(jwt.InvalidSignatureError):
+        verifier.verify(forged.token("key-1", clock.now))
+    assert len(verifier.cache) == 0
+
+
+@pytest.mark.parametrize("claim", ["iat", "auth_time"])
+def test_issue_and_sign_in_times_must_be_in_the_past(key_server, claim: str) -> None:
+    clock = Clock()
+    verifier = _verifier(key_server, clock)
+    # The other claim is in the past, so it cannot mask the future one.
+    past = {"iat": int(clock.now) - 60, "auth_time": int(clock.now) - 3600}
+    with pytest.raises(jwt.ImmatureSignatureError):
+        verifier.verify(key_server.token("key-1", clock.now, **{**past, claim: int(clock.now) + 3600}))
+    assert verifier.verify(key_server.token("key-1", clock.now, **past))["uid"] == "farmer-123"
+
+    without_auth_time = key_server.token("key-1", clock.now, sub="x")
+    payload = jwt.decode(without_auth_time, options={"verify_signature": False})
+    del payload["auth_time"]
+    with pytest.raises(jwt.MissingRequiredClaimError):
+        verifier.verify(jwt.encode(payload, key_server.keys["key-1"], algorithm="RS256", headers={"kid": "key-1"}))
+
+
+def test_project_id_comes_from_settings(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "firebase_project_id", "agri-trust-prod")
+    monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "other")
+    reset_auth_cache()
+    assert auth._firebase_verifier().project_id == "agri-trust-prod"
+    monkeypatch.setattr(settings, "firebase_project_id", None)
+    reset_auth_cache()
+    assert auth._firebase_verifier().project_id == "other"
+    monkeypatch.undo()
+    reset_auth_cache()
+
+
+def test_keys_refresh_after_max_age_and_on_rotation(key_server) -> None:
+    clock = Clock()
+    verifier = _verifier(key_server, clock)
+    verifier.verify(key_server.token("key-1", clock.now, sub="a"))
+    verifier.verify(key_server.token("key-1", clock.now, sub="b"))
+    assert key_server.requests == 1
+
+    clock.now += 3601
+    verifier.verify(key_server.token("key-1", clock.now, sub="c"))
+    assert key_server.requests == 2
+
+    key_server.rotate("key-2")
+    clock.now += 31
+    verifier.verify(key_server.token("key-2", clock.now, sub="d"))
+    assert key_server.requests == 3
+
+
+def test_claims_cache_is_bounded_lru() -> None:
+    cache = TokenClaimsCache(maxsize=2)
+    for name in (b"a", b"b"):
+        cache.put(name, {"exp": 100})
+    assert cache.get(b"a", now=0) is not None
+    cache.put(b"c", {"exp": 100})
+    assert cache.get(b"b", now=0) is None
+    assert cache.get(b"a", now=0) is not None
+    assert len(cache) == 2
+
+
+def test_firebase_auth_mode_uses_cached_verifier(key_server, monkeypatch) -> None:
+    monkeypatch.setenv("AUTH_REQUIRED", "true")
+    monkeypatch.setenv("AUTH_PROVIDER", "firebase")
+    reset_auth_cache()
+    clock = Clock()
+    verifier = _verifier(key_server, clock)
+    monkeypatch.setattr(auth, "_firebase_verifier", lambda: verifier)
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {key_server.token('key-1', clock.now, role='farmer')}"}
+    body = {"transcript": "carbon score batao", "language": "hi"}
+    assert client.post("/api/v1/voice/intent", json=body, headers=headers).status_code == 200
+    assert client.post("/api/v1/voice/intent", json=body, headers=headers).status_code == 200
+    assert verifier.cache.hits >= 1
+
+    bad = {"Authorization": "Bearer not-a-jwt"}
+    assert client.post("/api/v1/voice/intent", json=body, headers=bad).status_code == 401
+
+    monkeypatch.undo()
+    reset_auth_cache()
@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+
+from app.services.forest_inference import CompiledForest
+from app.services.model_registry import FEATURE_COLUMNS
+
+DATASET = Path(__file__).resolve().parents[2] / "docs" / "datasets" / "sample_mrv_training_data.csv"
+
+
+@pytest.fixture(scope="module")
+def dataset() -> pd.DataFrame:
+    return pd.read_csv(DATASET)
+
+
+def _probe_rows(model, df: pd.DataFrame) -> np.ndarray:
+    rng = np.random.default_rng(11)
+    X = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    lows, highs = X.min(axis=0), X.max(axis=0)
+    random_rows = rng.uniform(lows - 0.5, highs + 0.5, size=(500, X.shape[1]))
+
+    # Rows sitting exactly on split thresholds exercise the `<=` boundary.
+    tree = model.estimators_[0].tree_
+    split_nodes = np.flatnonzero(tree.children_left != -1)[:50]
+    boundary_rows = np.repeat(X[:1], len(split_nodes), axis=0)
+    boundary_rows[np.arange(len(split_nodes)), tree.feature[split_nodes]] = tree.threshold[split_nodes]
+    return np.vstack([X, random_rows, boundary_rows])
+
+
+def test_compiled_forest_matches_sklearn_exactly(dataset) -> None:
+    model = RandomForestRegressor(n_estimators=60, max_depth=10, random_state=42)
+    model.fit(dataset[FEATURE_COLUMNS].to_numpy(), dataset["target_co2e"])
+    compiled = CompiledForest.from_sklearn(model)
+
+    rows = _probe_rows(model, dataset)
+    np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+    np.testing.assert_array_equal(compiled.predict(rows[:1]), model.predict(rows[:1]))
+    assert compiled.n_trees == 60
+
+
+def test_compiled_forest_handles_unbounded_depth_and_large_batches(dataset, monkeypatch) -> None:
+    model = RandomForestRegressor(n_estimators=5, random_state=3)
+    model.fit(dataset[FEATURE_COLUMNS].to_numpy(), dataset["target_co2e"])
+    compiled = CompiledForest.from_sklearn(model)
+
+    monkeypatch.setattr("app.services.forest_inference._CHUNK_ROWS", 64)
+    rows = _probe_rows(model, dataset)
+    np.testing.assert_array_equal(compiled.predict(rows), model.predict(rows))
+
+
+def test_compiled_single_tree(dataset) -> None:
+    tree = DecisionTreeRegressor(max_depth=4, random_state=0)
+    tree.fit(dataset[FEATURE_COLUMNS].to_numpy(), dataset["target_co2e"])
+    rows = dataset[FEATURE_COLUMNS].to_numpy()
+    np.testing.assert_array_equal(CompiledForest.from_sklearn(tree).predict(rows), tree.predict(rows))
+
+
+def test_compiled_forest_rejects_wrong_width(dataset) -> None:
+    model = RandomForestRegressor(n_estimators=2, random_state=0)
+    model.fit(dataset[FEATURE_COLUMNS].to_numpy(), dataset["target_co2e"])
+    with pytest.raises(ValueError):
+        CompiledForest.from_sklearn(model).predict(np.zeros((1, 3)))
+
+
+def test_saved_forest_is_memory_mapped(dataset, tmp_path) -> None:
+    model = RandomForestRegressor(n_estimators=10, max_depth=6, random_state=1)
+    model.fit(dataset[FEATURE_COLUMNS].to_numpy(), dataset["target_co2e"])
+    CompiledForest.from_sklearn(model).save(tmp_path / "mrv_forest")
+
+    loaded = CompiledForest.load(tmp_path / "mrv_forest")
+    assert isinstance(loaded.threshold, np.memmap)
+    assert not loaded.threshold.flags.writeable
+
+    rows = _probe_rows(model, dataset)
+    np.testing.assert_array_equal(loaded.predict(rows), model.predict(rows))
+    np.testing.assert_array_equal(CompiledForest.load(tmp_path / "mrv_forest", mmap=False).predict(rows), model.predict(rows))
+
+
+def test_resaving_does_not_rewrite_mapped_files(dataset, tmp_path) -> None:
+    X, y = dataset[FEATURE_COLUMNS].to_numpy(), dataset["target_co2e"]
+    old_model = RandomForestRegressor(n_estimators=5, max_depth=4, random_state=1).fit(X, y)
+    CompiledForest.from_sklearn(old_model).save(tmp_path / "mrv_forest")
+    live = CompiledForest.load(tmp_path / "mrv_forest")
+    old_inode = (tmp_path / "mrv_forest" / "threshold.npy").stat().st_ino
+
+    new_model = RandomForestRegressor(n_estimators=3, max_depth=2, random_state=2).fit(X, y)
+    CompiledForest.from_sklearn(new_model).save(tmp_path / "mrv_forest")
+
+    # A worker holding the old mapping keeps reading the old, untruncated file.
+    assert (tmp_path / "mrv_forest" / "threshold.npy").stat().st_ino != old_inode
+    rows = _probe_rows(old_model, dataset)
+    np.testing.assert_array_equal(live.predict(rows), old_model.predict(rows))
+    np.testing.assert_array_equal(CompiledForest.load(tmp_path / "mrv_forest").predict(rows), new_model.predict(rows))
+    assert not list((tmp_path / "mrv_forest").glob("*.tmp"))
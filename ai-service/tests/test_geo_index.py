@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services.evidence_validator import (
+    OUTSIDE_INDIA,
+    boundary_index,
+    coordinates_in_india,
+    validate_evidence_batch,
+    validate_evidence_payload,
+)
+from app.services.geo_index import BoundaryIndex
+
+MUMBAI = (19.07, 72.87)
+NASHIK = (20.0, 73.79)
+PUNE = (18.52, 73.86)
+ARABIAN_SEA = (15.0, 68.5)
+LAHORE = (31.55, 74.34)
+DHAKA = (23.81, 90.41)
+CAPE_TOWN = (-33.92, 18.42)
+
+
+def _square(name: str, x: float, y: float, size: float = 1.0, level: str = "state") -> dict:
+    ring = [[x, y], [x + size, y], [x + size, y + size], [x, y + size], [x, y]]
+    return {
+        "type": "Feature",
+        "properties": {"level": level, "name": name},
+        "geometry": {"type": "Polygon", "coordinates": [ring]},
+    }
+
+
+def _name(index: BoundaryIndex, region: int) -> str | None:
+    return index.regions[region].name if region >= 0 else None
+
+
+def test_bundled_boundaries_place_cities_in_state_and_district() -> None:
+    index = boundary_index()
+    found = index.locate([MUMBAI[0], NASHIK[0], PUNE[0]], [MUMBAI[1], NASHIK[1], PUNE[1]])
+    assert all(region >= 0 for region in found.country)
+    assert [_name(index, region) for region in found.state] == ["Maharashtra"] * 3
+    assert [_name(index, region) for region in found.district] == [None, "Nashik", "Pune"]
+
+
+@pytest.mark.parametrize("point", [ARABIAN_SEA, LAHORE, DHAKA, CAPE_TOWN])
+def test_points_inside_the_old_bounding_box_but_outside_india(point) -> None:
+    assert not coordinates_in_india(*point)
+    valid, issues, _ = validate_evidence_payload(*point, 0.8)
+    assert not valid and issues == [OUTSIDE_INDIA]
+
+
+@pytest.mark.parametrize(
+    "point",
+    [(16.99, 73.30), (16.38, 73.38), (16.06, 73.46), (20.91, 70.37), (21.12, 70.12), (20.71, 70.98)],
+    ids=["ratnagiri", "devgad", "malvan", "veraval", "mangrol", "diu"],
+)
+def test_coastal_towns_are_in_india(point) -> None:
+    assert coordinates_in_india(*point)
+    assert validate_evidence_payload(*point, 0.8) == (True, [], [])
+
+
+def test_country_boundary_tolerance(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "geo_boundary_tolerance_km", 0.0)
+    assert not coordinates_in_india(*LAHORE)
+    monkeypatch.setattr(settings, "geo_boundary_tolerance_km", 30.0)
+    assert coordinates_in_india(*LAHORE)
+
+
+def test_claimed_state_and_district_are_checked() -> None:
+    assert validate_evidence_payload(*PUNE, 0.8, state="maharashtra", district="PUNE") == (True, [], [])
+
+    valid, issues, warnings = validate_evidence_payload(*PUNE, 0.8, state="Karnataka")
+    assert valid and issues == []
+    assert warnings == ["Coordinates are not in the claimed state Karnataka; they fall in Maharashtra."]
+
+    valid, _, warnings = validate_evidence_payload(*MUMBAI, 0.8, state="Maharashtra", district="Nashik")
+    assert valid and "claimed district Nashik" in warnings[0]
+
+
+@pytest.mark.parametrize(
+    ("point", "state", "district"),
+    [
+        ((21.31, 76.23), "Madhya Pradesh", "Burhanpur"),
+        ((24.20, 82.67), "Madhya Pradesh", "Singrauli"),
+        ((24.47, 74.87), "Madhya Pradesh", "Neemuch"),
+        ((18.85, 79.96), "Maharashtra", "Gadchiroli"),
+        ((18.12, 75.02), "Maharashtra", "Pune"),
+    ],
+    ids=["burhanpur", "singrauli", "neemuch", "sironcha", "indapur"],
+)
+def test_border_district_headquarters_are_not_rejected(point, state, district) -> None:
+    # The simplified polygons misplace these towns; a claim mismatch must not make real evidence invalid.
+    valid, issues, _ = validate_evidence_payload(*point, 0.8, state=state, district=district)
+    assert valid and issues == []
+
+
+def test_claims_without_boundary_data_are_not_flagged() -> None:
+    # Kerala is not in the bundled file, so there is nothing to check the claim against.
+    assert validate_evidence_payload(*PUNE, 0.8, state="Kerala", district="Idukki") == (True, [], [])
+
+
+def test_boundary_tolerance(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "geo_boundary_tolerance_km", 5_000.0)
+    assert validate_evidence_payload(*PUNE, 0.8, state="Karnataka") == (True, [], [])
+
+
+def test_batch_matches_single_calls() -> None:
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(6.0, 38.0, 300)
+    lons = rng.uniform(68.0, 98.0, 300)
+    soil = rng.uniform(-1.0, 11.0, 300)
+    states = rng.choice(["Maharashtra", "Karnataka", "Punjab", None], 300).tolist()
+    batch = validate_evidence_batch(lats, lons, soil, states)
+    assert batch == [
+        validate_evidence_payload(lat, lon, value, state)
+        for lat, lon, value, state in zip(lats.tolist(), lons.tolist(), soil.tolist(), states)
+    ]
+
+
+def test_grid_lookup_matches_linear_scan() -> None:
+    features = [_square(f"s{x}-{y}", x * 1.3, y * 1.3, 1.2) for x in range(8) for y in range(8)]
+    features.append(_square("all", -1.0, -1.0, 12.0, level="country"))
+    index = BoundaryIndex.from_geojson({"features": features}, cell_degrees=0.25)
+    rng = np.random.default_rng(3)
+    lats, lons = rng.uniform(-2.0, 12.0, 2_000), rng.uniform(-2.0, 12.0, 2_000)
+
+    expected = np.full(len(lats), -1)
+    for part in index.parts:
+        if index.regions[part.region].level == "state":
+            expected[(expected < 0) & part.contains(lons, lats)] = part.region
+    found = index.locate(lats, lons)
+    np.testing.assert_array_equal(found.state, expected)
+    np.testing.assert_array_equal(found.country >= 0, (lats > -1) & (lats < 11) & (lons > -1) & (lons < 11))
+
+
+def test_distance_to_region_boundary() -> None:
+    index = BoundaryIndex.from_geojson({"features": [_square("unit", 0.0, 0.0)]})
+    distance = index.distance_km(0, np.array([0.5, 0.5]), np.array([1.1, 0.5]))
+    assert distance[0] == pytest.approx(0.1 * 111.32 * np.cos(np.radians(0.5)), rel=1e-6)
+    assert distance[1] == pytest.approx(0.5 * 111.32 * np.cos(np.radians(0.5)), rel=1e-6)
@@ -0,0 +1,74 @@
+import json
+import random
+
+from app.models.schemas import VoiceIntentRequest
+from app.services.intent_lexicon import DEFAULT_LEXICON_PATH, AhoCorasick, IntentLexicon
+from app.services.voice_nlu import infer_intent
+
+
+def _naive_matches(patterns: list[str], text: str) -> set[tuple[int, int]]:
+    found = set()
+    for pattern_id, pattern in enumerate(patterns):
+        start = text.find(pattern)
+        while start >= 0:
+            found.add((start + len(pattern) - 1, pattern_id))
+            start = text.find(pattern, start + 1)
+    return found
+
+
+def test_automaton_finds_every_overlapping_occurrence() -> None:
+    patterns = ["he", "she", "his", "hers", "s"]
+    assert set(AhoCorasick(patterns).iter_matches("ushers")) == _naive_matches(patterns, "ushers")
+
+
+def test_automaton_matches_naive_search_on_random_text() -> None:
+    rng = random.Random(7)
+    alphabet = "abक"
+    patterns = sorted({"".join(rng.choices(alphabet, k=rng.randint(1, 4))) for _ in range(40)})
+    automaton = AhoCorasick(patterns)
+    for _ in range(50):
+        text = "".join(rng.choices(alphabet, k=rng.randint(0, 30)))
+        assert set(automaton.iter_matches(text)) == _naive_matches(patterns, text)
+        assert automaton.matched_ids(text) == {pattern_id for _, pattern_id in _naive_matches(patterns, text)}
+
+
+def test_lexicon_returns_all_matched_intents_in_priority_order() -> None:
+    lexicon = IntentLexicon.from_file(DEFAULT_LEXICON_PATH)
+    matches = lexicon.match("Carbon credit badhane ke liye kya kare?")
+    assert [match.intent for match in matches] == ["get_recommendations", "get_carbon_score"]
+    assert matches[0].matched_keywords == ("kya kare",)
+    assert set(matches[1].matched_keywords) == {"carbon", "credit"}
+    assert lexicon.best("namaste").intent == "unknown"
+
+
+def test_infer_intent_keeps_keyword_priority_and_confidences() -> None:
+    cases = {
+        "मुझे कार्बन स्कोर बताओ": ("get_carbon_score", 0.84),
+        "Please RECOMMEND something for my carbon score": ("get_recommendations", 0.87),
+        "क्या करूं इस मौसम में": ("get_recommendations", 0.87),
+        "mausam kaisa hai": ("unknown", 0.45),
+    }
+    for transcript, (intent, confidence) in cases.items():
+        assert infer_intent(VoiceIntentRequest(transcript=transcript))[:2] == (intent, confidence)
+
+
+def test_keyword_variants_need_a_single_entry() -> None:
+    lexicon = IntentLexicon.from_file(DEFAULT_LEXICON_PATH)
+    # "सलाह" and "kya kare" are each listed once; the other script and spelling variants fold onto them.
+    assert lexicon.best("mujhe salaah chahiye").intent == "get_recommendations"
+    assert lexicon.best("अब क्या करे").intent == "get_recommendations"
+    assert lexicon.best("Any recommendations?").matched_keywords == ("recommend", "recommendation")
+    assert lexicon.best("my co2e number").intent == "get_carbon_score"
+
+
+def test_lexicon_loads_extra_intents_from_a_data_file(tmp_path) -> None:
+    data = json.loads(DEFAULT_LEXICON_PATH.read_text(encoding="utf-8"))
+    data["intents"].append(
+        {"name": "get_weather", "confidence": 0.8, "response_text": "मौसम", "keywords": ["mausam", "बारिश"]}
+    )
+    path = tmp_path / "lexicon.json"
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+    lexicon = IntentLexicon.from_file(path)
+    assert lexicon.best("kal बारिश hogi?").intent == "get_weather"
+    assert lexicon.best("score aur mausam").intent == "get_carbon_score"
@@ -0,0 +1,116 @@
+import json
+import subprocess
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.models.schemas import VoiceIntentRequest
+from app.services.intent_model import (
+    KEYWORD_INTENT_VERSION,
+    HashedNgramFeaturizer,
+    IntentClassifier,
+    intent_registry,
+    load_intent_artifact,
+)
+from app.services.model_registry import LoadedModel, ModelRegistry
+from app.services.voice_nlu import infer_intent, infer_intents, intent_lexicon
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+DATASET = SERVICE_DIR.parent / "docs" / "datasets" / "sample_intent_training_data.csv"
+
+
+@pytest.fixture(scope="module")
+def trained_artifacts(tmp_path_factory) -> Path:
+    outdir = tmp_path_factory.mktemp("intent_artifacts")
+    subprocess.run(
+        [
+            sys.executable,
+            "ml/train_intent_model.py",
+            "--data",
+            str(DATASET),
+            "--outdir",
+            str(outdir),
+            "--version",
+            "intent_test_v1",
+        ],
+        cwd=SERVICE_DIR,
+        check=True,
+        capture_output=True,
+    )
+    return outdir / "intent"
+
+
+@pytest.fixture
+def serve_intent_model(trained_artifacts):
+    previous = intent_registry.current()
+    snapshot = load_intent_artifact(trained_artifacts / "intent_test_v1")
+    intent_registry.install(snapshot)
+    yield snapshot
+    intent_registry.install(previous)
+
+
+def test_featurizer_shares_features_across_scripts() -> None:
+    featurizer = HashedNgramFeaturizer()
+    devanagari, romanized = featurizer.features("कार्बन सलाह"), featurizer.features("karban salaah")
+    assert np.array_equal(devanagari[0], romanized[0])
+    assert np.isclose(float(np.linalg.norm(devanagari[1])), 1.0)
+
+
+def test_classifier_rejects_mismatched_shapes() -> None:
+    with pytest.raises(ValueError):
+        IntentClassifier(np.zeros((10, 2)), np.zeros(3), ["a", "b", "c"], HashedNgramFeaturizer(n_features=10))
+
+
+def test_trained_model_is_published_and_loaded_through_the_registry(trained_artifacts) -> None:
+    registry = ModelRegistry(versions_dir=trained_artifacts, legacy_dir=trained_artifacts, loader=load_intent_artifact)
+    snapshot = registry.current()
+    assert snapshot.version == "intent_test_v1"
+    assert set(snapshot.model.classes) == {"get_recommendations", "get_carbon_score", "unknown"}
+    assert json.loads((trained_artifacts / "intent_test_v1" / "intent_model_meta.json").read_text())["accuracy"] > 0.7
+
+
+def test_missing_artifacts_serve_keyword_matcher(tmp_path) -> None:
+    assert load_intent_artifact(tmp_path).model is None
+    assert load_intent_artifact(tmp_path).version == KEYWORD_INTENT_VERSION
+
+
+def test_model_confidence_reflects_probability(serve_intent_model) -> None:
+    results = infer_intents(
+        [
+            VoiceIntentRequest(transcript="मेरा कार्बन स्कोर कितना है"),
+            VoiceIntentRequest(transcript="is saal kya kare khet mein"),
+        ]
+    )
+    assert [intent for intent, _, _ in results] == ["get_carbon_score", "get_recommendations"]
+    assert all(0.55 <= confidence <= 1.0 for _, confidence, _ in results)
+    assert {confidence for _, confidence, _ in results} - {0.84, 0.87}
+
+
+def test_batch_matches_single_calls(serve_intent_model) -> None:
+    transcripts = ["carbon credit kitna milega", "namaste ji", "मला सल्ला हवा आहे", "give me farming advice"]
+    payloads = [VoiceIntentRequest(transcript=transcript) for transcript in transcripts]
+    assert infer_intents(payloads) == [infer_intent(payload) for payload in payloads]
+
+
+def test_low_confidence_falls_back_to_keywords(serve_intent_model) -> None:
+    strict = replace(serve_intent_model, metadata={**serve_intent_model.metadata, "min_confidence": 1.01})
+    intent_registry.install(strict)
+    transcript = "मुझे कार्बन स्कोर बताओ"
+    keyword = intent_lexicon().best(transcript)
+    assert infer_intent(VoiceIntentRequest(transcript=transcript)) == (
+        keyword.intent,
+        keyword.confidence,
+        keyword.response_text,
+    )
+
+
+def test_no_model_serves_keyword_matcher() -> None:
+    previous = intent_registry.current()
+    intent_registry.install(LoadedModel(model=None, version=KEYWORD_INTENT_VERSION))
+    try:
+        assert infer_intent(VoiceIntentRequest(transcript="kya kare"))[:2] == ("get_recommendations", 0.87)
+    finally:
+        intent_registry.install(previous)
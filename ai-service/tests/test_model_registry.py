@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from app.services.forest_inference import CompiledForest
+from app.services.model_registry import (
+    FEATURE_COLUMNS,
+    HEURISTIC_MODEL_VERSION,
+    ModelRegistry,
+    load_mrv_artifact,
+    publish_version,
+)
+
+DATASET = Path(__file__).resolve().parents[2] / "docs" / "datasets" / "sample_mrv_training_data.csv"
+
+
+@pytest.fixture(scope="module")
+def dataset() -> pd.DataFrame:
+    return pd.read_csv(DATASET)
+
+
+def _write_version(versions_dir: Path, version: str, dataset: pd.DataFrame, seed: int) -> None:
+    model = RandomForestRegressor(n_estimators=4, max_depth=4, random_state=seed)
+    model.fit(dataset[FEATURE_COLUMNS].to_numpy(), dataset["target_co2e"])
+    CompiledForest.from_sklearn(model).save(versions_dir / version / "mrv_forest")
+    meta = {"model_version": version, "feature_columns": FEATURE_COLUMNS, "r2": 0.9}
+    (versions_dir / version / "mrv_model_meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+def _registry(tmp_path: Path, poll_seconds: float = 0.0) -> ModelRegistry:
+    return ModelRegistry(
+        versions_dir=tmp_path / "mrv",
+        legacy_dir=tmp_path,
+        loader=load_mrv_artifact,
+        legacy_files=(tmp_path / "mrv_model_meta.json",),
+        poll_seconds=poll_seconds,
+    )
+
+
+def test_registry_falls_back_to_heuristic_without_artifacts(tmp_path) -> None:
+    snapshot = _registry(tmp_path).current()
+    assert snapshot.model is None
+    assert snapshot.version == HEURISTIC_MODEL_VERSION
+
+
+def test_registry_swaps_to_published_version(tmp_path, dataset) -> None:
+    versions_dir = tmp_path / "mrv"
+    _write_version(versions_dir, "mrv_rf_a", dataset, seed=1)
+    publish_version(versions_dir, "mrv_rf_a")
+
+    registry = _registry(tmp_path)
+    held = registry.current()
+    assert held.version == "mrv_rf_a"
+    assert registry.refresh() is False
+
+    _write_version(versions_dir, "mrv_rf_b", dataset, seed=2)
+    publish_version(versions_dir, "mrv_rf_b")
+    assert registry.refresh() is True
+
+    current = registry.current()
+    assert current.version == "mrv_rf_b"
+    assert current.metadata["model_version"] == "mrv_rf_b"
+    # A caller holding the old snapshot keeps a working model/metadata pair.
+    assert held.metadata["model_version"] == "mrv_rf_a"
+    assert held.model.predict(np.ones((1, len(FEATURE_COLUMNS)))).shape == (1,)
+
+
+def test_registry_keeps_serving_when_new_version_is_broken(tmp_path, dataset) -> None:
+    versions_dir = tmp_path / "mrv"
+    _write_version(versions_dir, "mrv_rf_a", dataset, seed=1)
+    publish_version(versions_dir, "mrv_rf_a")
+    registry = _registry(tmp_path)
+    registry.current()
+
+    broken = versions_dir / "mrv_rf_bad" / "mrv_forest"
+    broken.mkdir(parents=True)
+    (broken / "forest.json").write_text(json.dumps({"format_version": 99}), encoding="utf-8")
+    publish_version(versions_dir, "mrv_rf_bad")
+
+    assert registry.refresh() is False
+    assert registry.current().version == "mrv_rf_a"
+
+
+def test_registry_watcher_reloads_in_background(tmp_path, dataset) -> None:
+    versions_dir = tmp_path / "mrv"
+    _write_version(versions_dir, "mrv_rf_a", dataset, seed=1)
+    publish_version(versions_dir, "mrv_rf_a")
+    registry = _registry(tmp_path, poll_seconds=0.02)
+    registry.current()
+
+    swaps: list[str] = []
+    registry.subscribe(lambda snapshot: swaps.append(snapshot.version))
+    registry.start_watching()
+    try:
+        _write_version(versions_dir, "mrv_rf_b", dataset, seed=2)
+        publish_version(versions_dir, "mrv_rf_b")
+        deadline = time.monotonic() + 5
+        while registry.current().version != "mrv_rf_b" and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        registry.stop_watching()
+
+    assert registry.current().version == "mrv_rf_b"
+    assert swaps == ["mrv_rf_b"]
+
+
+def test_snapshots_stay_consistent_during_swaps(tmp_path, dataset) -> None:
+    versions_dir = tmp_path / "mrv"
+    for version, seed in (("mrv_rf_a", 1), ("mrv_rf_b", 2)):
+        _write_version(versions_dir, version, dataset, seed=seed)
+    publish_version(versions_dir, "mrv_rf_a")
+    registry = _registry(tmp_path)
+    snapshots = {version: load_mrv_artifact(versions_dir / version) for version in ("mrv_rf_a", "mrv_rf_b")}
+    registry.install(snapshots["mrv_rf_a"])
+
+    mismatches: list[str] = []
+    stop = threading.Event()
+
+    def reader() -> None:
+        while not stop.is_set():
+            snapshot = registry.current()
+            if snapshot.metadata["model_version"] != snapshot.version:
+                mismatches.append(snapshot.version)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(200):
+        registry.install(snapshots["mrv_rf_b" if i % 2 else "mrv_rf_a"])
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert mismatches == []
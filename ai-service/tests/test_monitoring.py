@@ -0,0 +1,79 @@
+import threading
+
+from app.core.monitoring import REQUEST_BUCKETS, MetricsStore
+
+
+def test_request_histogram_buckets_are_cumulative() -> None:
+    store = MetricsStore()
+    store.observe_request("/api/v1/mrv/estimate", 200, 0.004)
+    store.observe_request("/api/v1/mrv/estimate", 201, 0.02)
+    store.observe_request("/api/v1/mrv/estimate", 200, 30.0)
+    store.observe_request("/api/v1/mrv/estimate", 503, 0.004)
+
+    text = store.prometheus_text()
+    prefix = 'agri_trust_http_request_duration_seconds_bucket{route="/api/v1/mrv/estimate",status_class="2xx"'
+    assert f'{prefix},le="0.005"}} 1' in text
+    assert f'{prefix},le="0.025"}} 2' in text
+    assert f'{prefix},le="{REQUEST_BUCKETS[-1]!r}"}} 2' in text
+    assert f'{prefix},le="+Inf"}} 3' in text
+    assert 'agri_trust_http_request_duration_seconds_count{route="/api/v1/mrv/estimate",status_class="5xx"} 1' in text
+    assert "# TYPE agri_trust_http_request_duration_seconds histogram" in text
+
+
+def test_bucket_upper_bound_is_inclusive() -> None:
+    store = MetricsStore()
+    store.observe_stage("predict", 0.001)
+    assert 'agri_trust_stage_duration_seconds_bucket{stage="predict",le="0.001"} 1' in store.prometheus_text()
+
+
+def test_time_stage_records_even_when_the_block_raises() -> None:
+    store = MetricsStore()
+    try:
+        with store.time_stage("auth"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert 'agri_trust_stage_duration_seconds_count{stage="auth"} 1' in store.prometheus_text()
+
+
+def test_shards_from_many_threads_are_merged_at_scrape_time() -> None:
+    store = MetricsStore()
+    threads_count, per_thread = 8, 500
+
+    def record() -> None:
+        for _ in range(per_thread):
+            store.record_request("/health", 200)
+            store.observe_stage("rate_limit", 0.0001)
+
+    threads = [threading.Thread(target=record) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = threads_count * per_thread
+    assert store.snapshot()["requests_by_path"] == {"/health": total}
+    assert store.snapshot()["responses_by_status"] == {"200": total}
+    assert f'agri_trust_stage_duration_seconds_count{{stage="rate_limit"}} {total}' in store.prometheus_text()
+
+
+def test_shards_of_exited_threads_are_retired_without_losing_counts() -> None:
+    store = MetricsStore()
+    for rounds in range(1, 4):
+        threads = [threading.Thread(target=store.record_request, args=("/health", 200)) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.snapshot()["requests_by_path"] == {"/health": 20 * rounds}
+        assert len(store._shards) == 0
+
+    store.record_request("/health", 200)
+    assert store.snapshot()["requests_by_path"] == {"/health": 61}
+    assert len(store._shards) == 1
+
+
+def test_label_values_are_escaped() -> None:
+    store = MetricsStore()
+    store.record_request('/odd"path\\', 404)
+    assert 'agri_trust_http_requests_total{path="/odd\\"path\\\\"} 1' in store.prometheus_text()
@@ -0,0 +1,149 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from app.core.config import settings
+from app.models.schemas import MrvEstimateRequest
+from app.services.agro_climate import agro_climate_table
+from app.services.model_registry import LoadedModel, mrv_registry, prepare_mrv_model
+from app.services.mrv_engine import (
+    FEATURE_COLUMNS,
+    estimate_cache,
+    encode_feature_matrix,
+    encode_features,
+    estimate_annual_co2e,
+    estimate_annual_co2e_batch,
+    estimate_counterfactuals,
+)
+
+DATASET = Path(__file__).resolve().parents[2] / "docs" / "datasets" / "sample_mrv_training_data.csv"
+
+STATES = ["Maharashtra", "Punjab", "Kerala", "Bihar", "rajasthan "]
+PRACTICE_SETS = [
+    ["cover_crop"],
+    ["no_till", "biochar"],
+    ["agroforestry", "organic_compost", "residue_retention"],
+    ["drip_irrigation", "reduced_till", "cover_crop", "biochar"],
+]
+
+
+def _requests(count: int = 40) -> list[MrvEstimateRequest]:
+    return [
+        MrvEstimateRequest(
+            profile={
+                "farmer_id": f"f-{i}",
+                "state": STATES[i % len(STATES)],
+                "district": "Test",
+                "farm_size_hectares": 0.5 + (i % 9) * 0.7,
+                "crop": "wheat",
+                "irrigation_type": "rainfed",
+                "soil_organic_carbon_pct": 0.2 + (i % 7) * 0.25,
+            },
+            practices=PRACTICE_SETS[i % len(PRACTICE_SETS)],
+            baseline_yield_ton_per_hectare=0.9 + (i % 11) * 0.6,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="module")
+def trained_forest() -> RandomForestRegressor:
+    df = pd.read_csv(DATASET)
+    model = RandomForestRegressor(n_estimators=25, max_depth=8, random_state=7)
+    model.fit(df[FEATURE_COLUMNS], df["target_co2e"])
+    return prepare_mrv_model(model, {"feature_columns": FEATURE_COLUMNS})
+
+
+def _single(items: list[MrvEstimateRequest]) -> list[tuple[float, float, str, str]]:
+    return [
+        estimate_annual_co2e(item.profile, list(item.practices), item.baseline_yield_ton_per_hectare) for item in items
+    ]
+
+
+@pytest.fixture(autouse=True)
+def no_estimate_cache(monkeypatch):
+    # Equivalence tests must compare freshly computed results, not one path reading the other's cache entries.
+    monkeypatch.setattr(estimate_cache, "maxsize", 0)
+
+
+@pytest.fixture
+def serve_model():
+    previous = mrv_registry.current()
+
+    def _serve(model, metadata: dict) -> None:
+        version = metadata.get("model_version", "heuristic_v1_india_smallholder")
+        mrv_registry.install(LoadedModel(model=model, metadata=metadata, version=version))
+
+    yield _serve
+    mrv_registry.install(previous)
+
+
+def test_batch_matches_single_heuristic(serve_model) -> None:
+    serve_model(None, {})
+    items = _requests()
+    assert estimate_annual_co2e_batch(items) == _single(items)
+
+
+def test_batch_matches_single_with_model(serve_model, trained_forest) -> None:
+    serve_model(trained_forest, {"model_version": "mrv_rf_test", "r2": 0.9})
+    items = _requests()
+    results = estimate_annual_co2e_batch(items)
+    assert results == _single(items)
+    assert {version for *_, version in results} == {"mrv_rf_test"}
+
+
+@pytest.mark.parametrize("with_model", [False, True])
+def test_counterfactuals_match_single_estimates(serve_model, trained_forest, with_model: bool) -> None:
+    serve_model(trained_forest if with_model else None, {"model_version": "mrv_rf_test", "r2": 0.9})
+    item = _requests(1)[0]
+    practice_sets = [[]] + PRACTICE_SETS
+    expected = [
+        estimate_annual_co2e(item.profile, practices, item.baseline_yield_ton_per_hectare) for practices in practice_sets
+    ]
+    assert estimate_counterfactuals(item.profile, practice_sets, item.baseline_yield_ton_per_hectare) == expected
+
+
+def test_batch_empty() -> None:
+    assert estimate_annual_co2e_batch([]) == []
+
+
+def test_encode_features_layout() -> None:
+    item = _requests(1)[0]
+    row = encode_features(item.profile, list(item.practices), item.baseline_yield_ton_per_hectare)
+    assert row.shape == (1, len(FEATURE_COLUMNS))
+    assert row.dtype.name == "float64"
+    assert row.flags.c_contiguous
+    assert row[0, FEATURE_COLUMNS.index("farm_size_hectares")] == item.profile.farm_size_hectares
+    assert row[0, FEATURE_COLUMNS.index("practice_score")] == 0.45
+
+    matrix = encode_feature_matrix(_requests(5))
+    assert matrix.shape == (5, len(FEATURE_COLUMNS))
+    assert matrix.flags.c_contiguous
+
+
+def test_state_factor_uses_district_row(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "factors.csv"
+    path.write_text("state,district,factor,aliases\nMaharashtra,,1.03,\nMaharashtra,Nashik,0.5,\n", encoding="utf-8")
+    monkeypatch.setattr(settings, "agro_climate_table_path", str(path))
+    agro_climate_table.cache_clear()
+    try:
+        items = _requests(2)
+        items[0].profile.state, items[0].profile.district = "Maharashtra", "Nasik"
+        items[1].profile.state, items[1].profile.district = "Maharashtra", "Pune"
+        column = FEATURE_COLUMNS.index("state_factor")
+        assert encode_feature_matrix(items)[:, column].tolist() == [0.5, 1.03]
+        assert encode_features(items[0].profile, ["cover_crop"], 3.0)[0, column] == 0.5
+    finally:
+        agro_climate_table.cache_clear()
+
+
+def test_prepare_mrv_model_rejects_column_drift() -> None:
+    df = pd.read_csv(DATASET)
+    shuffled = list(reversed(FEATURE_COLUMNS))
+    model = RandomForestRegressor(n_estimators=2, random_state=0).fit(df[shuffled], df["target_co2e"])
+    with pytest.raises(ValueError):
+        prepare_mrv_model(model, {"feature_columns": FEATURE_COLUMNS})
+    with pytest.raises(ValueError):
+        prepare_mrv_model(model, {"feature_columns": shuffled})
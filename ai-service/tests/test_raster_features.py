@@ -0,0 +1,200 @@
+import json
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from app.models.schemas import FarmProfile, MrvEstimateRequest
+from app.services import raster_features
+from app.services.model_registry import (
+    FEATURE_COLUMNS,
+    RASTER_FEATURE_COLUMNS,
+    LoadedModel,
+    mrv_registry,
+    prepare_mrv_model,
+)
+from app.services.mrv_engine import (
+    encode_features,
+    estimate_annual_co2e,
+    estimate_annual_co2e_batch,
+    estimate_cache,
+    estimate_counterfactuals,
+)
+from app.services.raster_features import FarmLocation, RasterFeatureStore, RasterTile, load_tiles
+
+NODATA = -9999.0
+
+
+def _write_tile(directory, name: str, data: np.ndarray, **meta) -> None:
+    np.save(directory / f"{name}.npy", data)
+    (directory / f"{name}.json").write_text(json.dumps(meta), encoding="utf-8")
+
+
+@pytest.fixture
+def tile_dir(tmp_path):
+    # NDVI at ~110 m pixels over 73.0-73.2E, 20.0-19.8N, split into two tiles; rainfall at ~11 km pixels.
+    ndvi = np.add.outer(np.arange(200) * 0.001, np.arange(200) * 0.002).astype(np.float32)
+    ndvi[50:60, 50:60] = NODATA
+    _write_tile(tmp_path, "ndvi_west", ndvi[:, :100], layer="ndvi", west=73.0, north=20.0, pixel_size_deg=0.001, nodata=NODATA)
+    _write_tile(tmp_path, "ndvi_east", ndvi[:, 100:], layer="ndvi", west=73.1, north=20.0, pixel_size_deg=0.001, nodata=NODATA)
+    rainfall = np.full((4, 4), 700.0)
+    rainfall[1, 2] = 900.0
+    _write_tile(tmp_path, "rainfall", rainfall, layer="rainfall_mm", west=72.9, north=20.1, pixel_size_deg=0.1)
+    return tmp_path
+
+
+class _CountingArray:
+    def __init__(self, data: np.ndarray) -> None:
+        self.data, self.shape, self.reads, self.windows = data, data.shape, 0, []
+
+    def __getitem__(self, index):
+        self.reads += 1
+        window = self.data[index]
+        self.windows.append(window.shape)
+        return window
+
+
+def _brute_force(tile: RasterTile, lat: float, lon: float, hectares: float) -> float:
+    """Mean over pixels whose centres fall inside the farm square (or the pixel under a farm smaller than one)."""
+    half = np.sqrt(hectares * 10_000) / 2
+    data = np.asarray(tile.data, dtype=np.float64)
+    rows, cols = np.indices(data.shape)
+    centre_lat = tile.north - (rows + 0.5) * tile.pixel_height
+    centre_lon = tile.west + (cols + 0.5) * tile.pixel_width
+    inside = (np.abs(centre_lat - lat) * 111_320 <= half) & (
+        np.abs(centre_lon - lon) * 111_320 * np.cos(np.radians(lat)) <= half
+    )
+    if not inside.any():
+        inside[int((tile.north - lat) / tile.pixel_height), int((lon - tile.west) / tile.pixel_width)] = True
+    values = data[inside & (data != NODATA)]
+    return float(values.mean()) if len(values) else float("nan")
+
+
+def test_tiles_load_memory_mapped_with_sidecar_geometry(tile_dir) -> None:
+    tiles = {tile.tile_id: tile for tile in load_tiles(tile_dir)}
+    assert set(tiles) == {"ndvi_west", "ndvi_east", "rainfall"}
+    assert isinstance(tiles["ndvi_west"].data, np.memmap)
+    assert tiles["ndvi_east"].east == pytest.approx(73.2)
+    assert tiles["rainfall"].south == pytest.approx(19.7)
+
+
+def test_unknown_layer_is_rejected(tmp_path) -> None:
+    _write_tile(tmp_path, "lst", np.zeros((2, 2)), layer="land_surface_temperature", west=0, north=0, pixel_size_deg=1)
+    with pytest.raises(ValueError, match="Unknown raster layers"):
+        load_tiles(tmp_path)
+
+
+def test_zonal_means_match_pixel_centres(tile_dir) -> None:
+    tile = RasterTile.from_npy(tile_dir / "ndvi_west.npy")
+    rng = np.random.default_rng(5)
+    lats, lons = rng.uniform(19.82, 19.98, 60), rng.uniform(73.01, 73.09, 60)
+    sizes = rng.choice([0.3, 1.0, 2.5, 8.0, 40.0], 60)
+    batch = tile.zonal_means(lats, lons, sizes)
+    expected = [_brute_force(tile, lat, lon, size) for lat, lon, size in zip(lats, lons, sizes)]
+    # Footprint edges are rounded outwards to whole pixels, so allow for one extra ring of pixels.
+    np.testing.assert_allclose(batch, expected, atol=0.006)
+    np.testing.assert_array_equal(
+        batch, [tile.zonal_means(lats[i : i + 1], lons[i : i + 1], sizes[i : i + 1])[0] for i in range(60)]
+    )
+
+
+def test_nodata_pixels_are_ignored(tile_dir) -> None:
+    tile = RasterTile.from_npy(tile_dir / "ndvi_west.npy")
+    lats, lons, sizes = np.array([19.9455, 19.9405]), np.array([73.0555, 73.0555]), np.array([0.5, 8.0])
+    inside_hole, edge_of_hole = tile.zonal_means(lats, lons, sizes)
+    assert np.isnan(inside_hole)
+    assert edge_of_hole == pytest.approx(_brute_force(tile, 19.9405, 73.0555, 8.0), abs=0.006)
+
+
+def test_widely_separated_farms_read_bounded_windows() -> None:
+    data = np.random.default_rng(2).uniform(0.0, 1.0, (2000, 2000)).astype(np.float32)
+    tile = RasterTile("big", "ndvi", 73.0, 20.0, 0.0001, 0.0001, None, _CountingArray(data))
+    # Opposite corners plus a cluster in the middle.
+    lats = np.array([19.9999, 19.8001, 19.9, 19.9001, 19.9002])
+    lons = np.array([73.0001, 73.1999, 73.1, 73.1001, 73.1002])
+    sizes = np.full(5, 0.5)
+    capped = tile.zonal_means(lats, lons, sizes, max_window_pixels=10_000)
+    assert max(rows * cols for rows, cols in tile.data.windows) <= 10_000
+    np.testing.assert_array_equal(capped, tile.zonal_means(lats, lons, sizes, max_window_pixels=2000 * 2000))
+    assert tile.data.windows[-1] == (2000, 2000)
+
+
+def test_store_reads_each_tile_once_per_batch_and_caches_per_farm(tile_dir) -> None:
+    tiles = load_tiles(tile_dir)
+    counting = [
+        RasterTile(**{**tile.__dict__, "data": _CountingArray(np.asarray(tile.data))}) for tile in tiles
+    ]
+    store = RasterFeatureStore(counting)
+    farms = [FarmLocation(f"f-{i}", 19.85 + i * 0.01, 73.02 + i * 0.015, 1.5) for i in range(10)]
+    first = store.features(farms)
+    assert {tile.tile_id: tile.data.reads for tile in counting} == {"ndvi_west": 1, "ndvi_east": 1, "rainfall": 1}
+    np.testing.assert_array_equal(store.features(farms), first)
+    assert sum(tile.data.reads for tile in counting) == 3
+
+    assert first[:, RASTER_FEATURE_COLUMNS.index("rainfall_mm_mean")].tolist().count(900.0) > 0
+    assert np.isnan(store.features([FarmLocation("far", 26.9, 75.8, 1.0)])).all()
+
+
+def _profile(farmer_id: str, latitude: float | None = None, longitude: float | None = None) -> FarmProfile:
+    return FarmProfile(
+        farmer_id=farmer_id,
+        state="Maharashtra",
+        district="Nashik",
+        farm_size_hectares=2.0,
+        crop="wheat",
+        irrigation_type="rainfed",
+        soil_organic_carbon_pct=0.9,
+        latitude=latitude,
+        longitude=longitude,
+    )
+
+
+@pytest.fixture
+def raster_model(tile_dir, monkeypatch):
+    store = RasterFeatureStore.from_directory(tile_dir)
+    monkeypatch.setattr(raster_features, "raster_store", lambda: store)
+    monkeypatch.setattr(estimate_cache, "maxsize", 0)
+
+    rng = np.random.default_rng(0)
+    columns = FEATURE_COLUMNS + RASTER_FEATURE_COLUMNS
+    X = np.column_stack([rng.uniform(0.5, 6, 400), rng.uniform(0.9, 1.1, 400), rng.uniform(0.2, 2, 400),
+                         rng.uniform(1, 5, 400), rng.uniform(0.2, 3, 400), rng.uniform(0, 0.6, 400),
+                         rng.uniform(600, 1000, 400)])  # fmt: skip
+    y = X[:, 0] * X[:, 4] * (0.5 + X[:, 5]) * X[:, 6] / 800
+    model = RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(X, y)
+    metadata = {
+        "feature_columns": columns,
+        "model_version": "mrv_raster_test",
+        "raster_fill_values": {"ndvi_mean": 0.3, "rainfall_mm_mean": 800.0},
+    }
+    previous = mrv_registry.current()
+    mrv_registry.install(LoadedModel(model=prepare_mrv_model(model, metadata), metadata=metadata, version="mrv_raster_test"))
+    yield model, store
+    mrv_registry.install(previous)
+
+
+def test_online_scoring_appends_raster_columns(raster_model) -> None:
+    model, store = raster_model
+    located, unlocated = _profile("f-1", 19.91, 73.12), _profile("f-2")
+    practices = ["cover_crop", "no_till"]
+
+    raster = store.features([FarmLocation(("f-1", 19.91, 73.12), 19.91, 73.12, 2.0)])
+    expected = model.predict(np.hstack([encode_features(located, practices, 3.0), raster]))[0]
+    estimate, _, _, version = estimate_annual_co2e(located, practices, 3.0)
+    assert version == "mrv_raster_test"
+    assert estimate == round(expected, 2)
+
+    filled = np.hstack([encode_features(unlocated, practices, 3.0), [[0.3, 800.0]]])
+    assert estimate_annual_co2e(unlocated, practices, 3.0)[0] == round(model.predict(filled)[0], 2)
+
+    items = [MrvEstimateRequest(profile=p, practices=practices, baseline_yield_ton_per_hectare=3.0) for p in (located, unlocated)]
+    assert [result[0] for result in estimate_annual_co2e_batch(items)] == [
+        estimate_annual_co2e(p, practices, 3.0)[0] for p in (located, unlocated)
+    ]
+    assert estimate_counterfactuals(located, [practices], 3.0)[0][0] == estimate
+
+
+def test_prepare_rejects_partial_raster_layout() -> None:
+    model = RandomForestRegressor(n_estimators=2).fit(np.zeros((4, 6)), np.zeros(4))
+    with pytest.raises(ValueError, match="do not match"):
+        prepare_mrv_model(model, {"feature_columns": FEATURE_COLUMNS + ["ndvi_mean"]})
@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+from app.core.rate_limit import IdleKeySweeper, RedisRateLimiter, SlidingWindowCounterLimiter
+from tests.fake_redis import FakeRedis
+
+
+def _backends():
+    return [
+        SlidingWindowCounterLimiter(limit=5, window_seconds=60, stripes=4),
+        RedisRateLimiter(FakeRedis(), limit=5, window_seconds=60),
+    ]
+
+
+@pytest.mark.parametrize("limiter", _backends(), ids=["memory", "redis"])
+def test_limit_is_enforced_within_window(limiter) -> None:
+    now = 6000.0
+    assert all(limiter.hit("1.2.3.4:/x", now=now + i) for i in range(5))
+    assert limiter.hit("1.2.3.4:/x", now=now + 6) is False
+    assert limiter.hit("5.6.7.8:/x", now=now + 6) is True
+
+
+@pytest.mark.parametrize("limiter", _backends(), ids=["memory", "redis"])
+def test_previous_window_is_weighted_by_overlap(limiter) -> None:
+    for i in range(5):
+        assert limiter.hit("k", now=6000.0 + i)
+    # 30s into the next window half of the previous bucket still counts: 2.5 + 3 new hits reaches the limit.
+    assert all(limiter.hit("k", now=6090.0) for _ in range(3))
+    assert limiter.hit("k", now=6090.0) is False
+    # Two windows later the old bucket is gone entirely.
+    assert all(limiter.hit("k", now=6240.0) for _ in range(5))
+
+
+def test_rejected_hits_are_not_counted() -> None:
+    client = FakeRedis()
+    limiter = RedisRateLimiter(client, limit=2, window_seconds=60)
+    for _ in range(10):
+        limiter.hit("k", now=6000.0)
+    assert int(client.get("agri-trust:rl:k:100")) == 2
+
+
+def test_memory_per_key_is_constant_and_idle_keys_are_evicted() -> None:
+    limiter = SlidingWindowCounterLimiter(limit=1000, window_seconds=60)
+    for i in range(500):
+        limiter.hit("busy", now=6000.0 + i * 0.01)
+    for i in range(100):
+        limiter.hit(f"idle-{i}", now=6000.0)
+    state = limiter._buckets[limiter._stripe("busy")]["busy"]
+    assert state == [100, 0, 500]
+    assert limiter.key_count() == 101
+
+    limiter.hit("busy", now=6125.0)
+    assert limiter.evict_idle(now=6125.0) == 100
+    assert limiter.key_count() == 1
+
+
+def test_sweeper_runs_in_background() -> None:
+    class Recorder(SlidingWindowCounterLimiter):
+        def __init__(self) -> None:
+            super().__init__(limit=1, window_seconds=60)
+            self.swept = threading.Event()
+
+        def evict_idle(self, now=None) -> int:
+            self.swept.set()
+            return 0
+
+    backend = Recorder()
+    sweeper = IdleKeySweeper(backend, interval_seconds=0.01)
+    sweeper.start()
+    try:
+        assert backend.swept.wait(timeout=2)
+    finally:
+        sweeper.stop()
+
+
+def test_concurrent_hits_never_exceed_limit() -> None:
+    limiter = SlidingWindowCounterLimiter(limit=1000, window_seconds=60, stripes=8)
+    accepted: list[int] = []
+
+    def worker() -> None:
+        accepted.append(sum(limiter.hit("shared", now=6000.0) for _ in range(500)))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(accepted) == 1000
+
+
+class _UnreachableRedis:
+    def pipeline(self):
+        raise ConnectionError("Connection refused")
+
+
+def test_redis_outage_fails_open_and_logs_once(caplog) -> None:
+    limiter = RedisRateLimiter(_UnreachableRedis(), limit=1, window_seconds=60)
+    with caplog.at_level("ERROR", logger="agri-trust.ai.rate_limit"):
+        assert all(limiter.hit("client:/health") for _ in range(5))
+    assert [record.message for record in caplog.records] == ["rate_limit_redis_unavailable fail_open=true"]
+
+    limiter.client = FakeRedis()
+    assert limiter.hit("client:/health")
+    assert not limiter.hit("client:/health")
+
+
+def test_limiter_reads_settings(monkeypatch) -> None:
+    from app.core import rate_limit
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "rate_limit_per_minute", 7)
+    monkeypatch.setattr(settings, "rate_limit_window_seconds", 30)
+    limiter = rate_limit.build_rate_limiter()
+    assert (limiter.limit, limiter.window_seconds) == (7, 30)
@@ -0,0 +1,169 @@
+import random
+from itertools import combinations
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.schemas import FarmProfile, RecommendationRequest, RecommendationResponse
+from app.services.recommender import (
+    ADVISORY_NOTE,
+    MAX_KNAPSACK_ITEMS,
+    MAX_KNAPSACK_UNITS,
+    OBJECTIVE_WEIGHT,
+    PRACTICE_COST_INR,
+    PRACTICE_RATIONALE,
+    PRACTICES,
+    generate_recommendations,
+    practice_mask,
+    recommendation_plan,
+    recommendation_response_json,
+    solve_budget_knapsack,
+)
+
+PROFILE = FarmProfile(
+    farmer_id="f-001",
+    state="Maharashtra",
+    district="Nashik",
+    farm_size_hectares=2.4,
+    crop="millets",
+    irrigation_type="rainfed",
+)
+
+
+def _reference(objective: str, current: list[str]) -> list[dict]:
+    """The per-request ranking the precomputed table replaced."""
+    ranking = OBJECTIVE_WEIGHT[objective]
+    candidates = [k for k in ranking if k not in current]
+    return [
+        {
+            "practice": practice,
+            "impact_score": round(ranking[practice], 2),
+            "rationale": PRACTICE_RATIONALE[practice],
+            "estimated_cost_inr_per_hectare": PRACTICE_COST_INR[practice],
+        }
+        for practice in sorted(candidates, key=lambda x: ranking[x], reverse=True)[:3]
+    ]
+
+
+def _all_subsets() -> list[list[str]]:
+    return [list(subset) for size in range(len(PRACTICES) + 1) for subset in combinations(PRACTICES, size)]
+
+
+@pytest.mark.parametrize("objective", sorted(OBJECTIVE_WEIGHT))
+def test_precomputed_table_matches_reference_ranking_for_every_combination(objective: str) -> None:
+    subsets = _all_subsets()
+    assert len(subsets) == 256
+    for current in subsets:
+        payload = RecommendationRequest(profile=PROFILE, current_practices=current, objective=objective)
+        expected = _reference(objective, current)
+        assert [item.model_dump() for item in generate_recommendations(payload)] == expected
+        response = RecommendationResponse.model_validate_json(recommendation_response_json(payload))
+        assert [item.model_dump() for item in response.recommendations] == expected
+        assert response.advisory_note == ADVISORY_NOTE
+
+
+def test_practice_mask_ignores_order_and_repeats() -> None:
+    assert practice_mask([]) == 0
+    assert practice_mask(["biochar", "no_till"]) == practice_mask(["no_till", "biochar", "no_till"])
+    assert practice_mask(PRACTICES) == 2 ** len(PRACTICES) - 1
+
+
+def _brute_force_frontier(costs: list[int], values: list[float], budget: int) -> list[tuple[int, float]]:
+    best_by_cost: dict[int, float] = {}
+    for size in range(len(costs) + 1):
+        for subset in combinations(range(len(costs)), size):
+            cost = sum(costs[index] for index in subset)
+            if 0 < cost <= budget:
+                best_by_cost[cost] = max(best_by_cost.get(cost, 0.0), sum(values[index] for index in subset))
+    frontier, running = [], 0.0
+    for cost in sorted(best_by_cost):
+        if best_by_cost[cost] > running + 1e-12:
+            running = best_by_cost[cost]
+            frontier.append((cost, running))
+    return frontier
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_knapsack_frontier_matches_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    costs = [rng.choice([5, 10, 15]) * rng.randint(1, 40) * 100 for _ in range(10)]
+    values = [rng.random() for _ in range(10)]
+    budget = rng.randint(0, sum(costs))
+
+    frontier = solve_budget_knapsack(costs, values, budget)
+
+    assert [(cost, round(value, 9)) for cost, value, _ in frontier] == [
+        (cost, round(value, 9)) for cost, value in _brute_force_frontier(costs, values, budget)
+    ]
+    for cost, value, chosen in frontier:
+        assert sum(costs[index] for index in chosen) == cost
+        assert sum(values[index] for index in chosen) == pytest.approx(value)
+
+
+def test_knapsack_table_is_bounded_by_total_cost() -> None:
+    costs, values = [2500, 1800, 3200], [0.5, 0.3, 0.4]
+    cost, value, chosen = solve_budget_knapsack(costs, values, 10**15)[-1]
+    assert (cost, chosen) == (7500, (0, 1, 2)) and value == pytest.approx(1.2)
+
+
+def test_knapsack_with_fine_grained_costs_uses_coarse_units() -> None:
+    rng = random.Random(5)
+    costs = [rng.randint(1_000, 50_000) for _ in range(300)]
+    values = [rng.random() for _ in range(300)]
+    budget = 2_000_000
+
+    frontier = solve_budget_knapsack(costs, values, budget)
+
+    assert [cost for cost, _, _ in frontier] == sorted({cost for cost, _, _ in frontier})
+    assert all(cheaper[1] < dearer[1] for cheaper, dearer in zip(frontier, frontier[1:]))
+    cost, value, chosen = frontier[-1]
+    assert cost <= budget and sum(costs[index] for index in chosen) == cost
+    assert sum(values[index] for index in chosen) == pytest.approx(value)
+
+    # Rounding costs up to the coarse unit gives away at most one unit per item, so the plan must beat
+    # a greedy fill of the budget less that slack.
+    slack = (len(costs) + 1) * -(-budget // MAX_KNAPSACK_UNITS)
+    greedy, spent = 0.0, 0
+    for index in sorted(range(len(costs)), key=lambda index: -values[index] / costs[index]):
+        if spent + costs[index] <= budget - slack:
+            spent += costs[index]
+            greedy += values[index]
+    assert value >= greedy
+
+
+def test_knapsack_rejects_too_many_items() -> None:
+    with pytest.raises(ValueError):
+        solve_budget_knapsack([100] * (MAX_KNAPSACK_ITEMS + 1), [1.0] * (MAX_KNAPSACK_ITEMS + 1), 10**6)
+
+
+def test_budget_is_bounded() -> None:
+    with pytest.raises(ValidationError):
+        RecommendationRequest(profile=PROFILE, budget_inr_per_hectare=1e11)
+
+
+def test_budget_plan_respects_budget_and_current_practices() -> None:
+    payload = RecommendationRequest(
+        profile=PROFILE,
+        current_practices=["no_till"],
+        budget_inr_per_hectare=15_000,
+        objective_weights={"carbon": 2, "cost": 1},
+    )
+    plan = recommendation_plan(payload)
+
+    assert plan.selected == plan.pareto_frontier[-1]
+    assert plan.selected.cost_inr_per_hectare <= 15_000
+    assert plan.selected.total_cost_inr == pytest.approx(plan.selected.cost_inr_per_hectare * 2.4)
+    assert all("no_till" not in point.practices for point in plan.pareto_frontier)
+    assert [item.practice for item in generate_recommendations(payload)] == plan.selected.practices
+
+    costs = [point.cost_inr_per_hectare for point in plan.pareto_frontier]
+    scores = [point.score for point in plan.pareto_frontier]
+    assert costs == sorted(costs) and scores == sorted(scores)
+
+    broke = payload.model_copy(update={"budget_inr_per_hectare": 1_000})
+    assert recommendation_plan(broke).selected.practices == []
+
+
+def test_objective_weights_must_have_positive_total() -> None:
+    with pytest.raises(ValueError):
+        RecommendationRequest(profile=PROFILE, budget_inr_per_hectare=5000, objective_weights={"carbon": 0})
@@ -0,0 +1,118 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from app.core.config import settings
+from app.core.monitoring import MetricsStore, metrics_store
+from app.models.schemas import FarmProfile
+from app.services.forest_inference import CompiledForest
+from app.services.model_registry import FEATURE_COLUMNS, LoadedModel, mrv_registry
+from app.services.mrv_engine import estimate_annual_co2e
+from app.services.shadow_scoring import ShadowJob, ShadowScorer, in_canary, shadow_scorer
+
+DATASET = Path(__file__).resolve().parents[2] / "docs" / "datasets" / "sample_mrv_training_data.csv"
+
+PROFILE = FarmProfile(
+    farmer_id="f-shadow",
+    state="Punjab",
+    district="Ludhiana",
+    farm_size_hectares=3.0,
+    crop="wheat",
+    irrigation_type="flood",
+    soil_organic_carbon_pct=0.6,
+)
+
+
+def _forest(seed: int) -> CompiledForest:
+    df = pd.read_csv(DATASET)
+    model = RandomForestRegressor(n_estimators=5, max_depth=5, random_state=seed)
+    model.fit(df[FEATURE_COLUMNS].to_numpy(), df["target_co2e"])
+    return CompiledForest.from_sklearn(model)
+
+
+@pytest.fixture
+def primary_and_candidate():
+    previous, previous_candidate = mrv_registry.current(), mrv_registry.candidate()
+    mrv_registry.install(LoadedModel(model=_forest(1), metadata={"r2": 0.9}, version="mrv_shadow_primary"))
+    mrv_registry.install_candidate(LoadedModel(model=_forest(2), metadata={"r2": 0.9}, version="mrv_shadow_candidate"))
+    yield
+    mrv_registry.install(previous)
+    mrv_registry.install_candidate(previous_candidate)
+
+
+def test_shadow_mode_serves_primary_and_records_delta(primary_and_candidate) -> None:
+    result = estimate_annual_co2e(PROFILE, ["no_till", "cover_crop"], 3.2, rollout_mode="shadow")
+    assert result[3] == "mrv_shadow_primary"
+
+    shadow_scorer.join()
+    stats = metrics_store.snapshot()["mrv_shadow_evaluation"]["mrv_shadow_primary->mrv_shadow_candidate"]
+    assert stats["compared"] >= 1
+    assert stats["max_abs_delta"] >= stats["mean_abs_delta"] >= 0
+
+
+def test_shadow_deltas_compare_unrounded_predictions(primary_and_candidate) -> None:
+    # The same model as candidate must show no drift, even though served estimates are rounded and cached.
+    mrv_registry.install_candidate(LoadedModel(model=mrv_registry.current().model, version="mrv_shadow_same"))
+    estimate_annual_co2e(PROFILE, ["no_till"], 3.1, rollout_mode="shadow")
+    estimate_annual_co2e(PROFILE, ["no_till"], 3.1, rollout_mode="shadow")
+
+    shadow_scorer.join()
+    stats = metrics_store.snapshot()["mrv_shadow_evaluation"]["mrv_shadow_primary->mrv_shadow_same"]
+    assert stats["compared"] == 2 and stats["max_abs_delta"] == 0.0
+
+
+def test_canary_serves_candidate_to_bucketed_farmers(primary_and_candidate, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "mrv_canary_percent", 100)
+    assert estimate_annual_co2e(PROFILE, ["biochar"], 3.2, rollout_mode="canary")[3] == "mrv_shadow_candidate"
+
+    monkeypatch.setattr(settings, "mrv_canary_percent", 0)
+    assert estimate_annual_co2e(PROFILE, ["biochar"], 3.2, rollout_mode="canary")[3] == "mrv_shadow_primary"
+    assert estimate_annual_co2e(PROFILE, ["biochar"], 3.2, rollout_mode="off")[3] == "mrv_shadow_primary"
+
+
+def test_canary_bucketing_is_stable() -> None:
+    farmers = [f"farmer-{i}" for i in range(2000)]
+    selected = [farmer for farmer in farmers if in_canary(farmer, 10)]
+    assert 100 < len(selected) < 300
+    assert selected == [farmer for farmer in farmers if in_canary(farmer, 10)]
+    assert not any(in_canary(farmer, 0) for farmer in farmers)
+
+
+class _ConstantModel:
+    def __init__(self, value: float) -> None:
+        self.value = value
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return np.full(len(features), self.value)
+
+
+class _BlockingModel:
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        self.release.wait(timeout=5)
+        return np.zeros(len(features))
+
+
+def test_full_queue_sheds_instead_of_blocking() -> None:
+    metrics = MetricsStore()
+    scorer = ShadowScorer(workers=1, queue_size=2, metrics=metrics)
+    blocking = _BlockingModel()
+    candidate = LoadedModel(model=blocking, version="slow")
+    rows = np.zeros((1, len(FEATURE_COLUMNS)))
+    job = ShadowJob(LoadedModel(model=_ConstantModel(1.0), version="fast"), rows, candidate, rows)
+
+    accepted = [scorer.submit(job) for _ in range(10)]
+    assert accepted.count(False) >= 7
+
+    blocking.release.set()
+    scorer.join()
+    stats = metrics.snapshot()["mrv_shadow_evaluation"]["fast->slow"]
+    assert stats["dropped"] == accepted.count(False)
+    assert stats["compared"] == accepted.count(True)
+    assert stats["mean_delta"] == -1.0
@@ -0,0 +1,27 @@
+import unicodedata
+
+from app.services.text_normalization import normalize_transcript
+
+
+def test_devanagari_and_romanized_hindi_fold_to_the_same_tokens() -> None:
+    assert normalize_transcript("सलाह").tokens == normalize_transcript("Salaah").tokens == ("salah",)
+    assert normalize_transcript("क्या करूं?").tokens == normalize_transcript("kya karoon").tokens
+    assert normalize_transcript("ज़मीन").tokens == normalize_transcript("zameen").tokens == ("jamin",)
+
+
+def test_normalization_forms_and_nukta_variants_are_equivalent() -> None:
+    precomposed = "क़सल"  # क़सल with the precomposed nukta letter
+    decomposed = unicodedata.normalize("NFD", precomposed)
+    assert normalize_transcript(precomposed) == normalize_transcript(decomposed) == normalize_transcript("कसल")
+
+
+def test_final_schwa_is_dropped_but_medial_one_kept() -> None:
+    assert normalize_transcript("कार्बन").tokens == ("karban",)
+    assert normalize_transcript("मुझे कार्बन स्कोर बताओ।").tokens == ("mujhe", "karban", "skor", "batao")
+
+
+def test_repeated_transcripts_are_memoized() -> None:
+    normalize_transcript.cache_clear()
+    normalize_transcript("मुझे सलाह चाहिए")
+    normalize_transcript("मुझे सलाह चाहिए")
+    assert normalize_transcript.cache_info().hits == 1
@@ -0,0 +1,109 @@
+import pytest
+
+from app.models.schemas import VishnuWebhookRequest
+from app.services.vishnu_sessions import MemoryResponseCache, RedisResponseCache, VishnuSessionService
+from app.services.voice_nlu import infer_intent_texts
+from tests.fake_redis import FakeRedis
+
+
+class CountingClassifier:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def __call__(self, transcripts: list[str]) -> list[tuple[str, float, str]]:
+        self.calls.append(list(transcripts))
+        return infer_intent_texts(transcripts)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(session_id: str, utterance: str, delivery_id: str | None = None) -> VishnuWebhookRequest:
+    return VishnuWebhookRequest(session_id=session_id, utterance=utterance, delivery_id=delivery_id)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def service(request) -> VishnuSessionService:
+    cache = MemoryResponseCache(maxsize=100) if request.param == "memory" else RedisResponseCache(FakeRedis())
+    return VishnuSessionService(cache, classify=CountingClassifier())
+
+
+def test_retried_delivery_is_answered_from_cache(service) -> None:
+    first = service.handle([_request("s-1", "मुझे कार्बन स्कोर बताओ")])
+    retry = service.handle([_request("s-1", "मुझे कार्बन स्कोर बताओ")])
+    assert first == retry
+    assert first[0].intent == "get_carbon_score"
+    assert len(service._classify.calls) == 1
+
+
+def test_same_utterance_in_another_session_is_not_a_duplicate(service) -> None:
+    service.handle([_request("s-1", "kya kare")])
+    service.handle([_request("s-2", "kya kare")])
+    assert service._classify.calls == [["kya kare"], ["kya kare"]]
+
+
+def test_confirmation_turn_reuses_the_session_intent(service) -> None:
+    first = service.handle([_request("s-1", "carbon credit kitna milega")])[0]
+    follow_up = service.handle([_request("s-1", "हाँ जी")])[0]
+    assert follow_up.intent == first.intent == "get_carbon_score"
+    assert follow_up.reply == first.reply
+    assert len(service._classify.calls) == 1
+
+    # Without session state a confirmation has nothing to reuse and is classified like any utterance.
+    assert service.handle([_request("s-new", "haan ji")])[0].intent == "unknown"
+
+
+def test_repeated_utterance_in_a_later_turn_is_not_a_retry(service) -> None:
+    intents = [
+        service.handle([_request("s-1", utterance)])[0].intent
+        for utterance in ("mujhe salah chahiye", "haan", "carbon score batao", "haan")
+    ]
+    assert intents == ["get_recommendations", "get_recommendations", "get_carbon_score", "get_carbon_score"]
+
+
+def test_delivery_id_keys_retries(service) -> None:
+    first = service.handle([_request("s-1", "salah chahiye", "d-1")])[0]
+    service.handle([_request("s-1", "carbon score", "d-2")])
+    # A late retry of d-1 still gets its own answer, not the session's latest one.
+    assert service.handle([_request("s-1", "salah chahiye", "d-1")])[0] == first
+    assert service.handle([_request("s-1", "salah chahiye", "d-3")])[0].intent == "get_recommendations"
+    assert len(service._classify.calls) == 3
+
+
+def test_batch_classifies_misses_in_one_call_and_dedupes_within_the_batch(service) -> None:
+    responses = service.handle(
+        [
+            _request("s-1", "salah chahiye"),
+            _request("s-2", "carbon score"),
+            _request("s-1", "salah chahiye"),
+            _request("s-1", "ok"),
+        ]
+    )
+    assert [response.intent for response in responses] == [
+        "get_recommendations",
+        "get_carbon_score",
+        "get_recommendations",
+        "get_recommendations",
+    ]
+    assert service._classify.calls == [["salah chahiye", "carbon score"]]
+
+
+def test_memory_cache_entries_expire_and_stay_bounded() -> None:
+    clock = Clock()
+    cache = MemoryResponseCache(maxsize=2, clock=clock)
+    classifier = CountingClassifier()
+    service = VishnuSessionService(cache, classify=classifier, delivery_ttl_seconds=60, session_ttl_seconds=60)
+
+    service.handle([_request("s-1", "carbon score")])
+    clock.now += 61
+    service.handle([_request("s-1", "carbon score")])
+    assert len(classifier.calls) == 2
+
+    for index in range(5):
+        cache.set(f"k{index}", "v", 60)
+    assert len(cache) == 2